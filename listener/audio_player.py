@@ -4,6 +4,15 @@
 Watches the shared response folder for new audio files from Edge TTS
 and plays them through the PC speakers using MediaPlayer (supports MP3/WAV).
 
+Streamed replies (watcher HJ_TTS_STREAM) arrive as numbered segments
+response_<time>_<turn>_<seq>; the player starts on the first one right
+away and plays the rest back to back in seq order as they come in, on one
+output stream (stream_player.py) so there is no gap between sentences.
+
+Barge-in (see barge_in.py, HJ_BARGE_IN in the listener): when the
+listener hears the wake word or conversation-mode speech, the response
+playing is stopped and the ones already waiting are dropped.
+
 Runs on Windows natively alongside the listener.
 """
 
@@ -11,10 +20,15 @@ import os
 import sys
 import json
 import time
+import queue
 import logging
+import collections
 from pathlib import Path
 from logging.handlers import RotatingFileHandler
 
+from barge_in import take_flag
+from stream_player import SegmentPlayer
+
 # ─── Configuration ───────────────────────────────────────────────────────
 
 RESPONSE_DIR = Path(os.environ.get(
@@ -24,6 +38,19 @@ RESPONSE_DIR = Path(os.environ.get(
 PLAYED_DIR = RESPONSE_DIR / "played"
 POLL_INTERVAL = 0.5
 
+# Socket transport: accept responses directly from the watcher
+# (e.g. tcp://127.0.0.1:18791); the response folder keeps working alongside
+PLAYER_LISTEN = os.environ.get("HJ_PLAYER_LISTEN", "")
+
+# How often playback checks for a barge-in signal
+BARGE_IN_POLL_SEC = 0.02
+
+# Streamed replies: give up on a reply whose next segment hasn't arrived this
+# long after the previous one (and everything before it has been played)
+SEGMENT_WAIT_SEC = 10
+# Output device for streamed replies (empty = WASAPI default on Windows)
+SOUND_DEVICE = os.environ.get("HJ_SOUND_DEVICE", "")
+
 # Logging
 LOG_DIR = Path(__file__).parent / "logs"
 LOG_DIR.mkdir(exist_ok=True)
@@ -47,11 +74,14 @@ logger.addHandler(_ch)
 
 # ─── Audio Playback ─────────────────────────────────────────────────────
 
-def play_audio(audio_path: Path):
-    """Play audio file through default speakers using Windows MediaPlayer."""
+def play_audio(audio_path: Path) -> dict | None:
+    """Play audio file through default speakers using Windows MediaPlayer.
+
+    Returns the barge-in signal if the user interrupted playback.
+    """
     if sys.platform != "win32":
         logger.error("Audio player only works on Windows")
-        return
+        return None
 
     try:
         import clr  # pythonnet
@@ -84,19 +114,40 @@ Start-Sleep $waitSecs
 $p.Close()
 """
         logger.info("🔊 Playing: %s (~%ds estimated)", audio_path.name, estimated_duration)
-        result = subprocess.run(
+        proc = subprocess.Popen(
             ["powershell", "-NoProfile", "-Command", ps_script],
-            capture_output=True, text=True, timeout=estimated_duration + 15
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
         )
-        if result.returncode == 0:
+        deadline = time.monotonic() + estimated_duration + 15
+        while True:
+            try:
+                proc.wait(timeout=BARGE_IN_POLL_SEC)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            signal = take_barge_in()
+            if signal is not None:
+                proc.kill()  # MediaPlayer dies with its process
+                proc.wait()
+                # The process is gone; the audio device may still drain its buffer
+                logger.info("✋ Barge-in (%s): stopped %s, detection→kill %.0fms",
+                            signal.get("source", "?"), audio_path.name,
+                            (time.time() - signal["at"]) * 1000)
+                return signal
+            if time.monotonic() > deadline:
+                proc.kill()
+                proc.wait()
+                logger.warning("Playback timed out, moving on")
+                return None
+
+        if proc.returncode == 0:
             logger.info("✅ Playback complete")
         else:
-            logger.error("Playback error: %s", result.stderr[:200])
+            logger.error("Playback error: %s", proc.stderr.read()[:200])
 
-    except subprocess.TimeoutExpired:
-        logger.warning("Playback timed out, moving on")
     except Exception as e:
         logger.error("Playback failed: %s", e)
+    return None
 
 
 def move_to_played(audio_path: Path, json_path: Path = None):
@@ -110,26 +161,209 @@ def move_to_played(audio_path: Path, json_path: Path = None):
         logger.warning("Could not move to played: %s", e)
 
 
+# ─── Barge-in ───────────────────────────────────────────────────────────
+
+barge_in_signals = queue.Queue()  # signals pushed over the socket
+
+
+def take_barge_in() -> dict | None:
+    """Latest barge-in signal from the socket or the flag file, if any."""
+    signal = take_flag(RESPONSE_DIR)
+    while True:
+        try:
+            signal = barge_in_signals.get_nowait()
+        except queue.Empty:
+            return signal
+
+
+def drop_queued():
+    """Discard the responses waiting when the user started talking, and the rest of their turns.
+
+    Everything queued now goes: an answer to what the user is saying can't
+    exist yet, and file times can't tell (the watcher's clock is WSL2's).
+    """
+    dropped = 0
+    while True:
+        try:
+            audio_path, header = received_responses.get_nowait()
+        except queue.Empty:
+            break
+        move_to_played(audio_path)
+        cut_turns.append(header.get("turn"))
+        dropped += 1
+    for key in list(pushed_segments):
+        audio_path, _ = pushed_segments.pop(key)
+        move_to_played(audio_path)
+        cut_turns.append(key[0])
+        dropped += 1
+    for json_file, data in get_pending_responses():
+        audio_file = data.get("audio_file", "")
+        if "seq" in data:
+            cut_turns.append(data.get("turn"))  # its later segments are dropped as they arrive
+        audio_path = RESPONSE_DIR / audio_file
+        if audio_file and audio_path.exists():
+            move_to_played(audio_path, json_file)
+        else:
+            json_file.unlink(missing_ok=True)
+        dropped += 1
+    if dropped:
+        logger.info("✋ Dropped %d queued response(s)", dropped)
+
+
+# ─── Streamed Replies ────────────────────────────────────────────────────
+
+streamer = None  # SegmentPlayer, once started
+cut_turns = collections.deque(maxlen=32)  # streamed replies stopped by barge-in or a missing segment
+
+
+def find_segment(turn: str, prefix: str, seq: int) -> tuple | None:
+    """(audio path, JSON path or None, metadata) of segment `seq`, if it has arrived."""
+    pushed = pushed_segments.pop((turn, seq), None)
+    if pushed is not None:
+        return pushed[0], None, pushed[1]
+    json_path = RESPONSE_DIR / f"{prefix}_{seq:03d}.json"
+    try:
+        meta = json.loads(json_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return RESPONSE_DIR / meta.get("audio_file", ""), json_path, meta
+
+
+def play_streamed(audio_path: Path, json_path: Path | None, meta: dict) -> dict | None:
+    """Play a streamed reply from this segment through its final one, in seq order.
+
+    Segments go into the SegmentPlayer's buffer as they arrive, so the next
+    one is usually queued before the current one ends; without it (or for a
+    segment it can't decode) each plays through MediaPlayer in turn.
+    Returns the barge-in signal if the user interrupted the reply.
+    """
+    turn, seq = meta.get("turn"), meta["seq"]
+    if turn in cut_turns:
+        move_to_played(audio_path, json_path)
+        return None
+    prefix = audio_path.stem.rsplit("_", 1)[0]
+    segment, final = (audio_path, json_path, meta), False
+    deadline = time.monotonic() + SEGMENT_WAIT_SEC
+    logger.info("🔊 Streaming reply %s from segment %d", turn, seq)
+
+    while True:
+        signal = take_barge_in()
+        if signal is not None:
+            silent_at = streamer.clear() if streamer is not None else None
+            cut_turns.append(turn)
+            if silent_at is not None:
+                logger.info("✋ Barge-in (%s): stopped reply %s, detection→silence %.0fms",
+                            signal.get("source", "?"), turn, (silent_at - signal["at"]) * 1000)
+            else:
+                logger.info("✋ Barge-in (%s): stopped reply %s", signal.get("source", "?"), turn)
+            return signal
+
+        if segment is not None:
+            audio_path, json_path, meta = segment
+            seconds = streamer.append(audio_path) if streamer is not None else None
+            if seconds is not None:
+                logger.info("🔊 Segment %d queued (%.1fs)", seq, seconds)
+                move_to_played(audio_path, json_path)
+            elif streamer is not None and streamer.busy:
+                time.sleep(BARGE_IN_POLL_SEC)
+                continue  # MediaPlayer fallback only once the buffered audio is out
+            else:
+                signal = play_audio(audio_path)
+                move_to_played(audio_path, json_path)
+                if signal is not None:
+                    cut_turns.append(turn)
+                    return signal
+            final = bool(meta.get("final"))
+            seq += 1
+            deadline = time.monotonic() + SEGMENT_WAIT_SEC
+
+        playing = streamer is not None and streamer.busy
+        if final and not playing:
+            logger.info("✅ Playback complete")
+            return None
+        if not final and not playing and time.monotonic() > deadline:
+            cut_turns.append(turn)  # a late segment would play out of context
+            logger.warning("Segment %d of reply %s never arrived, moving on", seq, turn)
+            return None
+        segment = None if final else find_segment(turn, prefix, seq)
+        if segment is None:
+            time.sleep(BARGE_IN_POLL_SEC)
+
+
+def play_response(audio_path: Path, json_path: Path | None, meta: dict) -> dict | None:
+    """Play one response (a whole streamed reply if it is a segment); returns any barge-in signal."""
+    if "seq" in meta:
+        return play_streamed(audio_path, json_path, meta)
+    signal = play_audio(audio_path)
+    move_to_played(audio_path, json_path)
+    return signal
+
+
+# ─── Socket Transport ────────────────────────────────────────────────────
+
+received_responses = queue.Queue()  # (audio path, header) written by the transport handler
+pushed_segments = {}  # (turn, seq) → (audio path, header): later segments, fetched by play_streamed
+
+
+def on_transport_message(header: dict, payload: bytes) -> bool:
+    """Store a pushed response next to folder-delivered ones and queue it."""
+    if header.get("type") == "barge_in":
+        barge_in_signals.put(header)
+        return True
+    if header.get("type") != "response" or not payload:
+        logger.warning("Unexpected transport message: %s", header.get("type"))
+        return False
+    audio_path = RESPONSE_DIR / Path(header.get("audio_file") or f"response_{header['id']}.mp3").name
+    audio_path.write_bytes(payload)
+    if header.get("seq", 0) > 0 and header.get("turn") in cut_turns:
+        move_to_played(audio_path)  # the rest of a reply the user talked over
+    elif header.get("seq", 0) > 0:
+        pushed_segments[(header.get("turn"), header["seq"])] = (audio_path, header)
+    else:
+        received_responses.put((audio_path, header))
+    return True
+
+
+def wait_for_pushed(timeout: float):
+    """Play responses pushed over the socket, waiting up to `timeout` for one."""
+    try:
+        audio_path, header = received_responses.get(timeout=timeout)
+    except queue.Empty:
+        return
+    while True:
+        signal = play_response(audio_path, None, header)
+        if signal is not None:
+            drop_queued()
+            return
+        try:
+            audio_path, header = received_responses.get_nowait()
+        except queue.Empty:
+            return
+
+
 # ─── Main Loop ──────────────────────────────────────────────────────────
 
 def get_pending_responses() -> list:
-    """Get response JSON files sorted by timestamp."""
+    """(JSON file, metadata) of waiting responses, sorted by timestamp.
+
+    The watcher and tts_speak.py replace their JSON atomically, after the
+    audio is written, so a file that parses is complete and plays at once.
+    One that doesn't is skipped (and left for the next poll).
+    """
     if not RESPONSE_DIR.exists():
         return []
 
     files = []
-    now = time.time()
     for f in sorted(RESPONSE_DIR.glob("response_*.json")):
         try:
-            if now - f.stat().st_mtime < 1.0:
-                continue  # Wait for write to finish
-            files.append(f)
-        except OSError:
+            files.append((f, json.loads(f.read_text(encoding="utf-8"))))
+        except (OSError, ValueError):
             continue
     return files
 
 
 def main():
+    global streamer
     logger.info("=" * 50)
     logger.info("🔊 Hey Jarvis V3 — Audio Response Player")
     logger.info("=" * 50)
@@ -138,21 +372,39 @@ def main():
     RESPONSE_DIR.mkdir(parents=True, exist_ok=True)
     PLAYED_DIR.mkdir(parents=True, exist_ok=True)
 
+    try:
+        streamer = SegmentPlayer(int(SOUND_DEVICE) if SOUND_DEVICE else None).start()
+        logger.info("🔈 Streamed replies play on %s @ %dHz", streamer.device_name, streamer.rate)
+    except Exception as e:
+        logger.warning("Streamed replies fall back to MediaPlayer per segment: %s", e)
+
+    if take_flag(RESPONSE_DIR) is not None:
+        logger.info("Discarded a barge-in flag left from an earlier run")
+
+    if PLAYER_LISTEN:
+        from transport import TransportServer
+        TransportServer(PLAYER_LISTEN, on_transport_message, log=logger).start()
+
     logger.info("👂 Watching for audio responses...")
 
     try:
         while True:
-            for json_file in get_pending_responses():
-                try:
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+            signal = take_barge_in()
+            if signal is not None:
+                drop_queued()
 
+            for json_file, data in get_pending_responses():
+                if not json_file.exists():
+                    continue  # played along with an earlier segment of its reply
+                try:
                     audio_file = data.get("audio_file", "")
                     audio_path = RESPONSE_DIR / audio_file
 
                     if audio_path.exists():
-                        play_audio(audio_path)
-                        move_to_played(audio_path, json_file)
+                        signal = play_response(audio_path, json_file, data)
+                        if signal is not None:
+                            drop_queued()
+                            break
                     else:
                         logger.warning("Audio file not found: %s", audio_file)
                         json_file.unlink(missing_ok=True)
@@ -160,7 +412,7 @@ def main():
                 except Exception as e:
                     logger.error("Error processing %s: %s", json_file.name, e)
 
-            time.sleep(POLL_INTERVAL)
+            wait_for_pushed(POLL_INTERVAL)
 
     except KeyboardInterrupt:
         logger.info("👋 Stopping audio player...")
@@ -0,0 +1,85 @@
+"""
+✋ Hey Jarvis — Barge-in
+=========================
+Lets the user talk over a response (opt-in, HJ_BARGE_IN): when the
+listener hears the wake word (or speech in conversation mode) it tells the
+player to stop, and the player drops the responses already waiting, with
+the rest of their turns. Which responses to drop is decided by what the
+player has queued, never by file times: the watcher writes those from
+WSL2, whose clock can drift from Windows'.
+
+The signal goes over the player's socket (HJ_PLAYER_LISTEN, see
+transport.py) when it has one, otherwise as a small flag file in the
+response folder that the player checks between 20ms playback polls, and
+discards at startup (a flag left from an earlier run is not the user
+talking now). It carries the wall-clock time of the detection, so the
+player can log how long stopping took; both run on the same Windows box.
+"""
+
+import json
+import time
+import queue
+import logging
+import threading
+from pathlib import Path
+
+from transport import TransportClient
+
+logger = logging.getLogger("hey-jarvis")
+
+FLAG_NAME = "barge_in.json"
+SEND_TIMEOUT_SEC = 0.5
+
+
+class BargeInSender:
+    """Fire-and-forget barge-in signals from the listener's hot loop."""
+
+    def __init__(self, player_url: str, response_dir: Path, metrics=None):
+        self.client = TransportClient(player_url, timeout=SEND_TIMEOUT_SEC, log=logger) if player_url else None
+        self.flag = Path(response_dir) / FLAG_NAME
+        self.metrics = metrics
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="barge-in", daemon=True)
+        self._thread.start()
+
+    def trigger(self, source: str):
+        """Queue a signal stamped with the current time; never blocks."""
+        self._queue.put({"at": time.time(), "source": source})
+
+    def _run(self):
+        while True:
+            signal = self._queue.get()
+            if signal is None:
+                return
+            t0 = time.perf_counter()
+            if self.client is None or not self.client.send("barge_in", signal):
+                self._write_flag(signal)
+            if self.metrics is not None:
+                self.metrics.observe("barge_in_signal", time.perf_counter() - t0)
+
+    def _write_flag(self, signal: dict):
+        try:
+            tmp = self.flag.with_suffix(".tmp")
+            tmp.write_text(json.dumps(signal), encoding="utf-8")
+            tmp.replace(self.flag)
+        except OSError as e:
+            logger.warning("Could not signal barge-in: %s", e)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=1.0)
+        if self.client is not None:
+            self.client.close()
+
+
+def take_flag(response_dir: Path) -> dict | None:
+    """Consume a barge-in flag file left by the listener, if any."""
+    flag = Path(response_dir) / FLAG_NAME
+    try:
+        signal = json.loads(flag.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        signal = {"at": time.time()}
+    flag.unlink(missing_ok=True)
+    return signal
@@ -0,0 +1,110 @@
+"""
+⏱ Hey Jarvis — Endpointer benchmark
+====================================
+Replays a corpus of recordings through Silero VAD once, then runs the
+endpointer over the cached probabilities for each parameter set and
+reports how much dead air it waits through and how often it cuts the
+speaker off.
+
+Each WAV (16kHz mono 16-bit) should hold one utterance followed by at
+least a couple of seconds of silence, e.g. files from processed/ recorded
+before this endpointer existed. A file counts as truncated when the
+endpointer ends before the last frame Silero scores as speech.
+
+Usage:
+    python bench_endpoint.py corpus/
+    python bench_endpoint.py corpus/ --min-silence 0.5 0.7 1.0 --max-silence 1.5 2.0
+"""
+
+import sys
+import wave
+import argparse
+import itertools
+from pathlib import Path
+
+import numpy as np
+
+from endpoint import Endpointer
+from vad import load_vad
+
+SAMPLE_RATE = 16000
+FRAME = 512
+FRAME_SEC = FRAME / SAMPLE_RATE
+
+
+def score_file(vad, path: Path) -> np.ndarray:
+    with wave.open(str(path), 'rb') as wf:
+        if (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()) != (1, 2, SAMPLE_RATE):
+            raise ValueError(f"{path.name}: need mono 16-bit {SAMPLE_RATE}Hz")
+        audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    vad.reset()
+    return np.array([vad.probability(audio[i:i + FRAME])
+                     for i in range(0, len(audio) - FRAME + 1, FRAME)])
+
+
+def run(probs_by_file: list, threshold: float, **params) -> dict:
+    ep = Endpointer(FRAME_SEC, **params)
+    tails, truncated, undecided = [], 0, 0
+    for probs in probs_by_file:
+        speech = np.flatnonzero(probs > threshold)
+        if not len(speech):
+            continue
+        last_true = speech[-1]
+        ep.reset()
+        decided = None
+        for i, p in enumerate(probs):
+            if ep.update(p):
+                decided = i
+                break
+        if decided is None:
+            undecided += 1
+            continue
+        if decided < last_true:
+            truncated += 1
+        tails.append((decided - last_true) * FRAME_SEC)
+    return {
+        "tail_mean": float(np.mean(tails)) if tails else float("nan"),
+        "tail_p90": float(np.percentile(tails, 90)) if tails else float("nan"),
+        "truncated": truncated,
+        "undecided": undecided,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark end-of-utterance detection on a WAV corpus")
+    parser.add_argument("corpus", type=Path)
+    parser.add_argument("--min-silence", type=float, nargs="+", default=[0.5, 0.7, 1.0])
+    parser.add_argument("--max-silence", type=float, nargs="+", default=[1.5, 2.0])
+    parser.add_argument("--onset", type=float, nargs="+", default=[0.5])
+    parser.add_argument("--offset", type=float, nargs="+", default=[0.35])
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="Raw probability that counts as speech for the reference end")
+    args = parser.parse_args()
+
+    files = sorted(args.corpus.glob("*.wav"))
+    if not files:
+        print(f"No WAV files in {args.corpus}", file=sys.stderr)
+        return 1
+
+    vad = load_vad()
+    probs_by_file = [score_file(vad, f) for f in files]
+    print(f"{len(files)} files, {sum(map(len, probs_by_file)) * FRAME_SEC:.0f}s of audio\n")
+
+    # Baseline: the old fixed rule (2s after the first frame below 0.4)
+    baseline = run(probs_by_file, args.threshold, onset=0.4, offset=0.4, smoothing=1.0,
+                   min_silence=2.0, max_silence=2.0, pause_factor=0.0)
+    print(f"{'fixed 2.0s (old)':<34} tail {baseline['tail_mean']:.2f}s "
+          f"(p90 {baseline['tail_p90']:.2f}s)  truncated {baseline['truncated']}")
+
+    for mn, mx, on, off in itertools.product(args.min_silence, args.max_silence, args.onset, args.offset):
+        if mn > mx or off > on:
+            continue
+        r = run(probs_by_file, args.threshold, onset=on, offset=off, min_silence=mn, max_silence=mx)
+        label = f"min {mn:.1f} max {mx:.1f} on {on:.2f} off {off:.2f}"
+        print(f"{label:<34} tail {r['tail_mean']:.2f}s (p90 {r['tail_p90']:.2f}s)  "
+              f"truncated {r['truncated']}  undecided {r['undecided']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+⏱ Hey Jarvis — Wake-word gate benchmark
+========================================
+Measures what the activity gate (gate.py) saves and what it costs:
+
+- Idle: replays a recording of the room with nobody saying the wake word
+  and reports the share of frames the gate lets through, gate overhead,
+  and openWakeWord CPU seconds per hour of idle audio, gated vs ungated
+  (priming replays included).
+- Recall: runs every wake-word clip through openWakeWord ungated and
+  gated (same priming as the listener), each preceded by a few seconds
+  of the idle recording so the noise floor has settled, and reports how
+  many clips are detected either way.
+
+WAVs must be 16kHz mono 16-bit; one wake word per positive clip.
+
+Usage:
+    python bench_gate.py --idle room_1h.wav --positives clips/
+    python bench_gate.py --idle room_1h.wav --positives clips/ --margin-db 6 9 12
+"""
+
+import sys
+import time
+import wave
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from gate import ActivityGate
+
+SAMPLE_RATE = 16000
+FRAME = 1280
+FRAME_SEC = FRAME / SAMPLE_RATE
+
+
+def load_wav(path: Path) -> np.ndarray:
+    with wave.open(str(path), 'rb') as wf:
+        if (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()) != (1, 2, SAMPLE_RATE):
+            raise ValueError(f"{path.name}: need mono 16-bit {SAMPLE_RATE}Hz")
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+
+def load_model():
+    from openwakeword.model import Model
+    return Model(wakeword_models=["hey_jarvis_v0.1"], inference_framework="onnx")
+
+
+def frames_of(audio: np.ndarray) -> np.ndarray:
+    n = len(audio) // FRAME
+    return audio[:n * FRAME].reshape(n, FRAME)
+
+
+def run_gate(audio: np.ndarray, **params) -> tuple[ActivityGate, list, float]:
+    """Gate decisions only. Returns (gate, frames to predict, gate seconds)."""
+    gate = ActivityGate(SAMPLE_RATE, FRAME, **params)
+    prime_frames = gate.prime_samples // FRAME
+    todo, fed_until = [], 0
+    t0 = time.perf_counter()
+    for i, frame in enumerate(frames_of(audio)):
+        if not gate.update(frame):
+            continue
+        if gate.opened:
+            todo.extend(range(max(i - prime_frames, fed_until), i))
+        todo.append(i)
+        fed_until = i + 1
+    return gate, todo, time.perf_counter() - t0
+
+
+def detected(oww, audio: np.ndarray, indices, threshold: float) -> bool:
+    oww.reset()
+    frames = frames_of(audio)
+    return any(max(oww.predict(frames[i]).values()) > threshold for i in indices)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the wake-word activity gate")
+    parser.add_argument("--idle", type=Path, required=True, help="WAV of the room without the wake word")
+    parser.add_argument("--positives", type=Path, help="Directory of WAV clips containing the wake word")
+    parser.add_argument("--margin-db", type=float, nargs="+", default=[9.0])
+    parser.add_argument("--flux-db", type=float, nargs="+", default=[3.0])
+    parser.add_argument("--no-flux", action="store_true", help="Energy only")
+    parser.add_argument("--lead", type=float, default=3.0, help="Seconds of idle audio before each clip")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    args = parser.parse_args()
+
+    idle = load_wav(args.idle)
+    idle_hours = len(idle) / SAMPLE_RATE / 3600
+    clips = sorted(args.positives.glob("*.wav")) if args.positives else []
+    lead = idle[:int(args.lead * SAMPLE_RATE)]
+    tail = np.zeros(SAMPLE_RATE, dtype=np.int16)
+    clip_audio = [np.concatenate([lead, load_wav(c), tail]) for c in clips]
+
+    oww = load_model()
+    sample = frames_of(idle)[:500]
+    for frame in sample[:20]:  # warm-up
+        oww.predict(frame)
+    t0 = time.perf_counter()
+    for frame in sample:
+        oww.predict(frame)
+    predict_s = (time.perf_counter() - t0) / len(sample)
+
+    ungated_cpu = len(frames_of(idle)) * predict_s / idle_hours
+    print(f"Idle: {idle_hours * 60:.1f} min, openWakeWord {predict_s * 1000:.2f}ms/frame")
+    print(f"{'ungated':<28} {ungated_cpu:7.1f} CPU-s/h idle")
+
+    baseline = None
+    if clip_audio:
+        baseline = sum(detected(oww, a, range(len(frames_of(a))), args.threshold) for a in clip_audio)
+        print(f"{'':<28} recall {baseline}/{len(clips)}")
+
+    for margin in args.margin_db:
+        for flux in args.flux_db:
+            params = dict(margin_db=margin, flux_db=flux, use_flux=not args.no_flux)
+            gate, todo, gate_s = run_gate(idle, **params)
+            cpu = (gate_s + len(todo) * predict_s) / idle_hours
+            label = f"margin {margin:.0f}dB" + ("" if args.no_flux else f" flux {flux:.1f}dB")
+            print(f"{label:<28} {cpu:7.1f} CPU-s/h idle ({cpu / ungated_cpu:.0%}), "
+                  f"pass {gate.pass_ratio:.1%}, {gate.opens / idle_hours:.0f} opens/h, "
+                  f"gate {gate_s / gate.frames * 1e6:.0f}µs/frame")
+            if clip_audio:
+                missed = [c.name for c, a in zip(clips, clip_audio)
+                          if not detected(oww, a, run_gate(a, **params)[1], args.threshold)]
+                print(f"{'':<28} recall {len(clips) - len(missed)}/{len(clips)} (ungated {baseline})"
+                      + (f", missed: {', '.join(missed[:5])}" if missed else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
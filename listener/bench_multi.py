@@ -0,0 +1,133 @@
+"""
+⏱ Hey Jarvis — Multi-microphone benchmark
+==========================================
+What each added microphone costs in one listener process: resident
+memory after loading, and CPU per second of audio while every stream is
+being scored (wake-word gate off, i.e. the worst case: nobody silent).
+
+- batched   — the listener's path: one BatchedWakeWord and one Silero
+              session shared by all streams, one model call per tick
+- separate  — one openwakeword.Model + one VAD per stream, as when
+              running a listener process per room (minus the extra
+              interpreters, so it understates that setup)
+
+Each (mode, N) runs in a fresh interpreter so RSS is not shared.
+
+Usage:
+    python bench_multi.py                     # N = 1..4, both modes
+    python bench_multi.py --max-streams 8 --seconds 60
+    python bench_multi.py --wav room.wav      # real audio instead of noise
+"""
+
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+from bench_vad import rss_mb
+
+SAMPLE_RATE = 16000
+FRAME = 1280
+VAD_FRAME = 512
+
+
+def load_audio(path: str, seconds: float):
+    import numpy as np
+    n = int(seconds * SAMPLE_RATE)
+    if path:
+        import wave
+        with wave.open(path, 'rb') as wf:
+            audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        return np.resize(audio, n)
+    return (np.random.default_rng(0).standard_normal(n) * 2000).astype(np.int16)
+
+
+def run(mode: str, streams: int, seconds: float, wav: str) -> dict:
+    """Measure one configuration in this process (called in a child interpreter)."""
+    rss_before = rss_mb()
+    audio = load_audio(wav, seconds)
+
+    from vad import load_vad, batch_probability
+    if mode == "batched":
+        from wake import BatchedWakeWord
+        wake = BatchedWakeWord()
+        states = [wake.add_stream(f"s{i}") for i in range(streams)]
+        base = load_vad()
+        vads = [base] + [base.clone() for _ in range(streams - 1)]
+
+        def score_wake(frame):
+            wake.predict(states, [frame] * streams)
+
+        def score_vad(frame):
+            batch_probability(vads, [frame] * streams)
+    else:
+        from openwakeword.model import Model
+        models = [Model(wakeword_models=["hey_jarvis_v0.1"], inference_framework="onnx")
+                  for _ in range(streams)]
+        vads = [load_vad() for _ in range(streams)]
+
+        def score_wake(frame):
+            for m in models:
+                m.predict(frame)
+
+        def score_vad(frame):
+            for v in vads:
+                v.probability(frame)
+
+    rss_loaded = rss_mb()
+
+    def cpu_per_audio_second(fn, size):
+        frames = [audio[i:i + size] for i in range(0, len(audio) - size + 1, size)]
+        for f in frames[:10]:  # warm-up
+            fn(f)
+        t0 = time.process_time()
+        for f in frames:
+            fn(f)
+        return (time.process_time() - t0) / (len(frames) * size / SAMPLE_RATE)
+
+    return {
+        "mode": mode,
+        "streams": streams,
+        "rss_mb": round(rss_loaded, 1),
+        "load_rss_mb": round(rss_loaded - rss_before, 1),
+        "wake_cpu_ms_per_s": round(cpu_per_audio_second(score_wake, FRAME) * 1000, 2),
+        "vad_cpu_ms_per_s": round(cpu_per_audio_second(score_vad, VAD_FRAME) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CPU and memory per added microphone")
+    parser.add_argument("modes", nargs="*", default=["batched", "separate"])
+    parser.add_argument("--max-streams", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=30.0, help="Audio per stream to score")
+    parser.add_argument("--wav", default="", help="16kHz mono WAV to score instead of noise")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "STREAMS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, streams = args.child
+        print(json.dumps(run(mode, int(streams), args.seconds, args.wav)))
+        return 0
+
+    print(f"{'mode':<10} {'N':>2} {'RSS MB':>8} {'+MB/mic':>8} {'wake ms/s':>10} {'+ms/s/mic':>10} {'vad ms/s':>9}")
+    for mode in args.modes:
+        first = None
+        for n in range(1, args.max_streams + 1):
+            cmd = [sys.executable, __file__, "--child", mode, str(n),
+                   "--seconds", str(args.seconds), "--wav", args.wav]
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"{mode:<10} {n:>2} failed: {proc.stderr.strip().splitlines()[-1:]}")
+                break
+            r = json.loads(proc.stdout.strip().splitlines()[-1])
+            first = first or r
+            per_mb = (r["rss_mb"] - first["rss_mb"]) / (n - 1) if n > 1 else 0.0
+            per_cpu = (r["wake_cpu_ms_per_s"] - first["wake_cpu_ms_per_s"]) / (n - 1) if n > 1 else 0.0
+            print(f"{mode:<10} {n:>2} {r['rss_mb']:>8.1f} {per_mb:>8.1f} {r['wake_cpu_ms_per_s']:>10.2f} "
+                  f"{per_cpu:>10.2f} {r['vad_cpu_ms_per_s']:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
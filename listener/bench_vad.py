@@ -0,0 +1,99 @@
+"""
+⏱ Hey Jarvis — VAD backend benchmark
+=====================================
+Compares the Silero VAD backends on cold start (imports + model load),
+resident memory and per-frame latency. Each backend runs in a fresh
+interpreter so import costs and RSS are not shared between them.
+
+Usage:
+    python bench_vad.py                  # all backends
+    python bench_vad.py onnx             # one backend
+    python bench_vad.py --frames 5000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (psutil if present, else /proc or getrusage)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def run_backend(backend: str, frames: int) -> dict:
+    """Measure one backend in this process (called in a child interpreter)."""
+    rss_before = rss_mb()
+    t0 = time.perf_counter()
+
+    import numpy as np
+    from vad import load_vad
+
+    vad = load_vad(backend=backend)
+    load_s = time.perf_counter() - t0
+    rss_loaded = rss_mb()
+
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal((frames, 512)) * 3000).astype(np.int16)
+
+    for frame in audio[:20]:  # warm-up
+        vad.probability(frame)
+
+    latencies = np.empty(frames)
+    for i, frame in enumerate(audio):
+        t = time.perf_counter()
+        vad.probability(frame)
+        latencies[i] = time.perf_counter() - t
+
+    return {
+        "backend": backend,
+        "startup_s": round(load_s, 3),
+        "rss_mb": round(rss_loaded, 1),
+        "rss_delta_mb": round(rss_loaded - rss_before, 1),
+        "frame_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 3),
+        "frame_p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 3),
+        "rtf": round(float(latencies.mean()) / (512 / 16000), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Silero VAD backends")
+    parser.add_argument("backends", nargs="*", default=["torch", "onnx"])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.backends[0], args.frames)))
+        return
+
+    print(f"{'backend':<8} {'startup':>9} {'RSS':>9} {'ΔRSS':>9} {'p50':>9} {'p99':>9} {'RTF':>8}")
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, __file__, backend, "--frames", str(args.frames), "--child"],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"{backend:<8} failed: {proc.stderr.strip().splitlines()[-1:]}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{r['backend']:<8} {r['startup_s']:>8.2f}s {r['rss_mb']:>7.0f}MB "
+              f"{r['rss_delta_mb']:>7.0f}MB {r['frame_p50_ms']:>7.3f}ms "
+              f"{r['frame_p99_ms']:>7.3f}ms {r['rtf']:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
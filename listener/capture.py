@@ -0,0 +1,336 @@
+"""
+🎧 Hey Jarvis — Audio Capture
+==============================
+Audio sources feeding a lossless ring buffer.
+
+The microphone source is callback-driven: PortAudio hands each input
+block to a callback on its own thread, which copies it into a
+preallocated int16 ring. Consumers never touch the device: they pull
+gap-free frames of whatever size they need (1280 samples for
+openWakeWord, 512 for Silero VAD) through independent FrameReader
+cursors. A slow inference step only delays processing; the audio itself
+is kept until the ring wraps.
+
+Replay sources (WAV file/directory, raw PCM on stdin) are pulled instead:
+the ring asks them for more audio only when a reader runs dry, on the
+reader's own thread. Replay therefore runs as fast as inference allows,
+never overruns, and is deterministic. Their clock() is the audio
+position rather than wall time, so silence/abort timeouts behave exactly
+as they would live.
+"""
+
+import sys
+import time
+import wave
+import threading
+from pathlib import Path
+
+import numpy as np
+
+
+class AudioRing:
+    """Mirrored int16 ring buffer addressed by absolute sample position.
+
+    Every sample is written twice (at i and i + capacity), so any window of
+    up to `capacity` samples is a single contiguous slice and can be handed
+    out as a numpy view without copying. Views stay valid until the writer
+    laps them, so consumers must copy anything they keep around.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buf = np.zeros(capacity * 2, dtype=np.int16)
+        self._written = 0
+        self._cond = threading.Condition()
+        self.closed = False
+        self.feeder = None  # pull-mode sources: called for more audio on demand
+
+    @property
+    def written(self) -> int:
+        """Absolute number of samples written since start."""
+        return self._written
+
+    @property
+    def oldest(self) -> int:
+        """Absolute position of the oldest sample still held."""
+        return max(0, self._written - self.capacity)
+
+    def write(self, samples: np.ndarray):
+        cap = self.capacity
+        n = len(samples)
+        skipped = 0
+        if n > cap:
+            skipped = n - cap
+            samples = samples[-cap:]
+            n = cap
+
+        start = (self._written + skipped) % cap
+        first = min(n, cap - start)
+        self._buf[start:start + first] = samples[:first]
+        self._buf[start + cap:start + cap + first] = samples[:first]
+        rest = n - first
+        if rest:
+            self._buf[:rest] = samples[first:]
+            self._buf[cap:cap + rest] = samples[first:]
+
+        with self._cond:
+            self._written += skipped + n
+            self._cond.notify_all()
+
+    def view(self, start: int, length: int) -> np.ndarray:
+        """Zero-copy view of samples [start, start + length)."""
+        if length > self.capacity:
+            raise ValueError(f"Window of {length} samples exceeds ring capacity {self.capacity}")
+        idx = start % self.capacity
+        return self._buf[idx:idx + length]
+
+    def wait_for(self, position: int, timeout: float = None) -> bool:
+        """Block until `position` samples have been written. False on timeout/close."""
+        if self.feeder is not None:
+            while self._written < position and not self.closed:
+                if not self.feeder():
+                    self.closed = True
+            return self._written >= position
+
+        with self._cond:
+            self._cond.wait_for(lambda: self._written >= position or self.closed, timeout)
+            return self._written >= position
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class FrameReader:
+    """Cursor that re-cuts the ring into consecutive fixed-size frames.
+
+    Each reader keeps its own position, so the wake-word and VAD readers can
+    slice the same stream into different frame sizes. `seek()` hands the
+    cursor over between them when the listener changes mode.
+    """
+
+    def __init__(self, ring: AudioRing, frame_size: int):
+        self.ring = ring
+        self.frame_size = frame_size
+        self.position = ring.written
+        self.dropped_samples = 0
+
+    def read(self, timeout: float = None) -> np.ndarray | None:
+        """Next frame as a view into the ring, or None on timeout."""
+        end = self.position + self.frame_size
+        if not self.ring.wait_for(end, timeout):
+            return None
+
+        # Fell further behind than the ring holds: jump to the oldest valid audio
+        if self.position < self.ring.oldest:
+            skip_to = self.ring.oldest
+            self.dropped_samples += skip_to - self.position
+            self.position = skip_to
+            return self.read(timeout)
+
+        frame = self.ring.view(self.position, self.frame_size)
+        self.position = end
+        return frame
+
+    def seek(self, position: int):
+        self.position = position
+
+    @property
+    def backlog(self) -> int:
+        """Samples captured but not yet read by this cursor."""
+        return self.ring.written - self.position
+
+    @property
+    def exhausted(self) -> bool:
+        """The source has ended and no full frame is left."""
+        return self.ring.closed and self.backlog < self.frame_size
+
+
+class AudioSource:
+    """Fills an AudioRing with 16kHz mono int16 audio."""
+
+    realtime = True
+
+    def __init__(self, ring: AudioRing, sample_rate: int):
+        self.ring = ring
+        self.sample_rate = sample_rate
+        self.overflows = 0
+
+    def start(self):
+        raise NotImplementedError
+
+    def stop(self):
+        self.ring.close()
+
+    def clock(self) -> float:
+        """Current time in seconds, as the recording logic should see it."""
+        return time.time()
+
+    def position_at(self, t: float) -> int | None:
+        """Ring position captured at perf_counter() time `t`, if this source runs on wall time."""
+        return None
+
+    def describe(self) -> str:
+        return type(self).__name__
+
+
+class MicrophoneSource(AudioSource):
+    """PyAudio input stream whose callback feeds the ring."""
+
+    def __init__(self, ring: AudioRing, sample_rate: int, channels: int,
+                 block_size: int, device_index: int = None):
+        super().__init__(ring, sample_rate)
+        self.channels = channels
+        self.block_size = block_size
+        self.device_index = device_index
+        self._pyaudio = None
+        self._audio = None
+        self._stream = None
+        self._anchor = None  # (perf_counter time, ring position) of one captured sample
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        if status & self._pyaudio.paInputOverflow:
+            self.overflows += 1
+        now = time.perf_counter()
+        adc = time_info.get("input_buffer_adc_time", 0.0)
+        current = time_info.get("current_time", 0.0)
+        captured_at = now - (current - adc if adc and current else frame_count / self.sample_rate)
+        self._anchor = (captured_at, self.ring.written)
+        self.ring.write(np.frombuffer(in_data, dtype=np.int16))
+        return None, self._pyaudio.paContinue
+
+    def position_at(self, t: float) -> int | None:
+        if self._anchor is None:
+            return None
+        captured_at, position = self._anchor
+        return position + int(round((t - captured_at) * self.sample_rate))
+
+    def start(self):
+        import pyaudio
+        self._pyaudio = pyaudio
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.sample_rate,
+            input=True,
+            input_device_index=self.device_index,
+            frames_per_buffer=self.block_size,
+            stream_callback=self._callback,
+        )
+        self._stream.start_stream()
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
+        super().stop()
+
+    def describe(self) -> str:
+        return f"microphone (device {self.device_index if self.device_index is not None else 'default'})"
+
+
+class _PulledSource(AudioSource):
+    """Non-realtime source, read block by block when a FrameReader needs audio."""
+
+    realtime = False
+
+    def __init__(self, ring: AudioRing, sample_rate: int, block_size: int):
+        super().__init__(ring, sample_rate)
+        self.block_size = block_size
+        self._blocks = None
+
+    def start(self):
+        self._blocks = self._iter_blocks()
+        self.ring.feeder = self._feed
+
+    def _feed(self) -> bool:
+        block = next(self._blocks, None)
+        if block is None:
+            return False
+        self.ring.write(block)
+        return True
+
+    def _iter_blocks(self):
+        raise NotImplementedError
+
+    def clock(self) -> float:
+        return self.ring.written / self.sample_rate
+
+
+class WavSource(_PulledSource):
+    """Replays a WAV file, or every *.wav in a directory in name order.
+
+    Files must be 16-bit mono at the listener's sample rate. `gap_sec` of
+    silence is inserted after each file so recordings don't run together.
+    """
+
+    def __init__(self, ring: AudioRing, sample_rate: int, block_size: int,
+                 path: Path, gap_sec: float = 1.0):
+        super().__init__(ring, sample_rate, block_size)
+        path = Path(path)
+        self.files = sorted(path.glob("*.wav")) if path.is_dir() else [path]
+        if not self.files:
+            raise FileNotFoundError(f"No WAV files in {path}")
+        self.gap_samples = int(gap_sec * sample_rate)
+
+    def _iter_blocks(self):
+        silence = np.zeros(self.block_size, dtype=np.int16)
+        for f in self.files:
+            with wave.open(str(f), 'rb') as wf:
+                if (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()) != (1, 2, self.sample_rate):
+                    raise ValueError(
+                        f"{f.name}: need mono 16-bit {self.sample_rate}Hz, got "
+                        f"{wf.getnchannels()}ch {wf.getsampwidth() * 8}-bit {wf.getframerate()}Hz"
+                    )
+                while True:
+                    data = wf.readframes(self.block_size)
+                    if not data:
+                        break
+                    yield np.frombuffer(data, dtype=np.int16)
+            for _ in range(0, self.gap_samples, self.block_size):
+                yield silence
+
+    def describe(self) -> str:
+        return f"replay of {len(self.files)} WAV file(s)"
+
+
+class PipeSource(_PulledSource):
+    """Raw 16kHz mono int16 PCM from a binary stream (stdin by default)."""
+
+    def __init__(self, ring: AudioRing, sample_rate: int, block_size: int, stream=None):
+        super().__init__(ring, sample_rate, block_size)
+        self.stream = stream or sys.stdin.buffer
+
+    def _iter_blocks(self):
+        want = self.block_size * 2
+        carry = b""
+        while True:
+            data = self.stream.read(want)
+            if not data:
+                return
+            data = carry + data
+            usable = len(data) - len(data) % 2
+            carry = data[usable:]
+            if usable:
+                yield np.frombuffer(data[:usable], dtype=np.int16)
+
+    def describe(self) -> str:
+        return "raw PCM on stdin"
+
+
+def open_source(spec: str, ring: AudioRing, sample_rate: int, channels: int,
+                block_size: int, gap_sec: float = 1.0) -> AudioSource:
+    """Build a source from a spec: 'mic', 'mic:<device index>', '-', or a WAV path."""
+    if spec == "mic" or spec.startswith("mic:"):
+        _, _, index = spec.partition(":")
+        return MicrophoneSource(ring, sample_rate, channels, block_size,
+                                device_index=int(index) if index else None)
+    if spec == "-":
+        return PipeSource(ring, sample_rate, block_size)
+    return WavSource(ring, sample_rate, block_size, Path(spec), gap_sec)
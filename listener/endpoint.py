@@ -0,0 +1,101 @@
+"""
+🔚 Hey Jarvis — End-of-utterance detection
+===========================================
+Decides when the user has finished speaking from per-frame Silero
+probabilities, instead of waiting a fixed 2s after the first non-speech
+frame.
+
+- Smoothing: an exponential moving average of the probability, so a
+  single noisy frame neither starts nor ends speech.
+- Hysteresis: speech starts above `onset` and only ends below the lower
+  `offset`, so a probability hovering near one threshold doesn't flap.
+- Adaptive trailing silence: short commands ("apaga la luz") end after
+  `min_silence`; the required silence grows with utterance length up to
+  `max_silence`, and never drops below `pause_factor` × the speaker's
+  typical mid-sentence pause (remembered across utterances).
+
+Frame-counted, so it behaves identically live and in replay.
+bench_endpoint.py sweeps these parameters over a WAV corpus.
+"""
+
+import collections
+
+
+class Endpointer:
+    """Feed one VAD probability per frame; update() returns True at end of utterance."""
+
+    def __init__(self, frame_sec: float, onset: float = 0.5, offset: float = 0.35,
+                 smoothing: float = 0.35, min_silence: float = 0.7, max_silence: float = 2.0,
+                 length_ramp: float = 4.0, pause_factor: float = 1.5,
+                 min_pause: float = 0.15):
+        self.frame_sec = frame_sec
+        self.onset = onset
+        self.offset = offset
+        self.smoothing = smoothing
+        self.min_silence = min_silence
+        self.max_silence = max_silence
+        self.length_ramp = length_ramp
+        self.pause_factor = pause_factor
+        self.min_pause = min_pause
+        self.recent_pauses = collections.deque(maxlen=20)  # seconds, kept across reset()
+        self.reset()
+
+    def reset(self):
+        self.smoothed = 0.0
+        self.in_speech = False
+        self.frames = 0
+        self.first_speech = None  # frame index
+        self.last_speech = None   # frame index
+        self.silence_frames = 0
+
+    @property
+    def speech_started(self) -> bool:
+        return self.first_speech is not None
+
+    @property
+    def speech_frames(self) -> int:
+        """Frames from the first to the last speech frame, 0 before speech."""
+        if self.first_speech is None:
+            return 0
+        return self.last_speech - self.first_speech + 1
+
+    @property
+    def silence_sec(self) -> float:
+        return self.silence_frames * self.frame_sec
+
+    def required_silence(self) -> float:
+        """Trailing silence needed to end the current utterance."""
+        ramp = min(1.0, self.speech_frames * self.frame_sec / self.length_ramp)
+        need = self.min_silence + (self.max_silence - self.min_silence) * ramp
+        if self.recent_pauses:
+            pauses = sorted(self.recent_pauses)
+            typical = pauses[int(0.9 * (len(pauses) - 1))]
+            need = max(need, typical * self.pause_factor)
+        return min(need, self.max_silence)
+
+    def update(self, probability: float) -> bool:
+        self.smoothed += self.smoothing * (probability - self.smoothed)
+
+        if self.in_speech:
+            if self.smoothed < self.offset:
+                self.in_speech = False
+        elif self.smoothed > self.onset:
+            self.in_speech = True
+            # Speech resumed after a pause: learn how long this speaker pauses
+            if self.speech_started and self.silence_sec >= self.min_pause:
+                self.recent_pauses.append(self.silence_sec)
+
+        index = self.frames
+        self.frames += 1
+
+        if self.in_speech:
+            if self.first_speech is None:
+                self.first_speech = index
+            self.last_speech = index
+            self.silence_frames = 0
+            return False
+
+        if not self.speech_started:
+            return False
+        self.silence_frames += 1
+        return self.silence_sec >= self.required_silence()
@@ -0,0 +1,213 @@
+"""
+🔔 Hey Jarvis — Feedback Cues
+==============================
+Ding / done / error played from memory through one persistent output
+stream, instead of a winsound call or an `aplay` process per cue.
+
+The WAVs are decoded once at startup and resampled to the output
+device's rate. The PortAudio callback copies the current cue into each
+output block (silence otherwise), so starting a cue costs one attribute
+write and waits at most one 5ms block plus the device's output latency.
+On Windows the WASAPI device is preferred: its latency is a few ms,
+where MME adds ~100ms.
+
+PortAudio also says when each block reaches the DAC, so every cue comes
+back as a Playback with the exact perf_counter() times its first and
+last sample are heard. The listener uses those to blank the cue out of
+the microphone audio (capture.MicrophoneSource.position_at) rather than
+sleeping and hoping the ding is over.
+
+Run directly to measure start latency on this machine:
+    python feedback.py [--device N] [--count 20]
+"""
+
+import sys
+import time
+import wave
+import threading
+from pathlib import Path
+
+import numpy as np
+
+BLOCK_SEC = 0.005
+
+
+class Playback:
+    """One cue being played; times are perf_counter() seconds."""
+
+    def __init__(self, name: str, samples: np.ndarray, requested_at: float):
+        self.name = name
+        self.samples = samples
+        self.requested_at = requested_at
+        self.started_at = None   # first sample at the DAC
+        self.ended_at = None     # last sample at the DAC
+        self.offset = 0          # samples already handed to the device
+        self.started = threading.Event()
+        self.interrupted = False
+
+    @property
+    def start_latency(self) -> float | None:
+        return self.started_at - self.requested_at if self.started_at is not None else None
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the last sample has been heard (or the cue was cut short)."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        if not self.started.wait(timeout):
+            return False
+        remaining = self.ended_at - time.perf_counter()
+        if deadline is not None:
+            remaining = min(remaining, deadline - time.perf_counter())
+        if remaining > 0:
+            time.sleep(remaining)
+        return time.perf_counter() >= self.ended_at
+
+
+def load_cue(path: Path, rate: int) -> np.ndarray:
+    """Decode a 16-bit WAV to mono int16 at `rate`."""
+    with wave.open(str(path), 'rb') as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path.name}: need 16-bit PCM")
+        audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        channels, source_rate = wf.getnchannels(), wf.getframerate()
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    return resample(audio, source_rate, rate)
+
+
+def resample(audio: np.ndarray, source_rate: int, rate: int) -> np.ndarray:
+    """Linear-interpolation resample of mono samples to int16 at `rate`."""
+    if source_rate != rate:
+        n = int(round(len(audio) * rate / source_rate))
+        audio = np.interp(np.arange(n) * (source_rate / rate), np.arange(len(audio)), audio)
+    return np.ascontiguousarray(audio, dtype=np.int16)
+
+
+def pick_output_device(pyaudio, audio, device_index: int = None) -> dict:
+    """The requested output device, else the WASAPI default on Windows, else PortAudio's default."""
+    if device_index is not None:
+        return audio.get_device_info_by_index(device_index)
+    if sys.platform == "win32":
+        try:
+            wasapi = audio.get_host_api_info_by_type(pyaudio.paWASAPI)
+            if wasapi.get("defaultOutputDevice", -1) >= 0:
+                return audio.get_device_info_by_index(wasapi["defaultOutputDevice"])
+        except (OSError, ValueError):
+            pass
+    return audio.get_default_output_device_info()
+
+
+class FeedbackPlayer:
+    """Preloaded cues on a persistent, callback-driven output stream."""
+
+    def __init__(self, sounds: dict, device_index: int = None):
+        self.paths = {name: Path(p) for name, p in sounds.items()}
+        self.device_index = device_index
+        self.rate = None
+        self.cues = {}
+        self.output_latency = None
+        self.device_name = None
+        self._current = None
+        self._lock = threading.Lock()
+        self._pyaudio = None
+        self._audio = None
+        self._stream = None
+
+    def start(self) -> "FeedbackPlayer":
+        import pyaudio
+        self._pyaudio = pyaudio
+        self._audio = pyaudio.PyAudio()
+        try:
+            device = pick_output_device(pyaudio, self._audio, self.device_index)
+            self.rate = int(device["defaultSampleRate"])
+            self.cues = {name: load_cue(p, self.rate) for name, p in self.paths.items() if p.exists()}
+            self._stream = self._audio.open(
+                format=pyaudio.paInt16,
+                channels=1,
+                rate=self.rate,
+                output=True,
+                output_device_index=int(device["index"]),
+                frames_per_buffer=max(int(self.rate * BLOCK_SEC), 32),
+                stream_callback=self._callback,
+            )
+            self._stream.start_stream()
+        except Exception:
+            self.stop()
+            raise
+        self.output_latency = self._stream.get_output_latency()
+        self.device_name = device["name"]
+        return self
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
+
+    def play(self, name: str) -> Playback | None:
+        """Start a cue (cutting off any cue still playing). Never blocks."""
+        samples = self.cues.get(name)
+        if samples is None or self._stream is None:
+            return None
+        playback = Playback(name, samples, time.perf_counter())
+        with self._lock:
+            previous, self._current = self._current, playback
+        if previous is not None and previous.offset < len(previous.samples):
+            previous.interrupted = True
+        return playback
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        out = np.zeros(frame_count, dtype=np.int16)
+        playback = self._current
+        if playback is not None:
+            now = time.perf_counter()
+            dac = time_info.get("output_buffer_dac_time", 0.0)
+            current = time_info.get("current_time", 0.0)
+            # Some host APIs report no timing: assume the nominal latency
+            block_at = now + (dac - current if dac and current else self.output_latency or 0.0)
+
+            if not playback.started.is_set():
+                playback.started_at = block_at
+                playback.ended_at = block_at + len(playback.samples) / self.rate
+                playback.started.set()
+            chunk = playback.samples[playback.offset:playback.offset + frame_count]
+            out[:len(chunk)] = chunk
+            playback.offset += len(chunk)
+            if playback.offset >= len(playback.samples):
+                with self._lock:
+                    if self._current is playback:
+                        self._current = None
+        return out.tobytes(), self._pyaudio.paContinue
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Measure feedback cue start latency")
+    parser.add_argument("--device", type=int, default=None, help="Output device index")
+    parser.add_argument("--count", type=int, default=20, help="Cues per sound")
+    args = parser.parse_args()
+
+    sounds_dir = Path(__file__).parent / "sounds"
+    player = FeedbackPlayer({n: sounds_dir / f"{n}.wav" for n in ("ding", "done", "error")},
+                            args.device).start()
+    print(f"{player.device_name} @ {player.rate}Hz, output latency {player.output_latency * 1000:.1f}ms")
+    try:
+        for name in player.cues:
+            latencies = []
+            for _ in range(args.count):
+                playback = player.play(name)
+                playback.wait(2.0)
+                latencies.append(playback.start_latency * 1000)
+                time.sleep(0.05)
+            latencies.sort()
+            print(f"{name:<6} start latency p50 {latencies[len(latencies) // 2]:.1f}ms "
+                  f"max {latencies[-1]:.1f}ms")
+    finally:
+        player.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+🚪 Hey Jarvis — Wake-word activity gate
+========================================
+A cheap per-frame check in front of openWakeWord, so a silent room
+doesn't cost 12.5 model inferences a second around the clock.
+
+- Energy: frame RMS in dBFS against an adaptive noise floor. The floor
+  follows quieter audio quickly and louder audio slowly, so a fan or
+  traffic that stays on is absorbed within ~15s while a one-second wake
+  word barely moves it.
+- Spectral flux: mean rise of 16 log band energies since the previous
+  frame. Catches speech onsets that don't lift the broadband level much,
+  e.g. talking over steady noise.
+- Hangover: once open, the gate stays open for `hangover_sec` after the
+  last active frame, long enough for "hey jarvis" to finish scoring.
+
+openWakeWord keeps ~2s of melspectrogram/embedding history internally.
+Frames skipped while the gate is closed would leave that history stale,
+so when the gate opens the listener first replays up to `prime_sec` of
+the skipped audio from the ring through the model (see
+hey_jarvis.prime_wake_model). The model then sees the same contiguous
+audio it would have seen ungated.
+
+bench_gate.py measures CPU saved on idle audio and recall on a replay set.
+"""
+
+import numpy as np
+
+
+class ActivityGate:
+    """Feed one int16 frame per call; update() returns True when openWakeWord should run."""
+
+    BANDS = 16
+
+    def __init__(self, sample_rate: int, frame_size: int, margin_db: float = 9.0,
+                 flux_db: float = 3.0, min_level_db: float = -65.0,
+                 hangover_sec: float = 1.0, prime_sec: float = 2.0, use_flux: bool = True):
+        self.frame_sec = frame_size / sample_rate
+        self.margin_db = margin_db
+        self.flux_db = flux_db
+        self.min_level_db = min_level_db
+        self.hangover_frames = int(round(hangover_sec / self.frame_sec))
+        self.prime_samples = int(prime_sec * sample_rate)
+        self.use_flux = use_flux
+        self._window = np.hanning(frame_size).astype(np.float32)
+        self._bins = (frame_size // 2) // self.BANDS * self.BANDS
+
+        self.floor_db = None
+        self._prev_bands = None
+        self._hold = 0
+        self.is_open = False
+        self.opened = False  # True only on the frame that opened the gate
+        self.frames = 0
+        self.passed = 0
+        self.opens = 0
+
+    @property
+    def pass_ratio(self) -> float:
+        return self.passed / self.frames if self.frames else 1.0
+
+    def _features(self, frame: np.ndarray) -> tuple[float, float]:
+        x = frame.astype(np.float32) * (1.0 / 32768.0)
+        level_db = 10.0 * np.log10(float(np.dot(x, x)) / len(x) + 1e-10)
+        if not self.use_flux:
+            return level_db, 0.0
+
+        power = np.abs(np.fft.rfft(x * self._window))[1:self._bins + 1] ** 2
+        bands = 10.0 * np.log10(power.reshape(self.BANDS, -1).sum(axis=1) + 1e-10)
+        prev, self._prev_bands = self._prev_bands, bands
+        if prev is None:
+            return level_db, 0.0
+        return level_db, float(np.maximum(bands - prev, 0.0).mean())
+
+    def update(self, frame: np.ndarray) -> bool:
+        level_db, flux = self._features(frame)
+        if self.floor_db is None:
+            self.floor_db = level_db
+
+        active = level_db > self.min_level_db and (
+            level_db > self.floor_db + self.margin_db
+            or (self.use_flux and flux > self.flux_db)
+        )
+
+        # Asymmetric floor: falls fast, rises slowly (slower still during activity)
+        if level_db < self.floor_db:
+            rate = 0.1
+        else:
+            rate = 0.005 if active else 0.01
+        self.floor_db += rate * (level_db - self.floor_db)
+
+        if active:
+            self._hold = self.hangover_frames
+        elif self._hold:
+            self._hold -= 1
+
+        was_open = self.is_open
+        self.is_open = active or self._hold > 0
+        self.opened = self.is_open and not was_open
+        if self.opened:
+            self.opens += 1
+
+        self.frames += 1
+        if self.is_open:
+            self.passed += 1
+        return self.is_open
@@ -12,25 +12,39 @@ V2 improvements:
 - VAD reset between recordings
 - Max recording 2 min
 - Rotated file logging
+- Silero VAD on onnxruntime (see vad.py) — no torch in the listener
+- Callback capture into a ring buffer (see capture.py): inference stalls
+  never drop audio, and VAD sees every sample in conversation mode
+- Energy/spectral-flux gate (see gate.py): openWakeWord only runs while
+  there is acoustic activity
+- Several microphones in one process (--source name=mic:N, repeated):
+  one set of models, one batched wake-word/VAD call per tick (see wake.py)
+- Feedback cues preloaded on a persistent output stream (see feedback.py);
+  the cue itself is blanked out of the microphone audio
+- Barge-in: the wake word (or conversation-mode speech) stops the response
+  that is playing (see barge_in.py)
 
 Runs on Windows natively (needs microphone access).
 WSL2 has no mic access — that's why this runs on Windows.
 """
 
+import time
+_STARTUP_T0 = time.perf_counter()  # before any heavy import, for startup timings
+
 import os
 import sys
 import wave
-import time
 import uuid
+import json
 import logging
-import collections
+import argparse
 import threading
+import collections
 from pathlib import Path
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 
 import numpy as np
-import pyaudio
 
 # ─── Fix headless stdout (pythonw.exe) ───────────────────────────────────
 if sys.stdout is None or not hasattr(sys.stdout, 'write'):
@@ -38,26 +52,71 @@ if sys.stdout is None or not hasattr(sys.stdout, 'write'):
     sys.stdout = _devnull
     sys.stderr = _devnull
 
-from openwakeword.model import Model as OWWModel
+from capture import AudioRing, FrameReader, open_source
+from vad import VAD_BACKEND, batch_probability, load_vad
+from wake import BatchedWakeWord, WakeWordStream, WAKE_MODEL
+from transport import TransportClient
+from metrics import ListenerMetrics
+from endpoint import Endpointer
+from gate import ActivityGate
+from feedback import FeedbackPlayer
+from barge_in import BargeInSender
 
 # ─── Configuration ───────────────────────────────────────────────────────
 
 # Wake word
 WAKE_THRESHOLD = float(os.environ.get("HJ_WAKE_THRESHOLD", "0.5"))
+# Skip wake-word inference on frames with no acoustic activity (see gate.py)
+WAKE_GATE = os.environ.get("HJ_WAKE_GATE", "1") == "1"
 
 # Audio settings
 SAMPLE_RATE = 16000
 CHANNELS = 1
 CHUNK_MS = 80
 CHUNK_SIZE = int(SAMPLE_RATE * CHUNK_MS / 1000)  # 1280 samples
-FORMAT = pyaudio.paInt16
 VAD_CHUNK_SIZE = 512  # Silero VAD expects 512 samples at 16kHz
 
 # Recording
-SILENCE_TIMEOUT_SEC = 2.0   # Stop after 2s silence
 MAX_RECORDING_SEC = 120     # Max 2 minutes
 NO_SPEECH_ABORT_SEC = 5.0   # Abort if no speech in 5s
 PRE_BUFFER_SEC = 0.5        # Keep 0.5s audio before wake word
+TRIM_PAD_SEC = 0.3          # Trailing silence kept after the last speech frame
+
+# End of utterance (see endpoint.py): required trailing silence adapts
+# between MIN (short commands) and MAX (long utterances / slow speakers)
+ENDPOINT_MIN_SILENCE_SEC = float(os.environ.get("HJ_ENDPOINT_MIN_SILENCE", "0.7"))
+ENDPOINT_MAX_SILENCE_SEC = float(os.environ.get("HJ_ENDPOINT_MAX_SILENCE", "2.0"))
+ENDPOINT_ONSET = float(os.environ.get("HJ_ENDPOINT_ONSET", "0.5"))
+ENDPOINT_OFFSET = float(os.environ.get("HJ_ENDPOINT_OFFSET", "0.35"))
+
+# Recording container: flac (lossless), opus (speech codec, smallest) or wav.
+# flac/opus need the soundfile package; without it recordings fall back to wav
+RECORDING_FORMAT = os.environ.get("HJ_RECORDING_FORMAT", "flac")
+
+# Streaming: append PCM to the shared folder while recording so the watcher
+# can start transcribing during the trailing-silence window
+STREAM_RECORDINGS = os.environ.get("HJ_STREAM_RECORDINGS", "0") == "1"
+
+# Transport: send finished recordings straight to the watcher over a socket
+# (e.g. tcp://127.0.0.1:18790); the shared folder is used when it's down
+TRANSPORT_URL = os.environ.get("HJ_TRANSPORT_URL", "")
+
+# Barge-in: stop the response playing when the user starts talking.
+# 1 = on wake word and conversation-mode speech, wake = wake word only
+# (if the microphone hears the speakers), 0 = off (default)
+BARGE_IN = os.environ.get("HJ_BARGE_IN", "0")
+PLAYER_URL = os.environ.get("HJ_PLAYER_LISTEN", "")  # the player's socket, same config.env
+RESPONSE_DIR = Path(os.environ.get(
+    "HJ_RESPONSE_DIR",
+    os.path.join(os.path.expanduser("~"), "oye-ikigai-responses")
+))
+
+# Capture ring: how far inference may fall behind before audio is lost
+RING_BUFFER_SEC = 30.0
+READ_TIMEOUT_SEC = 1.0
+
+# Startup: VAD loads on the first wake word unless preloaded
+VAD_PRELOAD = os.environ.get("HJ_VAD_PRELOAD", "0") == "1"
 
 # Conversation mode
 CONVERSATION_WINDOW_SEC = 10.0  # After response, listen again for 10s
@@ -69,10 +128,15 @@ AUDIO_OUTPUT_DIR = Path(os.environ.get(
 ))
 
 # Sounds
+SOUNDS_ENABLED = os.environ.get("HJ_SOUNDS", "1") == "1"
 SOUNDS_DIR = Path(__file__).parent / "sounds"
 SOUND_DING = SOUNDS_DIR / "ding.wav"
 SOUND_DONE = SOUNDS_DIR / "done.wav"
 SOUND_ERROR = SOUNDS_DIR / "error.wav"
+SOUNDS = {"ding": SOUND_DING, "done": SOUND_DONE, "error": SOUND_ERROR}
+SOUND_DEVICE = os.environ.get("HJ_SOUND_DEVICE", "")  # output device index (default: WASAPI default on Windows)
+CUE_ECHO_SEC = 0.05  # room echo blanked out after a cue ends
+CUE_START_TIMEOUT_SEC = 1.0  # a cue not at the DAC by then never will be (output stream stalled)
 
 # Logging
 LOG_DIR = Path(__file__).parent / "logs"
@@ -94,42 +158,125 @@ _ch = logging.StreamHandler()
 _ch.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s", datefmt="%H:%M:%S"))
 logger.addHandler(_ch)
 
+# Performance telemetry (see metrics.py)
+STATS_FILE = LOG_DIR / "hey_jarvis_stats.json"
+STATS_INTERVAL = 30
 
-# ─── Silero VAD ──────────────────────────────────────────────────────────
+metrics = ListenerMetrics(SAMPLE_RATE)
 
-class SileroVAD:
-    """Voice Activity Detection using Silero VAD."""
 
-    def __init__(self, threshold: float = 0.4):
-        import torch
-        self.torch = torch
-        self.threshold = threshold
-        self.model, _ = torch.hub.load(
-            repo_or_dir='snakers4/silero-vad',
-            model='silero_vad',
-            force_reload=False,
-            trust_repo=True
-        )
-        self.model.eval()
-        logger.info("Silero VAD loaded (threshold=%.2f)", threshold)
+def make_endpointer() -> Endpointer:
+    return Endpointer(
+        VAD_CHUNK_SIZE / SAMPLE_RATE,
+        onset=ENDPOINT_ONSET,
+        offset=ENDPOINT_OFFSET,
+        min_silence=ENDPOINT_MIN_SILENCE_SEC,
+        max_silence=ENDPOINT_MAX_SILENCE_SEC,
+    )
 
-    def is_speech(self, audio_chunk_int16: np.ndarray) -> bool:
-        audio_float = audio_chunk_int16.astype(np.float32) / 32768.0
-        tensor = self.torch.from_numpy(audio_float)
-        confidence = self.model(tensor, SAMPLE_RATE).item()
-        return confidence > self.threshold
 
-    def reset(self):
-        """Reset VAD state between recordings."""
-        self.model.reset_states()
+# ─── Startup ─────────────────────────────────────────────────────────────
+
+def startup_elapsed() -> float:
+    """Seconds since the interpreter started importing this module."""
+    return time.perf_counter() - _STARTUP_T0
+
+
+class BackgroundLoader:
+    """Builds a model on a worker thread; get() blocks until it is ready."""
+
+    def __init__(self, name: str, factory):
+        self.name = name
+        self._factory = factory
+        self._thread = None
+        self._value = None
+        self._error = None
+        self._done = threading.Event()
+        self.elapsed = None
+
+    def start(self) -> "BackgroundLoader":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"load-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        t0 = time.perf_counter()
+        try:
+            self._value = self._factory()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.elapsed = time.perf_counter() - t0
+            self._done.set()
+        if self._error is None:
+            logger.info("⏱ startup: %s loaded in %.2fs (t=%.2fs)",
+                        self.name, self.elapsed, startup_elapsed())
+        else:
+            logger.error("Loading %s failed: %s", self.name, self._error)
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set() and self._error is None
+
+    def get(self):
+        self.start()
+        self._done.wait()
+        if self._error is not None:
+            raise RuntimeError(f"Failed to load {self.name}") from self._error
+        return self._value
+
+
+def load_wake_model() -> BatchedWakeWord:
+    # onnxruntime is imported here, on the loader thread, so its import cost
+    # overlaps with opening the microphones instead of delaying them.
+    # Only the configured wake word (hey_jarvis) — not all built-ins.
+    return BatchedWakeWord(WAKE_MODEL)
+
+
+def prime_wake_model(wake: BatchedWakeWord, stream: WakeWordStream, ring: AudioRing,
+                     start: int, end: int) -> float:
+    """Run the wake-word model over the gated-out audio in [start, end), whole
+    frames ending at `end`, so the stream's feature history is contiguous again.
+    Returns the highest score, in case the wake word began before the gate opened.
+    """
+    t0 = time.perf_counter()
+    best = 0.0
+    for pos in range(end - (end - start) // CHUNK_SIZE * CHUNK_SIZE, end, CHUNK_SIZE):
+        best = max(best, wake.predict([stream], [ring.view(pos, CHUNK_SIZE)])[0])
+    metrics.observe("wake_prime", time.perf_counter() - t0)
+    return best
 
 
 # ─── Audio Feedback ──────────────────────────────────────────────────────
 
-def play_sound(sound_path: Path):
-    """Play a WAV sound file (non-blocking)."""
-    if not sound_path.exists():
+feedback = None  # FeedbackPlayer, once started
+
+
+def start_feedback():
+    """Open the cue output stream; without it cues fall back to one-shot playback."""
+    global feedback
+    t0 = time.perf_counter()
+    try:
+        feedback = FeedbackPlayer(SOUNDS, int(SOUND_DEVICE) if SOUND_DEVICE else None).start()
+    except Exception as e:
+        logger.warning("Feedback output stream unavailable (%s), cues will play one-shot", e)
         return
+    logger.info("🔔 Feedback cues on %s @ %dHz (output latency %.1fms, ready in %.0fms)",
+                feedback.device_name, feedback.rate, feedback.output_latency * 1000,
+                (time.perf_counter() - t0) * 1000)
+
+
+def play_sound(name: str):
+    """Start a feedback cue (non-blocking). Returns its Playback on the cue stream."""
+    sound_path = SOUNDS[name]
+    if not SOUNDS_ENABLED or not sound_path.exists():
+        return None
+    t0 = time.perf_counter()
+    if feedback is not None:
+        playback = feedback.play(name)
+        metrics.observe("sound", time.perf_counter() - t0)
+        return playback
     try:
         if sys.platform == "win32":
             import winsound
@@ -140,222 +287,664 @@ def play_sound(sound_path: Path):
                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     except Exception as e:
         logger.warning("Sound playback failed: %s", e)
+    metrics.observe("sound", time.perf_counter() - t0)
+    return None
 
 
 # ─── Pre-buffer ──────────────────────────────────────────────────────────
 
 class PreBuffer:
-    """Circular buffer that keeps the last N seconds of audio chunks."""
-
-    def __init__(self, seconds: float, chunk_size: int, sample_rate: int):
-        # How many chunks fit in the buffer
-        samples_per_chunk = chunk_size
-        chunks_per_second = sample_rate / samples_per_chunk
-        max_chunks = int(seconds * chunks_per_second)
-        self.buffer = collections.deque(maxlen=max(max_chunks, 1))
+    """Last N seconds of audio before a given position, as a view into the capture ring."""
 
-    def add(self, chunk: bytes):
-        self.buffer.append(chunk)
+    def __init__(self, ring: AudioRing, seconds: float, sample_rate: int):
+        self.ring = ring
+        self.size = min(int(seconds * sample_rate), ring.capacity)
+        self._floor = 0
 
-    def get_all(self) -> list:
-        return list(self.buffer)
+    def get(self, end: int) -> np.ndarray:
+        """Audio leading up to absolute sample `end` (zero-copy)."""
+        start = max(end - self.size, self._floor, self.ring.oldest)
+        return self.ring.view(start, max(end - start, 0))
 
-    def clear(self):
-        self.buffer.clear()
+    def clear(self, position: int):
+        """Forget everything before `position` (e.g. audio already recorded)."""
+        self._floor = position
 
 
 # ─── Recording ───────────────────────────────────────────────────────────
 
-def record_with_vad(stream, vad: SileroVAD, pre_frames: list = None) -> bytes | None:
-    """Record audio until silence detected. Returns PCM bytes or None if no speech."""
-    logger.info("🎤 Recording... (speak now)")
-    frames = list(pre_frames or [])
-    silence_start = None
-    first_speech_detected = False
-    recording_start = time.time()
-
-    while True:
-        elapsed = time.time() - recording_start
+class RecordingStream:
+    """Recording published to the watcher while it is still being captured.
+
+    Two files share one stem in the audio folder:
+      ikigai_<ts>_<id>.pcm   raw 16kHz mono int16, append-only
+      ikigai_<ts>_<id>.json  state marker, atomically replaced on change:
+        {"state": "speaking" | "trailing" | "complete" | "aborted",
+         "speech_end": <samples up to the last speech frame>,
+         "samples": <samples written so far>}
+
+    "trailing" means speech has stopped and the silence timeout is running;
+    the watcher may transcribe [0, speech_end) speculatively and reuse that
+    result if the recording completes with the same speech_end.
+    """
+
+    trims_silence = False
+
+    def __init__(self, directory: Path, tag: str = None):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.name = new_recording_name(tag)
+        self.pcm_path = directory / f"{self.name}.pcm"
+        self.meta_path = directory / f"{self.name}.json"
+        self.samples = 0
+        self.speech_end = 0
+        self.state = None
+        self._f = open(self.pcm_path, 'wb')
+        self.mark("speaking")
+
+    def write(self, pcm: bytes):
+        t0 = time.perf_counter()
+        self._f.write(pcm)
+        self._f.flush()
+        self.samples += len(pcm) // 2
+        metrics.observe("stream_write", time.perf_counter() - t0)
+
+    def mark(self, state: str):
+        if state == self.state:
+            return
+        self.state = state
+        tmp = self.meta_path.with_suffix(".json.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"state": state, "speech_end": self.speech_end, "samples": self.samples}, f)
+        os.replace(tmp, self.meta_path)
+
+    def finish(self, ok: bool):
+        self._f.close()
+        self.state = None  # always publish the final sample count
+        self.mark("complete" if ok else "aborted")
+        if ok:
+            logger.info("💾 Streamed: %s.pcm (%.1fs)", self.name, self.samples / SAMPLE_RATE)
+
+
+class Recording:
+    """One recording in progress, advanced a VAD frame at a time by its channel.
+
+    Frames go straight to `sink` as they are captured, so memory stays
+    bounded however long the recording. A RecordingWriter receives the
+    audio with the trailing silence trimmed; a RecordingStream receives
+    everything immediately, plus speech/silence state for the watcher.
+    `clock` drives the abort/max-duration timeouts (the audio position
+    during replay).
+    """
+
+    def __init__(self, sink: "RecordingWriter | RecordingStream", endpointer: Endpointer,
+                 pre_audio: np.ndarray | None, clock=time.time, label: str = ""):
+        self.sink = sink
+        self.endpointer = endpointer
+        self.clock = clock
+        self.label = label
+        self.pre_samples = len(pre_audio) if pre_audio is not None else 0
+        if self.pre_samples:
+            sink.write(pre_audio.tobytes())
+        self._stream = None if sink.trims_silence else sink
+        self._held = []  # frames after the last speech frame, written only if speech resumes
+        self._pad_frames = -(-int(TRIM_PAD_SEC * SAMPLE_RATE) // VAD_CHUNK_SIZE)
+        self._aborted = False
+        endpointer.reset()
+        self.started = clock()
+        logger.info("🎤 %sRecording... (speak now)", label)
+
+    def step(self, frame: np.ndarray, probability: float) -> bool:
+        """Add one frame and its speech probability. True once the recording is over."""
+        ep = self.endpointer
+        data = frame.tobytes()
+        ended = ep.update(probability)
+
+        if self._stream is not None:
+            self._stream.write(data)
+            if ep.speech_started:
+                if ep.in_speech:
+                    self._stream.speech_end = self._stream.samples
+                    self._stream.mark("speaking")
+                else:
+                    self._stream.mark("trailing")
+        elif ep.speech_started and not ep.in_speech:
+            self._held.append(data)
+        else:
+            for held in self._held:
+                self.sink.write(held)
+            self._held.clear()
+            self.sink.write(data)
 
-        if elapsed > MAX_RECORDING_SEC:
-            logger.warning("Max recording duration reached (%ds)", MAX_RECORDING_SEC)
-            break
+        elapsed = self.clock() - self.started
 
-        data = stream.read(VAD_CHUNK_SIZE, exception_on_overflow=False)
-        frames.append(data)
+        # Abort if no speech detected within NO_SPEECH_ABORT_SEC
+        if not ep.speech_started and elapsed > NO_SPEECH_ABORT_SEC:
+            logger.info("⏳ %sNo speech detected in %.0fs, aborting", self.label, NO_SPEECH_ABORT_SEC)
+            self._aborted = True
+            return True
 
-        audio_array = np.frombuffer(data, dtype=np.int16)
-        has_speech = vad.is_speech(audio_array)
+        if ended:
+            logger.info("🔇 %sEnd of utterance (%.2fs silence after %.1fs of speech), stopping",
+                        self.label, ep.silence_sec, ep.speech_frames * ep.frame_sec)
+            metrics.observe("endpoint_silence", ep.silence_sec)
+            return True
 
-        if has_speech:
-            first_speech_detected = True
-            silence_start = None
+        if elapsed > MAX_RECORDING_SEC:
+            logger.warning("%sMax recording duration reached (%ds)", self.label, MAX_RECORDING_SEC)
+            return True
+        return False
+
+    def finish(self) -> float | None:
+        """Finalize the sink. Returns the kept duration in seconds, or None if there
+        was no usable speech."""
+        duration = None if self._aborted else self._trim()
+        self.sink.finish(duration is not None)
+        return duration
+
+    def _trim(self) -> float | None:
+        ep = self.endpointer
+        # Keep a short pad of the trailing silence the endpointer waited through
+        for held in self._held[:self._pad_frames]:
+            self.sink.write(held)
+
+        frames = ep.frames
+        if ep.speech_started:
+            frames = min(frames, ep.last_speech + 1 + self._pad_frames)
+        duration = (self.pre_samples + frames * VAD_CHUNK_SIZE) / SAMPLE_RATE
+        trimmed = (ep.frames - frames) * VAD_CHUNK_SIZE / SAMPLE_RATE
+        logger.info("📝 %sRecorded %.1fs of audio (%.1fs trailing silence trimmed)",
+                    self.label, duration, trimmed)
+
+        if duration < 0.5:
+            logger.warning("%sRecording too short (%.1fs), discarding", self.label, duration)
+            return None
+        return duration
+
+
+def new_recording_name(tag: str = None) -> str:
+    """ikigai_<timestamp>[_<source tag>]_<id>"""
+    source = f"_{tag}" if tag else ""
+    return f"ikigai_{datetime.now().strftime('%Y%m%d_%H%M%S')}{source}_{uuid.uuid4().hex[:8]}"
+
+
+class RecordingWriter:
+    """Encodes a recording to disk as frames arrive, in bounded memory.
+
+    Writes <name>.<ext>.part in the audio folder; the watcher only globs
+    finished names, so it never sees a half-written file. publish() renames
+    it into place.
+    """
+
+    EXTENSIONS = {"wav": ".wav", "flac": ".flac", "opus": ".ogg"}
+    trims_silence = True
+
+    def __init__(self, directory: Path, fmt: str = RECORDING_FORMAT, tag: str = None):
+        if fmt not in self.EXTENSIONS:
+            raise ValueError(f"Unknown recording format '{fmt}' (choose from {', '.join(self.EXTENSIONS)})")
+        sf = None
+        if fmt != "wav":
+            try:
+                import soundfile as sf
+            except ImportError:
+                logger.warning("soundfile not installed, recording %s as wav", fmt)
+                fmt = "wav"
+
+        directory.mkdir(parents=True, exist_ok=True)
+        self.format = fmt
+        self.tag = tag
+        self.name = new_recording_name(tag)
+        self.path = directory / f"{self.name}{self.EXTENSIONS[fmt]}"
+        self.part_path = self.path.with_name(self.path.name + ".part")
+        self.samples = 0
+
+        if sf is None:
+            self._wav = wave.open(str(self.part_path), 'wb')
+            self._wav.setnchannels(CHANNELS)
+            self._wav.setsampwidth(2)
+            self._wav.setframerate(SAMPLE_RATE)
+            self._sf = None
         else:
-            # Abort if no speech detected within NO_SPEECH_ABORT_SEC
-            if not first_speech_detected and elapsed > NO_SPEECH_ABORT_SEC:
-                logger.info("⏳ No speech detected in %.0fs, aborting", NO_SPEECH_ABORT_SEC)
-                return None
-
-            if first_speech_detected:
-                if silence_start is None:
-                    silence_start = time.time()
-                elif time.time() - silence_start > SILENCE_TIMEOUT_SEC:
-                    logger.info("🔇 Silence detected (%.1fs), stopping", SILENCE_TIMEOUT_SEC)
-                    break
-
-    pcm_data = b"".join(frames)
-    duration = len(pcm_data) / (SAMPLE_RATE * 2)
-    logger.info("📝 Recorded %.1fs of audio", duration)
-
-    if duration < 0.5:
-        logger.warning("Recording too short (%.1fs), discarding", duration)
-        return None
+            self._wav = None
+            self._sf = sf.SoundFile(
+                str(self.part_path), 'w', samplerate=SAMPLE_RATE, channels=CHANNELS,
+                format="FLAC" if fmt == "flac" else "OGG",
+                subtype="PCM_16" if fmt == "flac" else "OPUS",
+            )
+
+    def write(self, pcm: bytes):
+        if self._sf is not None:
+            self._sf.write(np.frombuffer(pcm, dtype=np.int16))
+        else:
+            self._wav.writeframes(pcm)
+        self.samples += len(pcm) // 2
+
+    def finish(self, ok: bool):
+        (self._sf or self._wav).close()
+        if not ok:
+            self.part_path.unlink(missing_ok=True)
 
-    return pcm_data
+    def publish(self) -> Path:
+        os.replace(self.part_path, self.path)
+        return self.path
 
 
-def save_wav(pcm_data: bytes) -> Path:
-    """Save PCM data as WAV file in the shared audio folder."""
-    AUDIO_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    filename = f"ikigai_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.wav"
-    filepath = AUDIO_OUTPUT_DIR / filename
+def deliver_recording(writer: RecordingWriter, client: TransportClient = None):
+    """Hand a finished recording to the watcher: socket first, shared folder as fallback."""
+    t0 = time.perf_counter()
+    duration = writer.samples / SAMPLE_RATE
+    try:
+        if client is not None:
+            meta = {"name": writer.name, "format": writer.format, "source": writer.tag,
+                    "sample_rate": SAMPLE_RATE, "duration": duration}
+            if client.send("recording", meta, writer.part_path.read_bytes()):
+                writer.part_path.unlink(missing_ok=True)
+                logger.info("📤 Sent: %s (%.1fs) via %s", writer.name, duration, client.url)
+                return
+        path = writer.publish()
+        logger.info("💾 Saved: %s (%.1fs, %d KB)", path.name, duration, path.stat().st_size // 1024)
+    finally:
+        metrics.observe("save", time.perf_counter() - t0)
 
-    with wave.open(str(filepath), 'wb') as wf:
-        wf.setnchannels(CHANNELS)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
-        wf.writeframes(pcm_data)
 
-    duration = len(pcm_data) / (SAMPLE_RATE * 2)
-    logger.info("💾 Saved: %s (%.1fs)", filename, duration)
-    return filepath
+def write_stats():
+    """Write the listener stats file and warn if it is falling behind real time."""
+    try:
+        metrics.write(STATS_FILE)
+    except OSError as e:
+        logger.warning("Could not write stats: %s", e)
+    if metrics.realtime_factor > 1.0:
+        logger.warning("⚠ Listener behind real time (RTF %.2f over the last minute)",
+                       metrics.realtime_factor)
+
+
+# ─── Channels ────────────────────────────────────────────────────────────
+
+WAKE, LISTEN = "wake", "vad"  # what a channel's frames are scored with
+
+
+class Channel:
+    """One audio input with its own ring, readers, pre-buffer, activity gate,
+    endpointer, conversation window and recording.
+
+    Each tick a channel queues at least CHUNK_SIZE samples of frames (plus
+    any backlog, up to MAX_TICK_SEC) in `pending` as (mode, frame, end
+    position). The main loop takes one pending frame from every channel
+    per round, so each round is a single batched model call.
+    """
+
+    MAX_TICK_SEC = 1.0
+
+    def __init__(self, name: str, spec: str, tag: str | None, gap_sec: float):
+        self.name = name
+        self.tag = tag
+        self.label = f"[{name}] " if tag else ""
+        self.ring = AudioRing(int(RING_BUFFER_SEC * SAMPLE_RATE))
+        self.source = open_source(spec, self.ring, SAMPLE_RATE, CHANNELS, CHUNK_SIZE, gap_sec=gap_sec)
+        self.clock = self.source.clock
+        self.wake_frames = FrameReader(self.ring, CHUNK_SIZE)
+        self.vad_frames = FrameReader(self.ring, VAD_CHUNK_SIZE)
+        self.pre_buffer = PreBuffer(self.ring, PRE_BUFFER_SEC, SAMPLE_RATE)
+        self.gate = ActivityGate(SAMPLE_RATE, CHUNK_SIZE) if WAKE_GATE else None
+        self.endpointer = make_endpointer()
+        self.wake = None           # WakeWordStream, once the model is loaded
+        self.vad = None            # this channel's VAD state, once loaded
+        self.wake_fed_until = 0    # end of the audio the wake-word model has seen
+        self.conversation_until = 0
+        self.recording = None
+        self.detected_at = None
+        self.recordings = 0
+        self.pending = collections.deque()
+        self.cues = []             # Playbacks to blank out of this channel's audio
+        self.muted = []            # (start, end) ring positions where a cue was heard
+        self.done = False
+
+    @property
+    def mode(self) -> str:
+        if self.recording is not None or self.clock() < self.conversation_until:
+            return LISTEN
+        return WAKE
+
+    def read_tick(self, count_audio: bool):
+        mode = self.mode
+        reader, other = ((self.wake_frames, self.vad_frames) if mode == WAKE
+                         else (self.vad_frames, self.wake_frames))
+        target = reader.position + CHUNK_SIZE
+        limit = target + int(self.MAX_TICK_SEC * SAMPLE_RATE)
+        while reader.position < limit:
+            frame = metrics.read_frame(reader, READ_TIMEOUT_SEC, count_audio)
+            if frame is None:
+                self.done = reader.exhausted
+                break
+            if self.cues or self.muted:
+                frame = self.blank_cues(frame, reader.position)
+            self.pending.append((mode, frame, reader.position))
+            if reader.position >= target and reader.backlog < reader.frame_size:
+                break
+        other.seek(reader.position)
+
+    def blank_cues(self, frame: np.ndarray, end: int) -> np.ndarray:
+        """Zero whatever part of `frame` (ending at ring position `end`) overlaps a cue.
+
+        Never waits for a cue to start: one not at the DAC yet stays in
+        self.cues and is blanked from the frame after its start is known.
+        """
+        waiting = []
+        for playback in self.cues:
+            if playback.started.is_set():
+                metrics.observe("sound_start", playback.start_latency)
+                start = self.source.position_at(playback.started_at)
+                stop = self.source.position_at(playback.ended_at + CUE_ECHO_SEC)
+                if start is not None:
+                    self.muted.append((start, stop))
+            elif (not playback.interrupted  # cut off by the next cue before playing a sample
+                  and time.perf_counter() - playback.requested_at < CUE_START_TIMEOUT_SEC):
+                waiting.append(playback)
+        self.cues = waiting
+
+        begin = end - len(frame)
+        self.muted = [(a, b) for a, b in self.muted if b > begin]
+        overlapping = [(a, b) for a, b in self.muted if a < end]
+        if overlapping:
+            frame = frame.copy()  # never write into the ring
+            for a, b in overlapping:
+                frame[max(a - begin, 0):min(b, end) - begin] = 0
+        return frame
+
+    def seek(self, position: int):
+        """Resume both readers at `position`, dropping frames queued past it."""
+        self.pending.clear()
+        self.wake_frames.seek(position)
+        self.vad_frames.seek(position)
+
+    def status(self) -> dict:
+        return {
+            "mode": "recording" if self.recording is not None else self.mode,
+            "recordings": self.recordings,
+            "gate_pass_ratio": round(self.gate.pass_ratio, 4) if self.gate else None,
+            "gate_floor_db": round(self.gate.floor_db or 0.0, 1) if self.gate else None,
+        }
+
+
+def parse_sources(specs: list) -> list[tuple[str, str, str | None]]:
+    """'[name=]spec' entries → (name, spec, tag). Recordings are tagged with the
+    source name whenever one is given or there is more than one source."""
+    parsed = []
+    for i, entry in enumerate(specs):
+        name, sep, spec = entry.partition("=")
+        if not sep:
+            name, spec = "", entry
+        parsed.append((name.strip(), spec.strip()))
+    tagged = len(parsed) > 1
+    return [(name or f"src{i}", spec, (name or f"src{i}") if name or tagged else None)
+            for i, (name, spec) in enumerate(parsed)]
 
 
-# ─── Quick Commands ──────────────────────────────────────────────────────
+# ─── Main Loop ───────────────────────────────────────────────────────────
 
-# These are handled locally without LLM — instant response
-QUICK_COMMANDS = {}
-# Placeholder for future: {"hora": lambda: speak(datetime.now().strftime("%H:%M"))}
-# Not implemented yet — all commands go to OpenClaw for now
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Hey Jarvis wake word listener")
+    parser.add_argument(
+        "--source", action="append",
+        help="mic, mic:<device index>, a WAV file or directory to replay, or - for raw PCM on "
+             "stdin, optionally as name=<source>. Repeat for several rooms "
+             "(default: HJ_AUDIO_SOURCE, comma-separated)"
+    )
+    parser.add_argument("--gap", type=float, default=1.0,
+                        help="Seconds of silence inserted after each replayed WAV file")
+    args = parser.parse_args(argv)
+    if not args.source:
+        args.source = os.environ.get("HJ_AUDIO_SOURCE", "mic").split(",")
+    return args
 
 
-# ─── Main Loop ───────────────────────────────────────────────────────────
+def main(argv=None):
+    global SOUNDS_ENABLED
+    args = parse_args(argv)
 
-def main():
     logger.info("=" * 60)
     logger.info("🎙 Hey Jarvis V2 — Voice Listener")
     logger.info("=" * 60)
     logger.info("Output dir:   %s", AUDIO_OUTPUT_DIR)
+    logger.info("Transport:    %s", TRANSPORT_URL or "shared folder")
     logger.info("Wake threshold: %.2f", WAKE_THRESHOLD)
     logger.info("Conversation window: %.0fs", CONVERSATION_WINDOW_SEC)
 
-    # Load wake word model (only hey_jarvis — not all built-ins)
-    logger.info("Loading openWakeWord (hey_jarvis only)...")
-    oww = OWWModel(
-        wakeword_models=["hey_jarvis_v0.1"],
-        inference_framework="onnx"
-    )
-    logger.info("Wake word model loaded ✅")
-
-    logger.info("Loading Silero VAD...")
-    vad = SileroVAD(threshold=0.4)
-    logger.info("VAD loaded ✅")
-
-    # Pre-buffer for capturing audio before wake word confirmation
-    pre_buffer = PreBuffer(PRE_BUFFER_SEC, CHUNK_SIZE, SAMPLE_RATE)
-
-    # Init audio
-    audio = pyaudio.PyAudio()
-    stream = audio.open(
-        format=FORMAT,
-        channels=CHANNELS,
-        rate=SAMPLE_RATE,
-        input=True,
-        frames_per_buffer=CHUNK_SIZE
-    )
+    logger.info("⏱ startup: imports done (t=%.2fs)", startup_elapsed())
+
+    # Models load on worker threads while the microphones are already open:
+    # audio captured meanwhile waits in the rings and is scored once
+    # openWakeWord is ready, so a wake word said during startup still counts.
+    logger.info("Loading openWakeWord (%s only) in background...", WAKE_MODEL)
+    wake_loader = BackgroundLoader("openWakeWord", load_wake_model).start()
+    vad_loader = BackgroundLoader(f"Silero VAD ({VAD_BACKEND})", lambda: load_vad(threshold=0.4))
+    if VAD_PRELOAD:
+        vad_loader.start()
+
+    # Each microphone captures on its own PortAudio callback thread; the loop
+    # below only consumes frames from the rings, so inference stalls never
+    # drop audio. Replay sources are pulled from the ring on demand and run
+    # on the audio clock, so recording timeouts behave as live but faster
+    # than real time. One set of models serves every channel.
+    channels = [Channel(name, spec, tag, args.gap) for name, spec, tag in parse_sources(args.source)]
+    if not all(ch.source.realtime for ch in channels):
+        SOUNDS_ENABLED = False
+    for ch in channels:
+        logger.info("Audio source: %s%s", ch.label, ch.source.describe())
+    if SOUNDS_ENABLED:
+        start_feedback()
+
+    transport = TransportClient(TRANSPORT_URL, log=logger) if TRANSPORT_URL else None
+    barge_in = None
+    if BARGE_IN != "0" and all(ch.source.realtime for ch in channels):
+        barge_in = BargeInSender(PLAYER_URL, RESPONSE_DIR, metrics)
+
+    def readers():
+        return [r for ch in channels for r in (ch.wake_frames, ch.vad_frames)]
+
+    def gate_pass_ratio():
+        gates = [ch.gate for ch in channels if ch.gate is not None]
+        frames = sum(g.frames for g in gates)
+        return round(sum(g.passed for g in gates) / frames, 4) if frames else None
+
+    metrics.gauges.update({
+        "capture_overflows": lambda: sum(ch.source.overflows for ch in channels),
+        "dropped_samples": lambda: sum(r.dropped_samples for r in readers()),
+        "backlog_seconds": lambda: round(max(r.backlog for r in readers()) / SAMPLE_RATE, 3),
+        "audio_seconds": lambda: round(channels[0].ring.written / SAMPLE_RATE, 1),
+        "wake_gate_pass_ratio": gate_pass_ratio,
+        "channels": lambda: {ch.name: ch.status() for ch in channels},
+    })
+
+    t0 = time.perf_counter()
+    for ch in channels:
+        ch.source.start()
+    logger.info("⏱ startup: %d audio source(s) open in %.2fs (t=%.2fs)",
+                len(channels), time.perf_counter() - t0, startup_elapsed())
+
+    wake = wake_loader.get()
+    for ch in channels:
+        ch.wake = wake.add_stream(ch.name)
+    first = [(ch, ch.wake_frames.read()) for ch in channels]
+    first = [(ch, frame) for ch, frame in first if frame is not None]
+    if first:
+        t0 = time.perf_counter()
+        wake.predict([ch.wake for ch, _ in first], [frame for _, frame in first])
+        logger.info("⏱ startup: first inference %.1fms (t=%.2fs, %.1fs of audio buffered)",
+                    (time.perf_counter() - t0) * 1000, startup_elapsed(),
+                    max(ch.wake_frames.backlog for ch in channels) / SAMPLE_RATE)
+    for ch in channels:
+        ch.vad_frames.seek(ch.wake_frames.position)
+        ch.wake_fed_until = ch.wake_frames.position
 
     logger.info("")
     logger.info("👂 Listening for 'Hey Jarvis'...")
     logger.info("   Press Ctrl+C to stop")
     logger.info("")
 
-    conversation_until = 0  # timestamp until conversation mode is active
+    recordings = 0
+    run_started = time.perf_counter()
+
+    def new_sink(ch: Channel):
+        if STREAM_RECORDINGS:
+            return RecordingStream(AUDIO_OUTPUT_DIR, ch.tag)
+        return RecordingWriter(AUDIO_OUTPUT_DIR, tag=ch.tag)
+
+    def cue(ch: Channel, name: str):
+        playback = play_sound(name)
+        if playback is not None:
+            ch.cues.append(playback)
+
+    def start_recording(ch: Channel, position: int, trigger: str):
+        if barge_in is not None and (trigger == "wake" or BARGE_IN != "wake"):
+            barge_in.trigger(trigger)
+            metrics.count("barge_in_signals")
+        cue(ch, "ding")
+
+        if ch.vad is None:
+            base = vad_loader.get()
+            for c in channels:
+                c.vad = base if c is channels[0] else base.clone()
+
+        # Pre-buffer: everything up to the triggering frame
+        pre_audio = ch.pre_buffer.get(position)
+        ch.seek(position)
+        ch.vad.reset()
+        ch.recording = Recording(new_sink(ch), ch.endpointer, pre_audio, ch.clock, ch.label)
+
+    def end_recording(ch: Channel, position: int):
+        nonlocal recordings
+        sink = ch.recording.sink
+        duration = ch.recording.finish()
+        ch.recording = None
+        ch.pre_buffer.clear(position)
+
+        if duration:
+            cue(ch, "done")
+            if isinstance(sink, RecordingWriter):
+                deliver_recording(sink, transport)
+            recordings += 1
+            ch.recordings += 1
+            metrics.count("recordings")
+            logger.info("⏱ %swake→file: %.0fms (%.1fs of audio)",
+                        ch.label, (time.perf_counter() - ch.detected_at) * 1000, duration)
+            ch.conversation_until = ch.clock() + CONVERSATION_WINDOW_SEC
+            logger.info("💬 %sConversation mode ON for %.0fs", ch.label, CONVERSATION_WINDOW_SEC)
+        else:
+            cue(ch, "error")
+            metrics.count("recordings_aborted")
+            logger.info("%sNo speech detected, back to listening", ch.label)
+
+        ch.vad.reset()
+        ch.wake.reset()
+        ch.seek(position)
+        ch.wake_fed_until = position
+        if ch.mode == LISTEN:
+            logger.info("👂 %sListening... (conversation mode: %.0fs left)",
+                        ch.label, ch.conversation_until - ch.clock())
+        else:
+            logger.info("👂 %sListening for 'Hey Jarvis'...", ch.label)
+
+    def score_wake(items: list):
+        batch, primed = [], {}
+        for ch, frame, end in items:
+            if ch.gate is not None:
+                t0 = time.perf_counter()
+                active = ch.gate.update(frame)
+                metrics.observe("wake_gate", time.perf_counter() - t0)
+                if not active:
+                    metrics.count("wake_frames_gated")
+                    continue
+                if ch.gate.opened:
+                    metrics.count("wake_gate_opens")
+                    frame_start = end - CHUNK_SIZE
+                    prime_from = max(frame_start - ch.gate.prime_samples, ch.wake_fed_until, ch.ring.oldest)
+                    primed[ch] = prime_wake_model(wake, ch.wake, ch.ring, prime_from, frame_start)
+            batch.append((ch, frame, end))
+        if not batch:
+            return
+
+        t0 = time.perf_counter()
+        scores = wake.predict([ch.wake for ch, _, _ in batch], [frame for _, frame, _ in batch])
+        metrics.observe("wake_inference", time.perf_counter() - t0)
+
+        for (ch, frame, end), score in zip(batch, scores):
+            ch.wake_fed_until = end
+            score = max(score, primed.get(ch, 0.0))
+            if score > WAKE_THRESHOLD:
+                ch.detected_at = time.perf_counter()
+                metrics.count("wake_detections")
+                logger.info("🔥 %sWake word '%s' detected! (score=%.3f, t=%.2fs)",
+                            ch.label, wake.name, score, end / SAMPLE_RATE)
+                start_recording(ch, end, "wake")
+
+    def score_vad(items: list):
+        t0 = time.perf_counter()
+        probabilities = batch_probability([ch.vad for ch, _, _ in items], [frame for _, frame, _ in items])
+        metrics.observe("vad_inference", time.perf_counter() - t0)
+
+        for (ch, frame, end), probability in zip(items, probabilities):
+            if ch.recording is not None:
+                if ch.recording.step(frame, probability):
+                    end_recording(ch, end)
+            elif probability > ch.vad.threshold:
+                # Conversation mode: speech starts a recording without the wake word
+                metrics.count("conversation_triggers")
+                ch.detected_at = time.perf_counter()
+                logger.info("🔄 %sConversation mode — speech detected, recording...", ch.label)
+                start_recording(ch, end, "speech")
+
+    last_stats = time.monotonic()
 
     try:
-        while True:
-            data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
-            audio_array = np.frombuffer(data, dtype=np.int16)
-            pre_buffer.add(data)
-
-            now = time.time()
-            in_conversation = now < conversation_until
-
-            # In conversation mode: check VAD directly (no wake word needed)
-            if in_conversation:
-                vad_array = audio_array[:VAD_CHUNK_SIZE] if len(audio_array) >= VAD_CHUNK_SIZE else audio_array
-                if vad.is_speech(vad_array):
-                    logger.info("🔄 Conversation mode — speech detected, recording...")
-                    play_sound(SOUND_DING)
-                    time.sleep(0.05)
-
-                    pre_frames = pre_buffer.get_all()
-                    pre_buffer.clear()
-                    vad.reset()
-
-                    pcm_data = record_with_vad(stream, vad, pre_frames)
-
-                    if pcm_data:
-                        play_sound(SOUND_DONE)
-                        save_wav(pcm_data)
-                        conversation_until = time.time() + CONVERSATION_WINDOW_SEC
-                    else:
-                        play_sound(SOUND_ERROR)
-
-                    vad.reset()
-                    oww.reset()
-                    logger.info("👂 Listening... (conversation mode: %.0fs left)",
-                                max(0, conversation_until - time.time()))
-                continue
-
-            # Normal mode: check wake word
-            prediction = oww.predict(audio_array)
-
-            for model_name, score in prediction.items():
-                if score > WAKE_THRESHOLD:
-                    logger.info("🔥 Wake word '%s' detected! (score=%.3f)", model_name, score)
-                    play_sound(SOUND_DING)
-                    time.sleep(0.05)
-
-                    # Grab pre-buffer frames
-                    pre_frames = pre_buffer.get_all()
-                    pre_buffer.clear()
-                    vad.reset()
-
-                    pcm_data = record_with_vad(stream, vad, pre_frames)
-
-                    if pcm_data:
-                        play_sound(SOUND_DONE)
-                        save_wav(pcm_data)
-                        # Enter conversation mode
-                        conversation_until = time.time() + CONVERSATION_WINDOW_SEC
-                        logger.info("💬 Conversation mode ON for %.0fs", CONVERSATION_WINDOW_SEC)
-                    else:
-                        play_sound(SOUND_ERROR)
-                        logger.info("No speech detected, back to listening")
-
-                    vad.reset()
-                    oww.reset()
-                    pre_buffer.clear()
-
-                    logger.info("👂 Listening for 'Hey Jarvis'...")
-                    break
+        while not all(ch.done for ch in channels):
+            if time.monotonic() - last_stats >= STATS_INTERVAL:
+                write_stats()
+                last_stats = time.monotonic()
+
+            live = [ch for ch in channels if not ch.done]
+            for ch in live:
+                ch.read_tick(count_audio=ch is live[0])
+
+            # One frame per channel per round: every round is one batched call
+            # per model. A channel that switches mode drops its queued frames
+            # and re-reads them with the other frame size next tick.
+            while any(ch.pending for ch in live):
+                wake_items, vad_items = [], []
+                for ch in live:
+                    if ch.pending:
+                        mode, frame, end = ch.pending.popleft()
+                        (wake_items if mode == WAKE else vad_items).append((ch, frame, end))
+                if wake_items:
+                    score_wake(wake_items)
+                if vad_items:
+                    score_vad(vad_items)
+
+            for ch in live:
+                if ch.done and ch.recording is not None:
+                    end_recording(ch, ch.vad_frames.position)
 
     except KeyboardInterrupt:
         logger.info("\n👋 Stopping listener...")
     finally:
-        stream.stop_stream()
-        stream.close()
-        audio.terminate()
+        for ch in channels:
+            ch.source.stop()
+        if feedback is not None:
+            feedback.stop()
+        if transport is not None:
+            transport.close()
+        if barge_in is not None:
+            barge_in.close()
+        overflows = sum(ch.source.overflows for ch in channels)
+        dropped = sum(r.dropped_samples for r in readers())
+        if overflows or dropped:
+            logger.warning("Capture overflows: %d, samples dropped by consumers: %d", overflows, dropped)
+        write_stats()
+        if not all(ch.source.realtime for ch in channels):
+            audio_sec = sum(ch.ring.written for ch in channels) / SAMPLE_RATE
+            wall_sec = time.perf_counter() - run_started
+            logger.info("Replay done: %.1fs of audio from %d source(s) in %.1fs (%.1fx real time), "
+                        "%d recording(s)", audio_sec, len(channels), wall_sec,
+                        audio_sec / max(wall_sec, 1e-9), recordings)
         logger.info("Bye!")
 
 
@@ -0,0 +1,143 @@
+"""
+📊 Hey Jarvis — Listener Metrics
+=================================
+Low-overhead telemetry for the listener's hot loop.
+
+Every stage (frame read wait, wake-word inference, VAD inference, saving
+recordings, cue playback) feeds a fixed-bucket latency histogram: one
+perf_counter pair and a bisect per sample, no allocation. A rolling
+real-time factor (busy time ÷ audio time over the last minute) and the
+readers' backlog show whether the listener is keeping up; capture
+overflows and dropped samples show when it didn't.
+
+Everything is written periodically to logs/hey_jarvis_stats.json, the
+listener's counterpart of the watcher's health file.
+"""
+
+import os
+import json
+import time
+import bisect
+import collections
+from pathlib import Path
+
+
+class LatencyHistogram:
+    """Latency distribution over fixed, roughly log-spaced buckets (ms)."""
+
+    BOUNDS_MS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self):
+        self.buckets = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float):
+        ms = seconds * 1000
+        self.buckets[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, p: float) -> float:
+        """Upper bound (ms) of the bucket holding the p-th percentile."""
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                bound = self.BOUNDS_MS[i] if i < len(self.BOUNDS_MS) else self.max_ms
+                return round(min(bound, self.max_ms), 3)
+        return self.max_ms
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class ListenerMetrics:
+    """Stage histograms, counters and rolling real-time factor for one listener."""
+
+    WINDOW_SEC = 5.0     # RTF accumulation window
+    WINDOWS = 12         # rolling RTF over the last 60s
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self.stages = collections.defaultdict(LatencyHistogram)
+        self.counters = collections.Counter()
+        self.gauges = {}  # name → zero-arg callable, sampled on snapshot
+        self.started = time.time()
+
+        self._windows = collections.deque(maxlen=self.WINDOWS)
+        self._window_start = time.perf_counter()
+        self._audio_s = 0.0
+        self._busy_s = 0.0
+        self._last_read_end = None
+
+    def observe(self, stage: str, seconds: float):
+        self.stages[stage].record(seconds)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def read_frame(self, reader, timeout: float, count_audio: bool = True):
+        """FrameReader.read() that accounts read wait and busy time for RTF.
+
+        With several sources read in lockstep, only one of them should
+        `count_audio`, so RTF stays busy time per second of wall-clock audio.
+        """
+        t0 = time.perf_counter()
+        frame = reader.read(timeout)
+        t1 = time.perf_counter()
+        self.stages["read_wait"].record(t1 - t0)
+
+        busy = t0 - self._last_read_end if self._last_read_end is not None else 0.0
+        self._last_read_end = t1
+        if frame is not None:
+            self._busy_s += busy
+            if count_audio:
+                self._audio_s += len(frame) / self.sample_rate
+
+        if t1 - self._window_start >= self.WINDOW_SEC:
+            self._windows.append((self._audio_s, self._busy_s))
+            self._audio_s = self._busy_s = 0.0
+            self._window_start = t1
+        return frame
+
+    @property
+    def realtime_factor(self) -> float:
+        """Processing time per second of audio over the rolling window (<1 keeps up)."""
+        audio = self._audio_s + sum(a for a, _ in self._windows)
+        busy = self._busy_s + sum(b for _, b in self._windows)
+        return busy / audio if audio else 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "realtime_factor": round(self.realtime_factor, 4),
+            "stages": {name: h.snapshot() for name, h in sorted(self.stages.items())},
+            "counters": dict(self.counters),
+            "gauges": {name: fn() for name, fn in self.gauges.items()},
+        }
+
+    def write(self, path: Path):
+        data = {
+            "status": "running",
+            "pid": os.getpid(),
+            **self.snapshot(),
+            "checked_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(tmp, path)
@@ -22,6 +22,14 @@ Write-Host "Installing dependencies..."
 & venv\Scripts\pip.exe install --upgrade pip
 & venv\Scripts\pip.exe install -r requirements.txt
 
+# Silero VAD model (ONNX backend, the default; no torch needed)
+$vadModel = "models\silero_vad.onnx"
+if (-not (Test-Path $vadModel)) {
+    Write-Host "Downloading Silero VAD model..."
+    New-Item -ItemType Directory -Path "models" -Force | Out-Null
+    Invoke-WebRequest -Uri "https://github.com/snakers4/silero-vad/raw/master/src/silero_vad/data/silero_vad.onnx" -OutFile $vadModel
+}
+
 # Create audio output directory
 $audioDir = "$env:USERPROFILE\oye-ikigai-audio"
 if (-not (Test-Path $audioDir)) {
@@ -0,0 +1,132 @@
+"""
+🔈 Hey Jarvis — Streamed Response Playback
+===========================================
+Plays the segments of a streamed reply (watcher HJ_TTS_STREAM, one MP3
+per sentence or group of sentences) back to back without gaps.
+
+Each segment is decoded to PCM as soon as it arrives (soundfile; MP3
+needs libsndfile 1.1+, which the soundfile wheels bundle) and appended
+to the buffer of one persistent output stream, the same way feedback.py
+plays cues. The next segment is usually queued while the previous one is
+still playing, so the join is sample-exact — where a MediaPlayer process
+per file costs PowerShell startup, a 1s load wait and a 3s tail.
+
+audio_player.py falls back to MediaPlayer per segment if pyaudio or
+soundfile is missing or a segment can't be decoded.
+"""
+
+import time
+import threading
+import collections
+from pathlib import Path
+
+import numpy as np
+
+from feedback import pick_output_device, resample
+
+BLOCK_SEC = 0.02
+
+
+def decode(path: Path, rate: int) -> np.ndarray:
+    """Decode an audio file (MP3/WAV/…) to mono int16 at `rate`."""
+    import soundfile as sf
+    audio, source_rate = sf.read(str(path), dtype="int16", always_2d=True)
+    return resample(audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0], source_rate, rate)
+
+
+class SegmentPlayer:
+    """Decoded segments played back to back on one persistent output stream."""
+
+    def __init__(self, device_index: int = None):
+        self.device_index = device_index
+        self.rate = None
+        self.device_name = None
+        self._segments = collections.deque()  # int16 arrays still to play
+        self._offset = 0                      # samples of _segments[0] already played
+        self._lock = threading.Lock()
+        self._silent = threading.Event()      # set by the callback when it hands over a silent block
+        self._pyaudio = None
+        self._audio = None
+        self._stream = None
+
+    def start(self) -> "SegmentPlayer":
+        import pyaudio
+        import soundfile
+        if "MP3" not in soundfile.available_formats():
+            raise RuntimeError(f"libsndfile {soundfile.__libsndfile_version__} can't decode MP3")
+        self._pyaudio = pyaudio
+        self._audio = pyaudio.PyAudio()
+        try:
+            device = pick_output_device(pyaudio, self._audio, self.device_index)
+            self.rate = int(device["defaultSampleRate"])
+            self._stream = self._audio.open(
+                format=pyaudio.paInt16,
+                channels=1,
+                rate=self.rate,
+                output=True,
+                output_device_index=int(device["index"]),
+                frames_per_buffer=int(self.rate * BLOCK_SEC),
+                stream_callback=self._callback,
+            )
+            self._stream.start_stream()
+        except Exception:
+            self.stop()
+            raise
+        self.device_name = device["name"]
+        return self
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
+
+    def append(self, path: Path) -> float | None:
+        """Queue a segment after the ones already playing. Seconds of audio, or None if undecodable."""
+        try:
+            samples = decode(path, self.rate)
+        except Exception:
+            return None
+        with self._lock:
+            self._segments.append(samples)
+        return len(samples) / self.rate
+
+    @property
+    def busy(self) -> bool:
+        """Still playing (or about to play) something."""
+        return bool(self._segments)
+
+    def clear(self, timeout: float = 0.2) -> float | None:
+        """Silence now and forget everything queued (barge-in).
+
+        Waits for the callback to hand the device its first silent block and
+        returns when the speakers go quiet (time.time(): that moment plus the
+        stream's output latency), or None if the callback didn't run in time.
+        """
+        with self._lock:
+            self._segments.clear()
+            self._offset = 0
+            self._silent.clear()
+        if self._stream is None or not self._silent.wait(timeout):
+            return None
+        return time.time() + self._stream.get_output_latency()
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        out = np.zeros(frame_count, dtype=np.int16)
+        filled = 0
+        with self._lock:
+            while filled < frame_count and self._segments:
+                samples = self._segments[0]
+                chunk = samples[self._offset:self._offset + frame_count - filled]
+                out[filled:filled + len(chunk)] = chunk
+                filled += len(chunk)
+                self._offset += len(chunk)
+                if self._offset >= len(samples):
+                    self._segments.popleft()
+                    self._offset = 0
+            if not filled:
+                self._silent.set()
+        return out.tobytes(), self._pyaudio.paContinue
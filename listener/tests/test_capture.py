@@ -0,0 +1,106 @@
+"""AudioRing and FrameReader hand out every sample once, in order, and skip only what was lost."""
+
+import io
+import wave
+
+import numpy as np
+
+from capture import AudioRing, FrameReader, PipeSource, WavSource
+
+SAMPLE_RATE = 16000
+
+
+def ramp(start: int, n: int) -> np.ndarray:
+    return (np.arange(start, start + n) % 32768).astype(np.int16)
+
+
+def test_write_wraps_around():
+    ring = AudioRing(100)
+    reader = FrameReader(ring, 30)
+    ring.write(ramp(0, 80))
+    frames = [reader.read(timeout=0).copy() for _ in range(2)]
+    ring.write(ramp(80, 50))  # crosses the end of the ring
+    frames += [reader.read(timeout=0).copy() for _ in range(2)]
+    np.testing.assert_array_equal(np.concatenate(frames), ramp(0, 120))
+    assert reader.read(timeout=0) is None
+    assert reader.backlog == 10 and reader.dropped_samples == 0
+
+
+def test_write_larger_than_capacity_keeps_the_newest():
+    ring = AudioRing(100)
+    ring.write(ramp(0, 30))
+    ring.write(ramp(30, 250))
+    assert ring.written == 280 and ring.oldest == 180
+    np.testing.assert_array_equal(ring.view(ring.oldest, 100), ramp(180, 100))
+
+
+def test_reader_that_falls_behind_resumes_at_the_oldest_sample():
+    ring = AudioRing(100)
+    reader = FrameReader(ring, 40)
+    ring.write(ramp(0, 250))
+    frame = reader.read(timeout=0)
+    np.testing.assert_array_equal(frame, ramp(150, 40))
+    assert reader.dropped_samples == 150 and reader.position == 190
+
+
+def test_seek_hands_the_cursor_over():
+    ring = AudioRing(100)
+    wake = FrameReader(ring, 20)
+    ring.write(ramp(0, 60))
+    wake.read(timeout=0)
+    vad = FrameReader(ring, 16)
+    vad.seek(wake.position)
+    np.testing.assert_array_equal(vad.read(timeout=0), ramp(20, 16))
+    np.testing.assert_array_equal(vad.read(timeout=0), ramp(36, 16))
+    assert vad.read(timeout=0) is None  # 8 samples left: not a full frame
+
+
+def test_wav_source_replays_files_then_gaps(tmp_path):
+    for name, start in (("a.wav", 0), ("b.wav", 1000)):
+        with wave.open(str(tmp_path / name), "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(SAMPLE_RATE)
+            wf.writeframes(ramp(start, 700).tobytes())
+
+    ring = AudioRing(4096)
+    source = WavSource(ring, SAMPLE_RATE, block_size=256, path=tmp_path, gap_sec=0.032)
+    reader = FrameReader(ring, 128)
+    source.start()
+    frames = []
+    while not reader.exhausted:
+        frame = reader.read()
+        if frame is None:
+            break
+        frames.append(frame.copy())
+
+    audio = np.concatenate(frames)
+    gap = np.zeros(512, dtype=np.int16)  # 0.032 s, whole blocks
+    expected = np.concatenate([ramp(0, 700), gap, ramp(1000, 700), gap])
+    np.testing.assert_array_equal(audio, expected[:len(audio)])
+    assert len(expected) - len(audio) < 128
+    assert source.clock() == ring.written / SAMPLE_RATE
+
+
+class Trickle(io.RawIOBase):
+    """A pipe that returns a few bytes at a time, splitting samples across reads."""
+
+    def __init__(self, data: bytes, step: int):
+        self.data, self.step = data, step
+
+    def read(self, n: int = -1) -> bytes:
+        chunk, self.data = self.data[:self.step], self.data[self.step:]
+        return chunk
+
+
+def test_pipe_source_rejoins_split_samples():
+    audio = ramp(-500, 1000)
+    ring = AudioRing(2048)
+    source = PipeSource(ring, SAMPLE_RATE, block_size=64, stream=Trickle(audio.tobytes(), step=7))
+    reader = FrameReader(ring, 100)
+    source.start()
+    frames = []
+    while (frame := reader.read()) is not None:
+        frames.append(frame.copy())
+    np.testing.assert_array_equal(np.concatenate(frames), audio)
+    assert reader.exhausted
@@ -0,0 +1,91 @@
+"""BatchedWakeWord must score exactly like openwakeword.Model on the same audio."""
+
+import os
+import wave
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+openwakeword_model = pytest.importorskip("openwakeword.model")
+
+from wake import FRAME, WAKE_MODEL, BatchedWakeWord, model_dir  # noqa: E402
+
+SAMPLE_RATE = 16000
+TOLERANCE = 1e-4
+
+if not (model_dir() / f"{WAKE_MODEL}.onnx").exists():
+    pytest.skip("openWakeWord ONNX models not downloaded", allow_module_level=True)
+
+
+def synthetic_wav(path, seconds: float = 8.0, seed: int = 0):
+    """Gliding voiced bursts over room noise: exercises every model without a recording."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    voiced = np.sin(2 * np.pi * 180 * t * (1 + 0.3 * np.sin(1.7 * t))) * (np.sin(3 * t) > 0)
+    audio = 6000 * voiced + rng.normal(0, 300, len(t))
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(audio.astype(np.int16).tobytes())
+    return path
+
+
+def read_wav(path) -> np.ndarray:
+    with wave.open(str(path), "rb") as wf:
+        assert wf.getframerate() == SAMPLE_RATE and wf.getnchannels() == 1
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+
+@pytest.fixture(params=["synthetic"] + (["HJ_WAKE_TEST_WAV"] if os.environ.get("HJ_WAKE_TEST_WAV") else []))
+def clip(request, tmp_path):
+    """Synthetic audio, plus a real wake-word recording if HJ_WAKE_TEST_WAV points at one."""
+    if request.param == "synthetic":
+        return read_wav(synthetic_wav(tmp_path / "clip.wav"))
+    return read_wav(os.environ["HJ_WAKE_TEST_WAV"])
+
+
+def reference_model():
+    np.random.seed(0)  # both draw their starting features from the same noise
+    return openwakeword_model.Model(wakeword_models=[WAKE_MODEL], inference_framework="onnx")
+
+
+def frames(audio: np.ndarray) -> list:
+    return [audio[i:i + FRAME] for i in range(0, len(audio) - FRAME + 1, FRAME)]
+
+
+def test_scores_match_openwakeword(clip):
+    reference = reference_model()
+    np.random.seed(0)
+    batched = BatchedWakeWord(WAKE_MODEL)
+    stream = batched.add_stream("mic")
+
+    chunks = frames(clip)
+    for i, frame in enumerate(chunks):
+        if i == len(chunks) // 2:  # as after a detection
+            reference.reset()
+            stream.reset()
+        expected = reference.predict(frame)[WAKE_MODEL]
+        score = batched.predict([stream], [frame])[0]
+        assert score == pytest.approx(expected, abs=TOLERANCE), f"frame {i}"
+        np.testing.assert_allclose(stream.features, reference.preprocessor.get_features(batched.n_features)[0],
+                                   atol=TOLERANCE, err_msg=f"features at frame {i}")
+
+
+def test_batched_streams_match_separate_models(clip):
+    """Streams scored together, one joining late, match one openwakeword.Model each."""
+    references = [reference_model(), reference_model()]
+    np.random.seed(0)
+    batched = BatchedWakeWord(WAKE_MODEL)
+    streams = [batched.add_stream("kitchen"), batched.add_stream("office")]
+
+    late = 7
+    kitchen, office = frames(clip), frames(clip[::-1].copy())
+    for i, frame in enumerate(kitchen):
+        active = [0] if i < late else [0, 1]
+        audio = [kitchen[i], office[i - late]]
+        scores = batched.predict([streams[k] for k in active], [audio[k] for k in active])
+        for k, score in zip(active, scores):
+            expected = references[k].predict(audio[k])[WAKE_MODEL]
+            assert score == pytest.approx(expected, abs=TOLERANCE), f"stream {k} frame {i}"
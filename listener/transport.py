@@ -0,0 +1,271 @@
+"""
+🔌 Hey Jarvis — Socket Transport
+=================================
+Optional message transport between the listener, watcher and player,
+replacing shared-folder polling with a direct loopback connection.
+The folder protocol stays in place as the fallback: senders that can't
+deliver a message (peer down, no ack) write files exactly as before.
+
+Stdlib only, so the same module serves both sides: the Windows components
+import it from this folder, the WSL2 watcher from ../listener.
+
+Addresses:
+    tcp://127.0.0.1:18790
+    unix:///tmp/hey-jarvis.sock     (where AF_UNIX is available)
+
+Wire format, one message:
+    !II      header length, payload length
+    header   UTF-8 JSON: {"type": ..., "id": ..., **metadata}
+    payload  raw bytes (PCM, MP3), may be empty
+
+Every message is answered with {"type": "ack", "id": <same id>, "ok": bool}.
+The sender only treats a message as delivered once the ack arrives.
+
+Manual test on one box:
+    python transport.py listen tcp://127.0.0.1:18790 --save /tmp/rx
+    python transport.py send tcp://127.0.0.1:18790 recording sample.pcm name=ikigai_test
+"""
+
+import sys
+import json
+import time
+import uuid
+import socket
+import struct
+import logging
+import argparse
+import threading
+import socketserver
+from pathlib import Path
+
+logger = logging.getLogger("hey-jarvis.transport")
+
+_PREFIX = struct.Struct("!II")
+MAX_HEADER_BYTES = 64 * 1024
+MAX_PAYLOAD_BYTES = 64 * 1024 * 1024
+RECONNECT_BACKOFF_SEC = 5.0
+
+
+# ─── Framing ─────────────────────────────────────────────────────────────
+
+def parse_address(url: str) -> tuple:
+    """'tcp://host:port' or 'unix:///path' → (family, address)."""
+    if url.startswith("tcp://"):
+        host, _, port = url[len("tcp://"):].rpartition(":")
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    if url.startswith("unix://"):
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("Unix sockets are not available on this platform")
+        return socket.AF_UNIX, url[len("unix://"):]
+    raise ValueError(f"Unsupported transport address: {url}")
+
+
+def send_message(sock: socket.socket, header: dict, payload: bytes = b""):
+    head = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    sock.sendall(_PREFIX.pack(len(head), len(payload)) + head)
+    if payload:
+        sock.sendall(payload)
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        r = sock.recv_into(view[got:])
+        if r == 0:
+            raise ConnectionError("Connection closed by peer")
+        got += r
+    return bytes(buf)
+
+
+def recv_message(sock: socket.socket) -> tuple[dict, bytes]:
+    head_len, payload_len = _PREFIX.unpack(_recv_exact(sock, _PREFIX.size))
+    if head_len > MAX_HEADER_BYTES or payload_len > MAX_PAYLOAD_BYTES:
+        raise ConnectionError(f"Oversized message ({head_len}/{payload_len} bytes)")
+    header = json.loads(_recv_exact(sock, head_len).decode("utf-8"))
+    payload = _recv_exact(sock, payload_len) if payload_len else b""
+    return header, payload
+
+
+# ─── Client ──────────────────────────────────────────────────────────────
+
+class TransportClient:
+    """Persistent connection that delivers messages and waits for acks.
+
+    A broken connection is re-established once per send; if the peer stays
+    unreachable, sends fail fast for RECONNECT_BACKOFF_SEC so callers can
+    fall back to the folder protocol without stalling.
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0, log: logging.Logger = None):
+        self.url = url
+        self.timeout = timeout
+        self.log = log or logger
+        self._family, self._address = parse_address(url)
+        self._sock = None
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+
+    def _connect(self):
+        sock = socket.socket(self._family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self._address)
+        except OSError:
+            sock.close()
+            raise
+        if self._family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self.log.info("🔌 Connected to %s", self.url)
+
+    def send(self, kind: str, meta: dict = None, payload: bytes = b"") -> bool:
+        """Deliver one message. True only if the peer acknowledged it."""
+        header = {"type": kind, "id": uuid.uuid4().hex, **(meta or {})}
+
+        with self._lock:
+            if time.monotonic() < self._down_until:
+                return False
+
+            error = None
+            for _ in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    send_message(self._sock, header, payload)
+                    reply, _ = recv_message(self._sock)
+                    if reply.get("type") != "ack" or reply.get("id") != header["id"]:
+                        raise ConnectionError(f"Unexpected reply: {reply}")
+                    return bool(reply.get("ok"))
+                except (OSError, ValueError) as e:
+                    error = e
+                    self._close()
+
+            self._down_until = time.monotonic() + RECONNECT_BACKOFF_SEC
+            self.log.warning("Transport %s unavailable (%s), using folder fallback", self.url, error)
+            return False
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+# ─── Server ──────────────────────────────────────────────────────────────
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        sock = self.request
+        if server.family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        while True:
+            try:
+                header, payload = recv_message(sock)
+            except (ConnectionError, OSError, ValueError):
+                return
+            try:
+                ok = bool(server.on_message(header, payload))
+            except Exception as e:
+                server.log.error("Transport handler error for %s: %s", header.get("type"), e)
+                ok = False
+            try:
+                send_message(sock, {"type": "ack", "id": header.get("id"), "ok": ok})
+            except OSError:
+                return
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+class TransportServer:
+    """Accepts connections and hands each message to `on_message(header, payload) -> bool`.
+
+    The return value becomes the ack; the handler runs on the connection's
+    thread, so it should only enqueue work, not do it.
+    """
+
+    def __init__(self, url: str, on_message, log: logging.Logger = None):
+        self.url = url
+        self.log = log or logger
+        family, address = parse_address(url)
+        if family == socket.AF_INET:
+            self._server = _TCPServer(address, _Handler, bind_and_activate=True)
+        else:
+            Path(address).unlink(missing_ok=True)
+            self._server = _UnixServer(address, _Handler, bind_and_activate=True)
+        self._server.family = family
+        self._server.on_message = on_message
+        self._server.log = self.log
+        self._thread = None
+
+    def start(self) -> "TransportServer":
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="transport-server", daemon=True)
+        self._thread.start()
+        self.log.info("🔌 Transport listening on %s", self.url)
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# ─── CLI (manual testing) ───────────────────────────────────────────────
+
+def _cli():
+    parser = argparse.ArgumentParser(description="Hey Jarvis transport test tool")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_listen = sub.add_parser("listen", help="Accept and ack messages, printing their headers")
+    p_listen.add_argument("url")
+    p_listen.add_argument("--save", type=Path, help="Directory to write payloads to")
+
+    p_send = sub.add_parser("send", help="Send one message with a file as payload")
+    p_send.add_argument("url")
+    p_send.add_argument("type")
+    p_send.add_argument("file", type=Path)
+    p_send.add_argument("meta", nargs="*", help="key=value metadata")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    if args.cmd == "listen":
+        def on_message(header, payload):
+            print(json.dumps(header, ensure_ascii=False), f"+{len(payload)} bytes")
+            if args.save:
+                args.save.mkdir(parents=True, exist_ok=True)
+                (args.save / f"{header.get('name', header['id'])}.bin").write_bytes(payload)
+            return True
+
+        TransportServer(args.url, on_message).start()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            return 0
+
+    meta = dict(kv.split("=", 1) for kv in args.meta)
+    t0 = time.perf_counter()
+    ok = TransportClient(args.url).send(args.type, meta, args.file.read_bytes())
+    print(f"ack ok={ok} in {(time.perf_counter() - t0) * 1000:.1f}ms")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(_cli())
@@ -0,0 +1,176 @@
+"""
+🗣 Hey Jarvis — Voice Activity Detection backends
+==================================================
+Silero VAD scores 512-sample frames (32ms at 16kHz) with a speech
+probability. Two interchangeable backends:
+
+- onnx  (default) — silero_vad.onnx on onnxruntime, the same runtime
+                    openWakeWord already uses. No torch import.
+- torch           — the original torch.hub model. Kept for comparison;
+                    needs `pip install torch torchaudio`.
+
+Select with HJ_VAD_BACKEND, point HJ_VAD_MODEL at a local .onnx file.
+
+With several microphones, clone() gives each stream its own recurrent
+state and batch_probability() scores one frame per stream in a single
+model call (onnx backend; torch falls back to one call per stream).
+"""
+
+import os
+import logging
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger("hey-jarvis")
+
+SAMPLE_RATE = 16000
+
+VAD_BACKEND = os.environ.get("HJ_VAD_BACKEND", "onnx")
+VAD_MODEL_PATH = Path(os.environ.get(
+    "HJ_VAD_MODEL",
+    Path(__file__).parent / "models" / "silero_vad.onnx"
+))
+
+
+def make_session_options():
+    """ONNX Runtime options matching openWakeWord's own sessions.
+
+    openWakeWord pins every model to a single intra/inter-op thread so the
+    always-on loop stays cheap; the VAD session follows the same policy so
+    both models share one predictable CPU budget.
+    """
+    import onnxruntime as ort
+    opts = ort.SessionOptions()
+    opts.inter_op_num_threads = 1
+    opts.intra_op_num_threads = 1
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return opts
+
+
+class VADBackend:
+    """Interface for frame-level speech detectors."""
+
+    threshold: float = 0.4
+
+    def probability(self, audio_chunk_int16: np.ndarray) -> float:
+        raise NotImplementedError
+
+    def is_speech(self, audio_chunk_int16: np.ndarray) -> bool:
+        return self.probability(audio_chunk_int16) > self.threshold
+
+    def reset(self):
+        """Reset recurrent state between recordings."""
+        raise NotImplementedError
+
+    def clone(self) -> "VADBackend":
+        """Independent detector for another stream, sharing the loaded model where possible."""
+        raise NotImplementedError
+
+
+class OnnxSileroVAD(VADBackend):
+    """Silero VAD v5 on onnxruntime, recurrent state kept across calls."""
+
+    CONTEXT_SIZE = 64  # v5 expects the tail of the previous frame prepended
+
+    def __init__(self, threshold: float = 0.4, model_path: Path = VAD_MODEL_PATH, session=None):
+        self.threshold = threshold
+        self._sr = np.array(SAMPLE_RATE, dtype=np.int64)
+        self.reset()
+        if session is not None:
+            self.session = session
+            return
+
+        import onnxruntime as ort
+
+        model_path = Path(model_path)
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"Silero VAD model not found: {model_path} "
+                f"(download silero_vad.onnx from github.com/snakers4/silero-vad)"
+            )
+
+        self.session = ort.InferenceSession(
+            str(model_path),
+            sess_options=make_session_options(),
+            providers=["CPUExecutionProvider"],
+        )
+        logger.info("Silero VAD (onnx) loaded from %s (threshold=%.2f)", model_path.name, threshold)
+
+    def probability(self, audio_chunk_int16: np.ndarray) -> float:
+        audio = audio_chunk_int16.astype(np.float32) / 32768.0
+        x = np.concatenate((self._context, audio))[np.newaxis, :]
+        out, self._state = self.session.run(
+            None, {"input": x, "state": self._state, "sr": self._sr}
+        )
+        self._context = audio[-self.CONTEXT_SIZE:]
+        return float(out[0][0])
+
+    def reset(self):
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+        self._context = np.zeros(self.CONTEXT_SIZE, dtype=np.float32)
+
+    def clone(self) -> "OnnxSileroVAD":
+        return OnnxSileroVAD(self.threshold, session=self.session)
+
+    @classmethod
+    def batch(cls, vads: list, frames: list) -> list[float]:
+        """One frame per detector, scored in a single run; all must share a session."""
+        audio = np.stack(frames).astype(np.float32) / 32768.0
+        x = np.concatenate((np.stack([v._context for v in vads]), audio), axis=1)
+        state = np.concatenate([v._state for v in vads], axis=1)
+        out, state = vads[0].session.run(None, {"input": x, "state": state, "sr": vads[0]._sr})
+        for i, v in enumerate(vads):
+            v._state = state[:, i:i + 1]
+            v._context = audio[i, -cls.CONTEXT_SIZE:]
+        return [float(p) for p in out[:, 0]]
+
+
+class TorchSileroVAD(VADBackend):
+    """Silero VAD via torch.hub (legacy backend)."""
+
+    def __init__(self, threshold: float = 0.4):
+        import torch
+        self.torch = torch
+        self.threshold = threshold
+        self.model, _ = torch.hub.load(
+            repo_or_dir='snakers4/silero-vad',
+            model='silero_vad',
+            force_reload=False,
+            trust_repo=True
+        )
+        self.model.eval()
+        logger.info("Silero VAD (torch) loaded (threshold=%.2f)", threshold)
+
+    def probability(self, audio_chunk_int16: np.ndarray) -> float:
+        audio_float = audio_chunk_int16.astype(np.float32) / 32768.0
+        tensor = self.torch.from_numpy(audio_float)
+        return self.model(tensor, SAMPLE_RATE).item()
+
+    def reset(self):
+        self.model.reset_states()
+
+    def clone(self) -> "TorchSileroVAD":
+        return TorchSileroVAD(self.threshold)
+
+
+VAD_BACKENDS = {
+    "onnx": OnnxSileroVAD,
+    "torch": TorchSileroVAD,
+}
+
+
+def load_vad(threshold: float = 0.4, backend: str = VAD_BACKEND) -> VADBackend:
+    """Instantiate the configured VAD backend."""
+    try:
+        cls = VAD_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown VAD backend '{backend}' (choose from {', '.join(VAD_BACKENDS)})")
+    return cls(threshold=threshold)
+
+
+def batch_probability(vads: list, frames: list) -> list[float]:
+    """Speech probability of frames[i] under vads[i], batched when the backend allows."""
+    if len(vads) > 1 and all(isinstance(v, OnnxSileroVAD) and v.session is vads[0].session for v in vads):
+        return OnnxSileroVAD.batch(vads, frames)
+    return [v.probability(f) for v, f in zip(vads, frames)]
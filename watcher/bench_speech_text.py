@@ -0,0 +1,155 @@
+"""
+⏱ Hey Jarvis — Speech text normalizer check + benchmark
+=========================================================
+1. Golden corpus: every case in speech_golden.json must come out of
+   speech_text.normalize() exactly as recorded, both in one call and fed
+   to SpeechNormalizer in random chunks (as a streamed reply would be).
+2. Benchmark: speech_text.normalize() against the regex chain it replaced
+   (13 re.sub passes, kept below as legacy_clean) on replies from a
+   typical answer up to very large ones — mostly prose (PROSE, repeated)
+   and markup-dense (the golden corpus, repeated) — plus the streaming
+   normalizer fed token-sized chunks.
+
+Exits with status 1 if a golden case fails, so it can gate a change.
+
+Usage:
+    python bench_speech_text.py
+    python bench_speech_text.py --chunkings 200 --repeat 20
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+
+from speech_text import SpeechNormalizer, normalize
+
+GOLDEN = Path(__file__).parent / "speech_golden.json"
+SIZES = (800, 8_000, 80_000, 800_000)
+TOKEN_CHARS = 4  # roughly one LLM token
+
+PROSE = """## Plan para mañana
+
+Mañana tienes un día bastante completo, así que te resumo lo importante. Por la mañana, a las
+nueve, tienes la reunión con el equipo de producto; conviene que revises antes el documento que
+te enviaron ayer, sobre todo la parte del **presupuesto**, porque es lo que más dudas generó la
+última vez. A mediodía no hay nada en el calendario, así que es buen momento para comer con calma.
+
+Por la tarde:
+
+- A las 16:00, llamada con el proveedor de las placas solares.
+- A las 18:30, recoger a los niños en la academia de inglés.
+
+Si quieres, puedo ponerte un recordatorio media hora antes de cada cosa. También he visto que el
+pronóstico da lluvia a partir de las cinco, así que quizá te convenga llevar paraguas. Más detalles
+en https://www.aemet.es/es/eltiempo/prediccion/municipios si los necesitas. ¡Que vaya bien! 🙂
+"""
+
+
+def legacy_clean(text: str, max_chars: int = 800) -> str:
+    """The regex chain voice_watcher / tts_speak used before speech_text.py."""
+    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)
+    text = re.sub(r'\*(.+?)\*', r'\1', text)
+    text = re.sub(r'`(.+?)`', r'\1', text)
+    text = re.sub(r'```[\s\S]*?```', '', text)
+    text = re.sub(r'#{1,6}\s', '', text)
+    text = re.sub(r'\[(.+?)\]\(.+?\)', r'\1', text)
+    text = re.sub(r'https?://\S+', '', text)
+    text = re.sub(r'[\U0001F300-\U0001F9FF\U00002700-\U000027BF\U0001FA00-\U0001FA6F\U0001FA70-\U0001FAFF]', '', text)
+    text = re.sub(r'^[\s]*[•\-\*]\s', '', text, flags=re.MULTILINE)
+    text = re.sub(r'\n{2,}', '. ', text)
+    text = re.sub(r'\n', ' ', text)
+    text = re.sub(r'\s{2,}', ' ', text)
+    text = text.strip()
+    if max_chars and len(text) > max_chars:
+        truncated = text[:max_chars]
+        last_period = truncated.rfind('.')
+        if last_period > max_chars // 2:
+            text = truncated[:last_period + 1]
+        else:
+            text = truncated + "..."
+    return text
+
+
+def streamed(text: str, rng: random.Random, max_chunk: int) -> str:
+    normalizer = SpeechNormalizer()
+    parts, i = [], 0
+    while i < len(text):
+        n = rng.randint(1, max_chunk)
+        parts.append(normalizer.feed(text[i:i + n]))
+        i += n
+    parts.append(normalizer.finish())
+    return "".join(parts).strip()
+
+
+def check_golden(cases: list, chunkings: int) -> int:
+    failures = 0
+    for case in cases:
+        got = normalize(case["input"], case.get("max_chars"))
+        problem = None
+        if got != case["expected"]:
+            problem = f"normalize() gave {got!r}"
+        elif not case.get("max_chars"):
+            rng = random.Random(case["name"])
+            for _ in range(chunkings):
+                chunked = streamed(case["input"], rng, rng.choice((1, 3, 8, 32)))
+                if chunked != case["expected"]:
+                    problem = f"streamed in chunks gave {chunked!r}"
+                    break
+        if problem:
+            failures += 1
+            print(f"✗ {case['name']}: {problem}\n    expected {case['expected']!r}")
+    print(f"golden corpus: {len(cases) - failures}/{len(cases)} cases pass "
+          f"(whole and in {chunkings} random chunkings each)")
+    return failures
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(cases: list, repeat: int):
+    corpus = "\n\n".join(case["input"] for case in cases)
+    print(f"\n{'reply':>20} {'regex chain':>13} {'normalize':>11} {'speedup':>8} {'streamed':>10}")
+    for (label, sample), size in [(s, n) for s in (("prose", PROSE), ("markup", corpus)) for n in SIZES]:
+        text = (sample * (size // len(sample) + 1))[:size]
+        runs = max(repeat * 800 // size, 3)
+        legacy = best_of(lambda: legacy_clean(text, max_chars=None), runs)
+        single = best_of(lambda: normalize(text), runs)
+
+        def feed_tokens():
+            normalizer = SpeechNormalizer()
+            for i in range(0, len(text), TOKEN_CHARS):
+                normalizer.feed(text[i:i + TOKEN_CHARS])
+            normalizer.finish()
+
+        stream = best_of(feed_tokens, max(runs // 10, 1)) if size <= 80_000 else None
+        print(f"{label:>8} {size:>10,}c {legacy * 1000:>11.2f}ms {single * 1000:>9.2f}ms {legacy / single:>7.1f}x "
+              f"{f'{stream * 1000:.1f}ms' if stream is not None else '-':>10}")
+    print(f"(streamed: fed {TOKEN_CHARS} characters at a time, as LLM tokens would arrive)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark the speech text normalizer")
+    parser.add_argument("--chunkings", type=int, default=50, help="random chunkings per golden case")
+    parser.add_argument("--repeat", type=int, default=50, help="timing runs for the smallest reply")
+    parser.add_argument("--no-bench", action="store_true", help="only check the golden corpus")
+    args = parser.parse_args()
+
+    cases = json.loads(GOLDEN.read_text(encoding="utf-8"))
+    failures = check_golden(cases, args.chunkings)
+    if not args.no_bench:
+        bench(cases, args.repeat)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+⏱ Hey Jarvis — Whisper profile benchmark
+=========================================
+Transcribes a set of clips with each profile from whisper_profiles.py and
+reports model load time and real-time factor (processing time / audio
+duration; below 1 is faster than real time). Each profile runs in a fresh
+interpreter so GPU memory and thread pools are not shared between them.
+
+Recordings the watcher has archived make a good clip set: short
+commands are what matters for latency, so the table also shows the mean
+latency for clips under 5 seconds.
+
+Usage:
+    python bench_whisper.py /mnt/c/Users/YOU/hey-jarvis-audio/processed
+    python bench_whisper.py clips/ cpu cpu-fast      # selected profiles
+    python bench_whisper.py clips/ --limit 20
+"""
+
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+import whisper_profiles
+
+CLIP_SUFFIXES = {".wav", ".flac", ".ogg"}
+SHORT_CLIP_SEC = 5.0
+
+
+def run_profile(name: str, clips: list[str]) -> dict:
+    """Measure one profile in this process (called in a child interpreter)."""
+    from faster_whisper import decode_audio
+
+    _, settings = whisper_profiles.resolve_profile(name)
+    t0 = time.perf_counter()
+    model = whisper_profiles.load_model(settings)
+    load_s = time.perf_counter() - t0
+
+    audios = [decode_audio(clip, sampling_rate=16000) for clip in clips]
+
+    def transcribe(audio) -> str:
+        segments, _ = model.transcribe(audio, language="es", beam_size=settings["beam_size"],
+                                       condition_on_previous_text=False, vad_filter=True)
+        return " ".join(seg.text.strip() for seg in segments)
+
+    transcribe(audios[0])  # warm-up: first call allocates buffers
+
+    rtfs, short = [], []
+    for audio in audios:
+        duration = len(audio) / 16000
+        t = time.perf_counter()
+        transcribe(audio)
+        elapsed = time.perf_counter() - t
+        rtfs.append(elapsed / duration)
+        if duration < SHORT_CLIP_SEC:
+            short.append(elapsed)
+
+    rtfs.sort()
+    return {
+        "profile": whisper_profiles.describe(name, settings),
+        "load_s": round(load_s, 2),
+        "clips": len(audios),
+        "rtf_mean": round(sum(rtfs) / len(rtfs), 3),
+        "rtf_p95": round(rtfs[min(int(len(rtfs) * 0.95), len(rtfs) - 1)], 3),
+        "short_ms": round(sum(short) / len(short) * 1000) if short else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark faster-whisper profiles")
+    parser.add_argument("clips", help="directory of recordings (.wav/.flac/.ogg)")
+    parser.add_argument("profiles", nargs="*", default=None,
+                        help=f"profiles to run (default: all of {', '.join(whisper_profiles.PROFILES)})")
+    parser.add_argument("--limit", type=int, default=50, help="max clips to use")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    clips = sorted(str(p) for p in Path(args.clips).iterdir() if p.suffix in CLIP_SUFFIXES)[:args.limit]
+    if not clips:
+        sys.exit(f"No clips in {args.clips}")
+
+    if args.child:
+        print(json.dumps(run_profile(args.profiles[0], clips)))
+        return
+
+    profiles = args.profiles or list(whisper_profiles.PROFILES)
+    cuda = whisper_profiles.cuda_available()
+    print(f"{len(clips)} clips, CUDA {'available' if cuda else 'not available'}\n")
+    print(f"{'profile':<58} {'load':>7} {'RTF':>7} {'p95':>7} {'<5s':>8}")
+    for name in profiles:
+        if whisper_profiles.PROFILES[name]["device"] == "cuda" and not cuda:
+            print(f"{name:<58} skipped (no CUDA device)")
+            continue
+        proc = subprocess.run(
+            [sys.executable, __file__, args.clips, name, "--limit", str(args.limit), "--child"],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"{name:<58} failed: {proc.stderr.strip().splitlines()[-1:]}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        short = f"{r['short_ms']}ms" if r["short_ms"] is not None else "-"
+        print(f"{r['profile']:<58} {r['load_s']:>6.1f}s {r['rtf_mean']:>7.3f} "
+              f"{r['rtf_p95']:>7.3f} {short:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+👀 Hey Jarvis — Directory Watcher
+==================================
+Event-driven replacement for globbing the audio folder every 0.5s.
+
+- inotify (Linux, via ctypes — no extra package) reports files closed
+  after writing or renamed into the folder. The listener renames every
+  finished recording into place, so an event means the file is complete
+  and it can be processed without waiting MIN_FILE_AGE.
+- A reconciliation sweep lists the folder every `sweep_sec` and reports
+  anything settled (older than `min_age`) that no event announced. If it
+  ever finds such a file, inotify is not seeing the writer — the normal
+  case for Windows processes writing to /mnt/c over WSL2's 9P mount — and
+  sweeps drop to `fallback_sec` from then on.
+
+Sweeps use os.scandir on the top level only and stat only names they have
+not reported yet, so the cost doesn't grow with processed/ or failed/.
+"""
+
+import os
+import time
+import struct
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger("voice-watcher-v3")
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+
+
+def _inotify(directory: Path) -> int | None:
+    """inotify fd watching `directory` for completed files, or None if unavailable."""
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(fd, os.fsencode(str(directory)), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, "inotify_add_watch failed")
+        return fd
+    except (OSError, AttributeError) as e:
+        logger.info("inotify unavailable for %s (%s), sweeping only", directory, e)
+        return None
+
+
+class DirectoryWatcher:
+    """Calls `on_file(path)` from its own thread for each accepted file that
+    appears in `directory`; `accept(name)` filters by name."""
+
+    def __init__(self, directory: Path, accept, on_file, sweep_sec: float = 5.0,
+                 fallback_sec: float = 0.5, min_age: float = 1.0):
+        self.directory = Path(directory)
+        self.accept = accept
+        self.on_file = on_file
+        self.sweep_sec = sweep_sec
+        self.fallback_sec = fallback_sec
+        self.min_age = min_age
+        self.events = 0
+        self.sweeps = 0
+        self.missed = 0          # files only the sweep found
+        self.reliable = True
+        self._seen = set()       # names already reported and still present
+        self._fd = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def interval(self) -> float:
+        return self.sweep_sec if self._fd is not None and self.reliable else self.fallback_sec
+
+    def start(self) -> "DirectoryWatcher":
+        self._fd = _inotify(self.directory)
+        self._thread = threading.Thread(target=self._run, name="dir-watch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def snapshot(self) -> dict:
+        return {
+            "inotify": self._fd is not None,
+            "reliable": self.reliable,
+            "events": self.events,
+            "sweeps": self.sweeps,
+            "missed_by_events": self.missed,
+            "sweep_interval": self.interval,
+        }
+
+    def _run(self):
+        import select
+        next_sweep = 0.0
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if now >= next_sweep:
+                if self._fd is not None:
+                    self._read_events()  # so the sweep doesn't count queued events as missed
+                self._sweep()
+                next_sweep = now + self.interval
+            wait = max(next_sweep - time.monotonic(), 0.0)
+            if self._fd is None:
+                self._stop.wait(wait)
+                continue
+            try:
+                ready, _, _ = select.select([self._fd], [], [], min(wait, 1.0))
+            except (OSError, ValueError):
+                return
+            if ready and self._read_events():
+                next_sweep = 0.0  # queue overflowed: reconcile now
+
+    def _read_events(self) -> bool:
+        """Report files from pending events. True if the kernel queue overflowed."""
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        overflow = False
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            _, mask, _, length = _EVENT.unpack_from(data, offset)
+            raw = data[offset + _EVENT.size:offset + _EVENT.size + length]
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            name = os.fsdecode(raw.rstrip(b"\0"))
+            if name and self.accept(name):
+                self.events += 1
+                self._seen.add(name)
+                self._report(self.directory / name)
+        return overflow
+
+    def _sweep(self):
+        self.sweeps += 1
+        now = time.time()
+        present, found = set(), []
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not self.accept(entry.name):
+                        continue
+                    present.add(entry.name)
+                    if entry.name in self._seen:
+                        continue
+                    try:
+                        if now - entry.stat().st_mtime < self.min_age:
+                            continue  # maybe still being written; next sweep or an event
+                    except OSError:
+                        continue
+                    found.append(entry.name)
+        except OSError as e:
+            logger.warning("Sweep of %s failed: %s", self.directory, e)
+            return
+
+        self._seen &= present
+        if found and self._fd is not None and self.sweeps > 1:
+            self.missed += len(found)
+            if self.reliable:
+                self.reliable = False
+                logger.warning("inotify missed %d file(s) in %s (network/9P mount?), "
+                               "sweeping every %.1fs", len(found), self.directory, self.fallback_sec)
+        for name in sorted(found):
+            self._seen.add(name)
+            self._report(self.directory / name)
+
+    def _report(self, path: Path):
+        try:
+            self.on_file(path)
+        except Exception as e:
+            logger.error("Watcher callback failed for %s: %s", path.name, e)
@@ -0,0 +1,131 @@
+"""
+🧪 Hey Jarvis — Stand-in OpenClaw Gateway
+==========================================
+Just enough of OpenClaw's /tools/invoke for running the watcher offline:
+
+- cron / wake: records the voice command and, after --delay seconds,
+  adds an assistant reply ("Recibido: <what you said>") to the session.
+- sessions_history: the session's latest messages, newest first.
+- With --webhook, each reply is also POSTed to the watcher's reply
+  receiver (HJ_REPLY_LISTEN), like a real OpenClaw hook would.
+- --fail N answers the first N wakes with 503, to watch the outbox retry
+  and the circuit breaker open and close.
+
+Usage:
+    python fake_gateway.py                                  # :18789, replies after 1.5s
+    python fake_gateway.py --webhook http://127.0.0.1:18792/reply
+    python fake_gateway.py --delay 4 --fail 5
+
+then run the watcher with OPENCLAW_GATEWAY_URL=http://127.0.0.1:18789 and
+OPENCLAW_GATEWAY_TOKEN set to the same --token.
+"""
+
+import re
+import json
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+
+class Session:
+    def __init__(self, delay: float, webhook: str, fail: int):
+        self.delay = delay
+        self.webhook = webhook
+        self.fail_left = fail
+        self.messages = []
+        self.lock = threading.Lock()
+
+    def add(self, role: str, text: str) -> dict:
+        msg = {"role": role, "content": [{"type": "text", "text": text}],
+               "timestamp": int(time.time() * 1000)}
+        with self.lock:
+            self.messages.append(msg)
+            del self.messages[:-50]
+        return msg
+
+    def wake(self, text: str):
+        self.add("user", text)
+        said = re.search(r'"(.+)"', text)
+        threading.Timer(self.delay, self.reply, args=(f"Recibido: {said.group(1) if said else text}",)).start()
+
+    def reply(self, text: str):
+        msg = self.add("assistant", text)
+        print(f"  → reply: {text}")
+        if self.webhook:
+            try:
+                requests.post(self.webhook, json=msg, timeout=2)
+            except requests.RequestException as e:
+                print(f"  ! webhook failed: {e}")
+
+    def history(self, limit: int) -> list:
+        with self.lock:
+            return list(reversed(self.messages[-limit:]))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        session, token = self.server.session, self.server.token
+        if self.path != "/tools/invoke":
+            return self._respond(404, {"ok": False, "error": "not found"})
+        if token and self.headers.get("Authorization") != f"Bearer {token}":
+            return self._respond(401, {"ok": False, "error": "unauthorized"})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+        except ValueError:
+            return self._respond(400, {"ok": False, "error": "invalid json"})
+
+        tool, args = body.get("tool"), body.get("args", {})
+        if tool == "cron" and args.get("action") == "wake":
+            if session.fail_left > 0:
+                session.fail_left -= 1
+                print(f"✗ wake refused with 503 ({session.fail_left} more)")
+                return self._respond(503, {"ok": False, "error": "starting up"})
+            print(f"✓ wake [{self.headers.get('Idempotency-Key', '-')[:12]}]: {args.get('text', '')[:100]}")
+            session.wake(args.get("text", ""))
+            return self._respond(200, {"ok": True, "result": {}})
+        if tool == "sessions_history":
+            messages = session.history(int(args.get("limit", 3)))
+            return self._respond(200, {"ok": True, "result": {"details": {"messages": messages}}})
+        return self._respond(400, {"ok": False, "error": f"unsupported tool {tool}"})
+
+    def _respond(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in OpenClaw gateway for offline testing")
+    parser.add_argument("--port", type=int, default=18789)
+    parser.add_argument("--token", default="test", help="expected bearer token (empty = any)")
+    parser.add_argument("--delay", type=float, default=1.5, help="seconds before the assistant replies")
+    parser.add_argument("--webhook", default="", help="push replies to this URL (the watcher's /reply)")
+    parser.add_argument("--fail", type=int, default=0, help="answer the first N wakes with 503")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), _Handler)
+    server.daemon_threads = True
+    server.session = Session(args.delay, args.webhook, args.fail)
+    server.token = args.token
+    print(f"🧪 Fake gateway on http://127.0.0.1:{args.port} (token {args.token!r}, "
+          f"reply after {args.delay}s{', pushed to ' + args.webhook if args.webhook else ''})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+🔌 Hey Jarvis — Gateway Client
+===============================
+One client for every OpenClaw /tools/invoke call the watcher makes —
+outbox deliveries, reply polls from the response workers — instead of a
+module-level requests.post (new TCP, and TLS for a remote gateway) per
+call.
+
+- Keep-alive pool: one urllib3 pool shared by per-thread Sessions, so
+  concurrent workers reuse warm connections without sharing Session state.
+- Per-tool timeouts: (connect, read) seconds; `cron` wakes get longer than
+  `sessions_history` polls.
+- Circuit breaker: after FAILURE_THRESHOLD consecutive connection errors,
+  timeouts or 5xx responses, calls fail fast with CircuitOpen for a
+  cooldown (doubling up to COOLDOWN_MAX_SEC while the gateway stays down)
+  instead of each waiting out its own timeout. One trial call then decides.
+  CircuitOpen is a requests ConnectionError, so callers handle it like an
+  unreachable gateway.
+- snapshot(): per tool calls, errors and latency p50/p95/max, plus the
+  breaker state, for the health file.
+"""
+
+import time
+import logging
+import threading
+import collections
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pipeline import latency_summary
+
+logger = logging.getLogger("voice-watcher-v3")
+
+CONNECT_TIMEOUT = 3.0
+READ_TIMEOUTS = {"cron": 15.0, "sessions_history": 10.0}
+DEFAULT_READ_TIMEOUT = 10.0
+FAILURE_THRESHOLD = 3
+COOLDOWN_SEC = 5.0
+COOLDOWN_MAX_SEC = 60.0
+LATENCY_WINDOW = 200
+
+
+class CircuitOpen(requests.exceptions.ConnectionError):
+    """The gateway failed repeatedly; not trying again until the cooldown ends."""
+
+
+class GatewayClient:
+    """Thread-safe /tools/invoke client with pooling, timeouts and a circuit breaker."""
+
+    def __init__(self, url: str, token: str, pool_size: int = 8):
+        self.url = url.rstrip("/") + "/tools/invoke"
+        self.headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open_until = 0.0
+        self._cooldown = COOLDOWN_SEC
+        self._trial = False
+        self.opened = 0
+        self.short_circuited = 0
+        self._calls = collections.defaultdict(lambda: {"calls": 0, "errors": 0,
+                                                       "latency": collections.deque(maxlen=LATENCY_WINDOW)})
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            session.headers.update(self.headers)
+            self._local.session = session
+        return session
+
+    @property
+    def state(self) -> str:
+        if self._failures < FAILURE_THRESHOLD:
+            return "closed"
+        return "open" if time.monotonic() < self._open_until else "half-open"
+
+    def _admit(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "open" or self._trial:
+                self.short_circuited += 1
+                raise CircuitOpen(f"gateway circuit open ({self._open_until - time.monotonic():.0f}s left)")
+            self._trial = True  # half-open: this call is the probe
+
+    def _record(self, ok: bool | None):
+        """Count a call's outcome; None = failed before reaching the gateway (only ends a probe)."""
+        with self._lock:
+            self._trial = False
+            if ok is None:
+                return
+            if ok:
+                if self._failures >= FAILURE_THRESHOLD:
+                    logger.info("🔌 Gateway back, circuit closed")
+                self._failures = 0
+                self._cooldown = COOLDOWN_SEC
+                return
+            self._failures += 1
+            if self._failures == FAILURE_THRESHOLD:
+                self.opened += 1
+                logger.warning("🔌 Gateway failing, circuit open for %.0fs", self._cooldown)
+            elif self._failures > FAILURE_THRESHOLD:
+                self._cooldown = min(self._cooldown * 2, COOLDOWN_MAX_SEC)
+            if self._failures >= FAILURE_THRESHOLD:
+                self._open_until = time.monotonic() + self._cooldown
+
+    def invoke(self, tool: str, args: dict, session_key: str = None, headers: dict = None) -> requests.Response:
+        """POST /tools/invoke. Raises requests exceptions (CircuitOpen while the breaker is open)."""
+        self._admit()
+        payload = {"tool": tool, "args": args}
+        if session_key:
+            payload["sessionKey"] = session_key
+        ok = None
+        t0 = time.perf_counter()
+        try:
+            resp = self._session().post(self.url, json=payload, headers=headers,
+                                        timeout=(CONNECT_TIMEOUT, READ_TIMEOUTS.get(tool, DEFAULT_READ_TIMEOUT)))
+            ok = resp.status_code < 500
+        except requests.exceptions.RequestException:
+            ok = False
+            raise
+        finally:
+            # Always runs, so a half-open probe that raised anything else can't leave the breaker stuck
+            with self._lock:
+                metrics = self._calls[tool]
+                metrics["calls"] += 1
+                if ok is False:
+                    metrics["errors"] += 1
+                metrics["latency"].append(time.perf_counter() - t0)
+            self._record(ok)
+        return resp
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            tools = {tool: (m["calls"], m["errors"], list(m["latency"])) for tool, m in self._calls.items()}
+        return {
+            "circuit": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "short_circuited": self.short_circuited,
+            "tools": {
+                tool: {"calls": calls, "errors": errors, **latency_summary(latency)}
+                for tool, (calls, errors, latency) in tools.items()
+            },
+        }
+
+    def close(self):
+        self._adapter.close()
@@ -0,0 +1,216 @@
+"""
+📮 Hey Jarvis — Gateway Outbox
+===============================
+Durable queue between the pipeline and OpenClaw. dispatch hands each voice
+command to the outbox and moves on; a single delivery thread sends them in
+order, retrying with exponential backoff and jitter while the gateway is
+down or restarting, so a gateway outage neither stalls transcription nor
+loses commands — they survive a watcher restart in SQLite.
+
+    pending → delivered       gateway accepted it
+            → rejected        gateway refused it for good (4xx), not retried
+            → expired         still undelivered after `max_age` seconds;
+                              "turn off the oven" is not worth sending late
+
+Every entry has an idempotency key (the recording's transcript key), sent
+as the Idempotency-Key header. Queueing a key that is already pending just
+waits for that delivery; a key already delivered is not sent again, so a
+recording re-ingested after a crash doesn't wake the agent twice.
+
+Callers may attach `on_done(status, sent_at)` to an entry; it runs on the
+delivery thread with the final status, or "duplicate" for a key that was
+delivered earlier. Entries queued before a restart are still delivered,
+without a callback until their recording is queued again.
+"""
+
+import json
+import time
+import random
+import sqlite3
+import logging
+import threading
+import collections
+from pathlib import Path
+
+logger = logging.getLogger("voice-watcher-v3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    key          TEXT PRIMARY KEY,
+    payload      TEXT NOT NULL,
+    status       TEXT NOT NULL DEFAULT 'pending',
+    created_at   REAL NOT NULL,
+    next_at      REAL NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    last_error   TEXT,
+    sent_at      REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (status, created_at);
+"""
+
+LATENCY_WINDOW = 200
+
+
+class Rejected(Exception):
+    """Raised by `deliver` when retrying cannot help (bad request, auth)."""
+
+
+class Outbox:
+    """SQLite-backed FIFO with one delivery thread calling `deliver(payload, key) -> bool`."""
+
+    def __init__(self, path: Path, deliver, max_age: float = 120, base_delay: float = 1.0,
+                 max_delay: float = 30.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.deliver = deliver
+        self.max_age = max_age
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.delivered = 0
+        self.retries = 0
+        self.expired = 0
+        self.rejected = 0
+        self.duplicates = 0
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)  # queued → accepted
+        self._callbacks = {}  # key → [on_done]
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._db = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+
+    def start(self) -> "Outbox":
+        pending = self.depth
+        if pending:
+            logger.info("📮 Outbox: %d command(s) left from last run", pending)
+        self._thread = threading.Thread(target=self._run, name="outbox", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def depth(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()[0]
+
+    def put(self, key: str, payload: dict, on_done=None):
+        """Queue `payload` for delivery under idempotency key `key`; never blocks on the network."""
+        now = time.time()
+        with self._lock, self._db:
+            row = self._db.execute("SELECT status, sent_at FROM outbox WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] == "delivered":
+                self.duplicates += 1
+            elif row is not None and row[0] == "pending":
+                pass  # already queued (re-ingested after a restart): wait for that delivery
+            else:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO outbox (key, payload, status, created_at, next_at, attempts)"
+                    " VALUES (?, ?, 'pending', ?, ?, 0)",
+                    (key, json.dumps(payload, ensure_ascii=False), now, now),
+                )
+            if on_done is not None and (row is None or row[0] != "delivered"):
+                self._callbacks.setdefault(key, []).append(on_done)
+        if row is not None and row[0] == "delivered":
+            logger.info("📮 %s already delivered, not sending again", key[:12])
+            if on_done is not None:
+                on_done("duplicate", row[1])
+            return
+        self._wake.set()
+
+    def prune(self, older_than: float = 86400) -> int:
+        """Forget finished entries (and their idempotency keys) older than `older_than` seconds."""
+        with self._lock, self._db:
+            return self._db.execute("DELETE FROM outbox WHERE status != 'pending' AND created_at < ?",
+                                    (time.time() - older_than,)).rowcount
+
+    def _head(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT key, payload, created_at, next_at, attempts FROM outbox"
+                " WHERE status = 'pending' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+
+    def _finish(self, key: str, status: str, error: str = None, sent_at: float = None):
+        with self._lock, self._db:
+            self._db.execute("UPDATE outbox SET status = ?, last_error = ?, sent_at = ? WHERE key = ?",
+                             (status, error, sent_at, key))
+            callbacks = self._callbacks.pop(key, [])
+        for on_done in callbacks:
+            try:
+                on_done(status, sent_at)
+            except Exception as e:
+                logger.error("Outbox callback failed for %s: %s", key[:12], e, exc_info=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            head = self._head()
+            if head is None:
+                self._wake.wait(1.0)
+                self._wake.clear()
+                continue
+            key, payload, created_at, next_at, attempts = head
+            now = time.time()
+            if now - created_at > self.max_age:
+                self.expired += 1
+                logger.warning("📮 Dropping %s: undelivered for %.0fs after %d attempt(s)",
+                               key[:12], now - created_at, attempts)
+                self._finish(key, "expired", "expired")
+                continue
+            if next_at > now:
+                self._wake.wait(min(next_at - now, created_at + self.max_age - now + 0.01))
+                self._wake.clear()
+                continue
+
+            sent_at = time.time()
+            try:
+                ok, error = self.deliver(json.loads(payload), key), None
+            except Rejected as e:
+                self.rejected += 1
+                logger.error("📮 Gateway rejected %s: %s", key[:12], e)
+                self._finish(key, "rejected", str(e))
+                continue
+            except Exception as e:
+                ok, error = False, str(e)
+
+            if ok:
+                self.delivered += 1
+                self._latencies.append(time.time() - created_at)
+                self._finish(key, "delivered", sent_at=sent_at)
+                continue
+
+            attempts += 1
+            self.retries += 1
+            delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+            delay = random.uniform(delay / 2, delay)  # jitter: don't hammer a gateway that is starting up
+            logger.warning("📮 Delivery of %s failed (attempt %d%s), retrying in %.1fs",
+                           key[:12], attempts, f": {error}" if error else "", delay)
+            with self._lock, self._db:
+                self._db.execute("UPDATE outbox SET attempts = ?, next_at = ?, last_error = ? WHERE key = ?",
+                                 (attempts, time.time() + delay, error, key))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            oldest = self._db.execute(
+                "SELECT MIN(created_at) FROM outbox WHERE status = 'pending'"
+            ).fetchone()[0]
+        latencies = sorted(self._latencies)
+        return {
+            "depth": self.depth,
+            "oldest_pending_sec": round(time.time() - oldest, 1) if oldest else None,
+            "delivered": self.delivered,
+            "retries": self.retries,
+            "expired": self.expired,
+            "rejected": self.rejected,
+            "duplicates": self.duplicates,
+            "delivery_p50_ms": round(latencies[len(latencies) // 2] * 1000) if latencies else None,
+            "delivery_p95_ms": (round(latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000)
+                                if latencies else None),
+        }
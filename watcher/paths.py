@@ -0,0 +1,17 @@
+"""
+📁 Hey Jarvis — Watcher Paths
+==============================
+Where the watcher's state lives. Every cache — transcripts, the gateway
+outbox, synthesized speech — goes under CACHE_DIR, which is anchored to
+this directory rather than the one the process was started from, so the
+watcher (systemd) and tts_speak.py (run by hand, from anywhere) always
+find the same files.
+
+HJ_CACHE_DIR moves them all; HJ_TRANSCRIPT_DB, HJ_OUTBOX_DB and
+HJ_TTS_CACHE_DIR still override one each.
+"""
+
+import os
+from pathlib import Path
+
+CACHE_DIR = Path(os.environ.get("HJ_CACHE_DIR", Path(__file__).resolve().parent / "cache"))
@@ -0,0 +1,154 @@
+"""
+🏭 Hey Jarvis — Watcher Pipeline Stages
+========================================
+Bounded queues with worker threads, so one slow step (a gateway retrying
+for 45s, a response poll waiting for the LLM) never holds up the steps
+before it:
+
+    ingest (main loop) → transcribe → dispatch → respond
+
+Each Stage owns one queue per worker. put() blocks while the queue is
+full, which is the backpressure: a stalled gateway fills dispatch, then
+transcribe, and finally makes the main loop wait, while recordings keep
+waiting safely on disk or in the socket inbox.
+
+Ordering: items with the same key (the recording's source) always go to
+the same worker, and every worker is FIFO, so turns from one room are
+transcribed, sent and answered in the order they were spoken. Different
+rooms can overtake each other in stages with more than one worker.
+Items put without a key go to the least busy worker (the respond stage,
+where each turn waits for its own reply).
+
+hand_off() is put() for callers that must never wait, such as the outbox
+delivery thread: the item goes on an unbounded handoff list, and a feeder
+thread put()s it into the stage in order. That thread absorbs the
+backpressure instead of the caller.
+
+snapshot() reports per stage: queue depth (now and peak), items done and
+failed, items waiting in the handoff list, queue wait and handler latency
+(p50/p95/max over the last 200).
+"""
+
+import time
+import queue
+import logging
+import threading
+import collections
+
+logger = logging.getLogger("voice-watcher-v3")
+
+LATENCY_WINDOW = 200
+
+
+def latency_summary(samples) -> dict:
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None, "max_ms": None}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+        "p95_ms": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+class Stage:
+    """`workers` FIFO threads running `handler(item)`, each with its own bounded queue."""
+
+    def __init__(self, name: str, handler, maxsize: int = 8, workers: int = 1):
+        self.name = name
+        self.handler = handler
+        self.queues = [queue.Queue(maxsize) for _ in range(workers)]
+        self.done = 0
+        self.failed = 0
+        self.peak_depth = 0
+        self._assigned = {}  # key → worker index, round-robin on first sight
+        self._waits = collections.deque(maxlen=LATENCY_WINDOW)
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._handoff = collections.deque()  # (item, key) waiting for the feeder
+        self._handoff_ready = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self) -> "Stage":
+        for i, q in enumerate(self.queues):
+            t = threading.Thread(target=self._run, args=(q,), name=f"{self.name}-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        t = threading.Thread(target=self._feed, name=f"{self.name}-handoff", daemon=True)
+        t.start()
+        self._threads.append(t)
+        return self
+
+    @property
+    def depth(self) -> int:
+        return sum(q.qsize() for q in self.queues)
+
+    def put(self, item, key: str | None = "") -> bool:
+        """Queue `item`, blocking while the stage is full. False if stopping."""
+        if key is None:
+            q = min(self.queues, key=lambda q: q.unfinished_tasks)  # queued + in progress
+        else:
+            index = self._assigned.get(key)
+            if index is None:
+                index = self._assigned.setdefault(key, len(self._assigned) % len(self.queues))
+            q = self.queues[index]
+        entry = (time.perf_counter(), item)
+        while not self._stop.is_set():
+            try:
+                q.put(entry, timeout=0.5)
+            except queue.Full:
+                continue
+            self.peak_depth = max(self.peak_depth, self.depth)
+            return True
+        return False
+
+    def hand_off(self, item, key: str | None = ""):
+        """Queue `item` like put(), but return at once; the feeder thread waits for room instead."""
+        with self._handoff_ready:
+            self._handoff.append((item, key))
+            self._handoff_ready.notify()
+
+    def _feed(self):
+        while not self._stop.is_set():
+            with self._handoff_ready:
+                if not self._handoff:
+                    self._handoff_ready.wait(0.5)
+                    continue
+                item, key = self._handoff[0]
+            self.put(item, key)
+            with self._handoff_ready:
+                self._handoff.popleft()
+
+    def _run(self, q: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                queued_at, item = q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            t0 = time.perf_counter()
+            self._waits.append(t0 - queued_at)
+            try:
+                self.handler(item)
+                self.done += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error("%s stage failed: %s", self.name, e, exc_info=True)
+            self._latencies.append(time.perf_counter() - t0)
+            q.task_done()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+
+    def snapshot(self) -> dict:
+        return {
+            "workers": len(self.queues),
+            "depth": self.depth,
+            "peak_depth": self.peak_depth,
+            "handoff": len(self._handoff),
+            "done": self.done,
+            "failed": self.failed,
+            "wait": latency_summary(list(self._waits)),
+            "latency": latency_summary(list(self._latencies)),
+        }
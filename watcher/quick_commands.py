@@ -0,0 +1,252 @@
+"""
+⚡ Hey Jarvis — Quick Commands
+===============================
+Local fast path for simple requests ("¿qué hora es?", "pon un
+temporizador de cinco minutos") that don't need the LLM. The watcher
+checks every transcript here first; a match is answered straight away
+with TTS instead of going through the gateway, response polling and
+the 10–15s round trip.
+
+Matching is on a normalized transcript (lowercase, no accents or
+punctuation, polite fillers like "oye jarvis … por favor" removed):
+
+1. Each command's precompiled patterns must match the whole utterance,
+   so "¿qué hora es la reunión de mañana?" still goes to the LLM.
+2. Failing that, commands without arguments are fuzzy-matched against
+   their example phrases (difflib ratio ≥ FUZZY_MIN_RATIO), which
+   absorbs small Whisper slips ("que ora es"). A command can require one
+   of a few words to be there exactly — the present-tense "es"/"son" for
+   the time, so "¿qué hora era?" goes to the LLM instead of getting the
+   current time.
+
+Both take microseconds. Handlers return the reply text and are timed
+individually; snapshot() feeds the watcher's health file.
+
+Add a command with the @command decorator; the handler gets the pattern's
+named groups and a `speak(text)` callback for replies that come later
+(timers).
+"""
+
+import re
+import time
+import difflib
+import threading
+import unicodedata
+from datetime import datetime
+
+FUZZY_MIN_RATIO = 0.85
+FUZZY_MAX_WORDS = 6  # longer utterances are real requests, not misheard commands
+
+_FILLERS = re.compile(
+    r"^(?:(?:oye|hey|ey|jarvis|por favor|me puedes decir|puedes decirme|dime)\s+)*"
+    r"|(?:\s+(?:por favor|gracias|jarvis))+$"
+)
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s]", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return _FILLERS.sub("", text)
+
+
+class QuickCommand:
+    def __init__(self, name: str, patterns: tuple, examples: tuple, handler, require: tuple = ()):
+        self.name = name
+        self.patterns = [re.compile(p) for p in patterns]
+        self.examples = [normalize(e) for e in examples]
+        self.require = frozenset(require)  # fuzzy matches need one of these words verbatim
+        self.handler = handler
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class Match:
+    def __init__(self, command: QuickCommand, args: dict, how: str, match_ms: float):
+        self.command = command
+        self.args = args
+        self.how = how
+        self.match_ms = match_ms
+        self.handler_ms = 0.0
+
+
+REGISTRY = []
+
+
+def command(name: str, *patterns: str, examples: tuple = (), require: tuple = ()):
+    """Register a handler(args: dict, speak) -> str for utterances matching any pattern."""
+    def register(handler):
+        REGISTRY.append(QuickCommand(name, patterns, examples, handler, require))
+        return handler
+    return register
+
+
+def match(text: str) -> Match | None:
+    t0 = time.perf_counter()
+    norm = normalize(text)
+    if not norm:
+        return None
+
+    for cmd in REGISTRY:
+        for pattern in cmd.patterns:
+            m = pattern.fullmatch(norm)
+            if m:
+                return Match(cmd, m.groupdict(), "pattern", (time.perf_counter() - t0) * 1000)
+
+    words = norm.split()
+    if len(words) <= FUZZY_MAX_WORDS:
+        matcher = difflib.SequenceMatcher(a=norm, autojunk=False)
+        best, best_ratio = None, FUZZY_MIN_RATIO
+        for cmd in REGISTRY:
+            if cmd.require and cmd.require.isdisjoint(words):
+                continue
+            for example in cmd.examples:
+                matcher.set_seq2(example)
+                if matcher.real_quick_ratio() >= best_ratio and matcher.quick_ratio() >= best_ratio:
+                    ratio = matcher.ratio()
+                    if ratio >= best_ratio:
+                        best, best_ratio = cmd, ratio
+        if best is not None:
+            return Match(best, {}, "fuzzy", (time.perf_counter() - t0) * 1000)
+    return None
+
+
+def run(found: Match, speak) -> str:
+    """Run the matched handler, recording its latency. Returns the reply text."""
+    cmd = found.command
+    t0 = time.perf_counter()
+    try:
+        return cmd.handler(found.args, speak)
+    finally:
+        elapsed = found.handler_ms = (time.perf_counter() - t0) * 1000
+        cmd.count += 1
+        cmd.total_ms += elapsed
+        cmd.max_ms = max(cmd.max_ms, elapsed)
+
+
+def snapshot() -> dict:
+    return {cmd.name: cmd.snapshot() for cmd in REGISTRY if cmd.count}
+
+
+# ─── Helpers ─────────────────────────────────────────────────────────────
+
+_WEEKDAYS = ["lunes", "martes", "miércoles", "jueves", "viernes", "sábado", "domingo"]
+_MONTHS = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio",
+           "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+_NUMBERS = {
+    "un": 1, "uno": 1, "una": 1, "dos": 2, "tres": 3, "cuatro": 4, "cinco": 5,
+    "seis": 6, "siete": 7, "ocho": 8, "nueve": 9, "diez": 10, "once": 11,
+    "doce": 12, "quince": 15, "veinte": 20, "veinticinco": 25, "treinta": 30,
+    "cuarenta": 40, "cuarenta y cinco": 45, "cincuenta": 50, "sesenta": 60, "noventa": 90,
+}
+_UNITS = {"segundo": 1, "minuto": 60, "hora": 3600}
+_NUMBER = r"(?P<amount>\d+|" + "|".join(sorted(_NUMBERS, key=len, reverse=True)) + r")"
+_UNIT = r"(?P<unit>segundos?|minutos?|horas?)"
+
+
+def _plural(n: int, unit: str) -> str:
+    return f"{n} {unit}" if n == 1 else f"{n} {unit}s"
+
+
+def describe_duration(seconds: int) -> str:
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    parts = []
+    if hours:
+        parts.append(_plural(hours, "hora"))
+    if minutes:
+        parts.append(_plural(minutes, "minuto"))
+    if secs or not parts:
+        parts.append(_plural(secs, "segundo"))
+    return " y ".join(parts)
+
+
+# ─── Commands ────────────────────────────────────────────────────────────
+
+@command("time",
+         r"(?:que|q) hora(?: es| son)?(?: ahora)?",
+         r"(?:la )?hora",
+         examples=("qué hora es", "dime la hora"),
+         require=("es", "son"))
+def tell_time(args, speak) -> str:
+    now = datetime.now()
+    verb = "Es la" if now.hour in (1, 13) else "Son las"
+    return f"{verb} {now.hour}:{now.minute:02d}."
+
+
+@command("date",
+         r"(?:que|q) (?:dia|fecha) es(?: hoy)?",
+         r"(?:a )?que (?:dia|fecha) estamos(?: hoy)?",
+         r"(?:la )?fecha(?: de hoy)?",
+         examples=("qué día es hoy", "qué fecha es hoy"),
+         require=("es", "estamos"))
+def tell_date(args, speak) -> str:
+    today = datetime.now()
+    return (f"Hoy es {_WEEKDAYS[today.weekday()]} {today.day} "
+            f"de {_MONTHS[today.month - 1]} de {today.year}.")
+
+
+_timers = {}  # id → (threading.Timer, due monotonic time, seconds)
+_timers_lock = threading.Lock()
+
+
+@command("timer_start",
+         r"(?:pon|ponme|crea|inicia|activa|programa)(?: una?)? (?:temporizador|timer|alarma) de "
+         + _NUMBER + r" " + _UNIT,
+         r"(?:avisame|despiertame|recuerdamelo) (?:en|dentro de) " + _NUMBER + r" " + _UNIT,
+         r"(?:pon|ponme|crea|inicia|activa|programa)(?: una?)? (?:temporizador|timer|alarma) de (?P<half>media hora)")
+def start_timer(args, speak) -> str:
+    if args.get("half"):
+        seconds = 1800
+    else:
+        amount = args["amount"]
+        n = int(amount) if amount.isdigit() else _NUMBERS[amount]
+        seconds = n * _UNITS[args["unit"].rstrip("s")]
+    label = describe_duration(seconds)
+
+    def fire():
+        with _timers_lock:
+            _timers.pop(timer_id, None)
+        speak(f"Tu temporizador de {label} ha terminado.")
+
+    timer = threading.Timer(seconds, fire)
+    timer.daemon = True
+    with _timers_lock:
+        timer_id = id(timer)
+        _timers[timer_id] = (timer, time.monotonic() + seconds, seconds)
+    timer.start()
+    return f"Temporizador de {label} en marcha."
+
+
+@command("timer_left",
+         r"cuanto (?:tiempo )?(?:le )?queda(?: al| del| de)? (?:temporizador|timer)",
+         examples=("cuánto queda del temporizador",))
+def timer_left(args, speak) -> str:
+    with _timers_lock:
+        due = sorted(d for _, d, _ in _timers.values())
+    if not due:
+        return "No hay ningún temporizador en marcha."
+    return f"Quedan {describe_duration(max(1, round(due[0] - time.monotonic())))}."
+
+
+@command("timer_cancel",
+         r"(?:cancela|quita|para|deten|borra|elimina)(?: el| los| todos los)? (?:temporizador|temporizadores|timer|alarma)",
+         examples=("cancela el temporizador",))
+def cancel_timers(args, speak) -> str:
+    with _timers_lock:
+        timers = list(_timers.values())
+        _timers.clear()
+    for timer, _, _ in timers:
+        timer.cancel()
+    if not timers:
+        return "No hay ningún temporizador en marcha."
+    return "Temporizador cancelado." if len(timers) == 1 else f"{len(timers)} temporizadores cancelados."
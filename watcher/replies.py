@@ -0,0 +1,223 @@
+"""
+📨 Hey Jarvis — Reply Delivery
+===============================
+Gets the assistant's reply to the response workers the moment it exists,
+instead of polling sessions_history every 2 seconds.
+
+- ReplyWebhook: a small HTTP receiver in the watcher (HJ_REPLY_LISTEN).
+  Point an OpenClaw hook at it; every POST to /reply is an assistant
+  message, either OpenClaw's own message object
+      {"role": "assistant", "content": [{"type": "text", "text": ...}], "timestamp": ...}
+  or simply {"text": ..., "timestamp": ...} (timestamp in ms; missing or
+  not a number means now).
+  A "turn" field (the id in the voice command's "turno: …") routes it to
+  that turn. With HJ_REPLY_TOKEN set, requests must carry
+  "Authorization: Bearer <token>".
+- ReplyBus: routes every reply to exactly one waiting voice turn. Turns
+  register with expect() before their command is queued, so a reply
+  pushed while the command is still being POSTed finds its turn; a reply
+  naming its turn goes there (or nowhere, if that turn is done), any other
+  goes to the oldest turn still waiting that was queued before it.
+  NO_REPLY / empty messages are not answers and keep the turn waiting. The
+  same reply seen twice (pushed, then polled) is routed once, so two
+  commands in flight never both speak one reply; a reply nobody claimed
+  is not "seen" and can still be routed when it comes again.
+
+Polling stays as the fallback (voice_watcher.wait_and_speak_response):
+adaptive, starting fast, and rare while the webhook is delivering.
+
+fake_gateway.py is a stand-in OpenClaw that answers /tools/invoke and
+pushes its replies here, for testing without the real gateway.
+"""
+
+import json
+import time
+import logging
+import threading
+import collections
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+logger = logging.getLogger("voice-watcher-v3")
+
+RECENT_REPLIES = 64
+MAX_BODY = 1024 * 1024
+
+
+def message_text(msg: dict, role: str = "assistant") -> str | None:
+    """Text of a `role` message (string content or text parts), or None."""
+    if msg.get("role", "assistant") != role:
+        return None
+    if isinstance(msg.get("text"), str):
+        return msg["text"]
+    content = msg.get("content", [])
+    if isinstance(content, str):
+        return content
+    parts = [part.get("text", "") for part in content
+             if isinstance(part, dict) and part.get("type") == "text"]
+    return " ".join(parts) if parts else None
+
+
+def message_timestamp(msg: dict) -> int:
+    """The message's timestamp in ms; now if it is missing or not a number (e.g. an ISO string)."""
+    try:
+        return int(msg["timestamp"])
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return int(time.time() * 1000)
+
+
+def is_answer(text: str) -> bool:
+    return bool(text and text.strip() and text.strip() != "NO_REPLY")
+
+
+def _remember(recent: collections.OrderedDict, key, value):
+    recent[key] = value
+    while len(recent) > RECENT_REPLIES:
+        recent.popitem(last=False)
+
+
+class _Waiter:
+    def __init__(self, turn_id: str, after_ms: int):
+        self.turn_id = turn_id
+        self.after_ms = after_ms
+        self.reply = None  # (text, timestamp_ms, how)
+
+
+class ReplyBus:
+    """Routes assistant replies to the voice turns waiting for them."""
+
+    def __init__(self):
+        self._waiters = {}  # turn id → _Waiter, in registration (= send) order
+        self._seen = collections.OrderedDict()  # (timestamp_ms, text) → turn id it went to
+        self._unclaimed = collections.OrderedDict()  # (timestamp_ms, text) of answers nobody took yet
+        self._cond = threading.Condition()
+        self.received = 0
+        self.routed = 0
+        self.unclaimed = 0
+
+    def expect(self, turn_id: str, after_ms: int):
+        """Register a turn whose command is queued at `after_ms`; call before sending it."""
+        with self._cond:
+            self._waiters[turn_id] = _Waiter(turn_id, after_ms)
+
+    def done(self, turn_id: str):
+        with self._cond:
+            self._waiters.pop(turn_id, None)
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def publish(self, text: str, timestamp_ms: int, turn_id: str = None, how: str = "pushed") -> bool:
+        """Route a reply. False if it was a duplicate, not an answer, or nobody is waiting for it."""
+        key = (timestamp_ms, text)
+        with self._cond:
+            if key in self._seen:
+                return False
+            again = key in self._unclaimed  # polled again after nobody took it
+            if not again:
+                self.received += 1
+            if not is_answer(text):
+                _remember(self._seen, key, None)  # never an answer: don't count it again
+                return False
+            if turn_id is not None:
+                waiter = self._waiters.get(turn_id)
+            else:
+                waiter = next((w for w in self._waiters.values()
+                               if w.reply is None and w.after_ms < timestamp_ms), None)
+            if waiter is None or waiter.reply is not None:
+                if not again:
+                    self.unclaimed += 1
+                    logger.info("📨 Reply with no voice turn waiting: '%s'", text[:60])
+                    _remember(self._unclaimed, key, None)
+                return False
+            waiter.reply = (text, timestamp_ms, how)
+            if again:
+                del self._unclaimed[key]
+                self.unclaimed -= 1
+            _remember(self._seen, key, waiter.turn_id)
+            self.routed += 1
+            self._cond.notify_all()
+            return True
+
+    def routed_to(self, text: str, timestamp_ms: int) -> str | None:
+        """The turn a reply seen before went to (None if unknown or unrouted)."""
+        with self._cond:
+            return self._seen.get((timestamp_ms, text))
+
+    def wait_for(self, turn_id: str, timeout: float) -> tuple[str, int, str] | None:
+        """(text, timestamp_ms, "pushed" | "polled") once the turn's reply is in, or None."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                waiter = self._waiters.get(turn_id)
+                if waiter is None:
+                    return None
+                remaining = deadline - time.monotonic()
+                if waiter.reply is not None or remaining <= 0:
+                    return waiter.reply
+                self._cond.wait(remaining)
+
+    def snapshot(self) -> dict:
+        return {"waiting": self.waiting, "received": self.received,
+                "routed": self.routed, "unclaimed": self.unclaimed}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        server = self.server
+        if self.path.rstrip("/") != "/reply":
+            return self._respond(404, {"ok": False, "error": "not found"})
+        if server.token and self.headers.get("Authorization") != f"Bearer {server.token}":
+            return self._respond(401, {"ok": False, "error": "unauthorized"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = 0
+        if not 0 < length <= MAX_BODY:
+            return self._respond(400, {"ok": False, "error": "bad length"})
+        try:
+            msg = json.loads(self.rfile.read(length))
+        except ValueError:
+            return self._respond(400, {"ok": False, "error": "invalid json"})
+        text = message_text(msg) if isinstance(msg, dict) else None
+        if text is None:
+            return self._respond(200, {"ok": True, "ignored": True})
+        server.bus.publish(text, message_timestamp(msg), msg.get("turn"))
+        self._respond(200, {"ok": True})
+
+    def _respond(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        logger.debug("reply webhook: " + fmt, *args)
+
+
+class ReplyWebhook:
+    """HTTP receiver publishing assistant replies POSTed to /reply into `bus`."""
+
+    def __init__(self, listen: str, bus: ReplyBus, token: str = ""):
+        host, _, port = listen.rpartition(":")
+        self._server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), _Handler)
+        self._server.daemon_threads = True
+        self._server.bus = bus
+        self._server.token = token
+        self.listen = listen
+        self._thread = None
+
+    def start(self) -> "ReplyWebhook":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="reply-webhook", daemon=True)
+        self._thread.start()
+        logger.info("📨 Reply webhook listening on http://%s/reply", self.listen)
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,235 @@
+"""
+🧹 Hey Jarvis — Speech Text Normalizer
+=======================================
+Turns an assistant reply (markdown, emoji, links) into plain text for Edge
+TTS. Used by the watcher and tts_speak.py instead of a chain of re.sub
+passes each.
+
+One pass over the text with one tokenizer regex; a small state machine
+decides what each token becomes:
+
+- ```fenced code``` is dropped whole (an unclosed fence drops the rest);
+  `inline code` keeps its text, without the backticks
+- **bold** / *italic*: the asterisks go; a lone "2 * 3" stays
+- [label](url) → label; bare http(s) URLs are dropped, the punctuation
+  after them is kept
+- emoji (and their variation selectors / ZWJ joiners) are dropped
+- "# heading", "- item", "• item", "> quote" lose their markers, and
+  horizontal rules vanish
+- line breaks become spaces, except where a pause belongs — a blank line,
+  after a heading, around list items, after a code block — which become
+  a sentence break (". ", unless the line already ended in punctuation)
+
+SpeechNormalizer works on a stream: feed() returns the normalized text
+that can no longer change — everything up to the last word break, minus
+any link, fence or line start still being decided — and finish() the
+rest. normalize(text) is the one-shot version, with the old length cap.
+
+bench_speech_text.py checks the golden corpus (speech_golden.json), fed
+whole and in random chunks, and times this against the old regex chain.
+"""
+
+import re
+
+EMOJI = ("\U0001F000-\U0001FAFF"   # pictographs, emoticons, flags, supplemental symbols
+         "\u2300-\u23FF"            # technical symbols (⌚ ⏰ ⏳)
+         "\u2600-\u27BF"            # misc symbols, dingbats (☀ ⚠ ✅)
+         "\u2B00-\u2BFF"            # arrows and stars (⭐)
+         "\uFE0F\u200D\u20E3")      # variation selector, zero-width joiner, keycap
+
+TOKEN = re.compile(rf"""
+    (?P<text>(?:[^\r\n`*\[h{EMOJI}]+|h(?!ttps?://))(?:[^\r\n`*\[h{EMOJI}]+|h(?!ttps?://))*)
+  | (?P<nl>[ \t\r]*\n\s*)
+  | (?P<link>\[(?P<label>[^\]\n]*)\]\([^)\s]*\))
+  | (?P<url>https?://[^\s<>()\[\]]*[^\s<>()\[\].,;:!?'"])
+  | (?P<tick>`+)
+  | (?P<star>\*+)
+  | (?P<emoji>[{EMOJI}]+)
+  | (?P<other>.)
+""", re.VERBOSE)
+
+LINE_START = re.compile(r"""
+    (?P<rule>([-*_])(?:[ \t]*\2){2,}[ \t]*(?=\n|\Z))
+  | (?P<heading>\#{1,6}[ \t]+)
+  | (?P<bullet>[-*•+][ \t]+)
+  | (?P<number>(?=\d{1,3}[.)][ \t]))
+  | (?P<quote>>[ \t]?)
+""", re.VERBOSE)
+
+LINK = re.compile(r"\[[^\]\n]*\]\([^)\s]*\)")
+LINK_OPEN = re.compile(r"\[[^\]\n]*(?:\](?:\([^)\s]*)?)?\Z")  # a link that may still be completed
+RULE_SO_FAR = re.compile(r"[-*_ \t]*")
+INLINE_MARKUP = re.compile(rf"[`*{EMOJI}]+")
+SPACES = re.compile(r"[ \t]+")
+PAUSED = ".!?…:;,"
+CLOSING = ".,;:!?…)"  # no space before these when they end a word, e.g. where a URL was dropped
+
+
+class SpeechNormalizer:
+    """Incremental markdown → speech text; feed() chunks as they arrive, then finish()."""
+
+    def __init__(self):
+        self._buf = ""
+        self._out = []
+        self._last = ""            # last character emitted
+        self._space = False        # a space is due before the next word
+        self._in_fence = False
+        self._at_line_start = True
+        self._kind = "text"        # current line: text | heading | item | block
+        self._prev_raw = " "       # raw character before _buf, for * flanking
+
+    def feed(self, chunk: str) -> str:
+        self._buf += chunk
+        return self._run(final=False)
+
+    def finish(self) -> str:
+        text = self._run(final=True)
+        self._buf = ""
+        return text
+
+    # ─── Output ─────────────────────────────────────────────────────────
+
+    def _emit(self, s: str):
+        if "  " in s or "\t" in s:
+            s = SPACES.sub(" ", s)
+        if s[:1] == " ":
+            self._space = True
+            s = s[1:]
+        if not s:
+            return
+        trailing = s[-1] == " "
+        if trailing:
+            s = s[:-1]
+        if self._space and self._last and not (s[0] in CLOSING and s[1:2] in ("", " ")):
+            self._out.append(" ")
+        self._out.append(s)
+        self._last = s[-1]
+        self._space = trailing
+
+    def _pause(self):
+        """Sentence break: a period unless the text already paused there."""
+        if self._last and self._last not in PAUSED:
+            self._out.append(".")
+            self._last = "."
+        self._space = True
+
+    def _take(self) -> str:
+        text = "".join(self._out)
+        self._out.clear()
+        return text
+
+    # ─── Scanning ───────────────────────────────────────────────────────
+
+    def _run(self, final: bool) -> str:
+        buf, pos = self._buf, 0
+        while True:
+            if self._in_fence:
+                close = buf.find("```", pos)
+                if close < 0:
+                    # drop the code, keeping two characters in case "```" is split across chunks
+                    pos = len(buf) if final else max(pos, len(buf) - 2)
+                    break
+                pos = close + 3
+                self._in_fence = False
+                self._kind = "block"
+                continue
+            end = len(buf) if final else self._safe_end()
+            if end > pos:
+                pos = self._scan(pos, end)
+            if not self._in_fence:
+                break
+        if pos:
+            self._prev_raw = buf[pos - 1]
+            self._buf = buf[pos:]
+        return self._take()
+
+    def _safe_end(self) -> int:
+        """How much of the buffer no later input can change."""
+        buf = self._buf
+        blank = max(buf.rfind(" "), buf.rfind("\t")) + 1
+        bracket = buf.rfind("[", 0, blank)
+        if bracket >= 0 and "\n" not in buf[bracket:blank]:
+            link = LINK.match(buf, bracket)
+            if (link.end() > blank) if link else LINK_OPEN.match(buf, bracket):
+                # a link label or target still to come
+                blank = max(buf.rfind(" ", 0, bracket), buf.rfind("\t", 0, bracket)) + 1
+        line_start = buf.rfind("\n", 0, blank) + 1
+        if line_start == 0 and not self._at_line_start:
+            return blank  # the line began in an earlier chunk: its start is decided
+        line = buf[line_start:blank]
+        if line.strip() and not RULE_SO_FAR.fullmatch(line):
+            return blank
+        # the last line's marker (or whether it is a rule) isn't known yet: stop before its line break
+        return len(buf[:line_start].rstrip())
+
+    def _line_start(self, pos: int, end: int) -> int:
+        """Consume a heading/list/quote marker or a rule at `pos`; sets the line's kind."""
+        m = LINE_START.match(self._buf, pos, end)
+        if m is None:
+            self._kind = "text"
+            return pos
+        kind = m.lastgroup
+        if kind == "rule":
+            self._kind = "block"
+        elif kind == "heading":
+            self._kind = "heading"
+        elif kind in ("bullet", "number"):
+            self._kind = "item"
+        else:
+            self._kind = "text"
+        return m.end()
+
+    def _scan(self, pos: int, end: int) -> int:
+        """Normalize buf[pos:end]; returns where it stopped (after an opening fence, or `end`)."""
+        buf, match, emit = self._buf, TOKEN.match, self._emit
+        if self._at_line_start:
+            pos = self._line_start(pos, end)
+            self._at_line_start = False
+        while pos < end:
+            m = match(buf, pos, end)
+            kind, start, pos = m.lastgroup, pos, m.end()
+            if kind == "text":
+                emit(m.group())
+            elif kind == "nl":
+                previous = self._kind
+                pos = self._line_start(pos, end)
+                if buf.count("\n", start, m.end()) > 1 or previous != "text" or self._kind != "text":
+                    self._pause()
+                else:
+                    self._space = True
+            elif kind == "link":
+                label = INLINE_MARKUP.sub("", m.group("label"))
+                if label.strip():
+                    emit(label)
+            elif kind == "star":
+                before = buf[start - 1] if start else self._prev_raw
+                after = buf[pos] if pos < len(buf) else " "
+                if before.isspace() and after.isspace():
+                    emit(m.group())  # "2 * 3": not emphasis
+            elif kind == "tick":
+                if pos - start >= 3:
+                    self._in_fence = True
+                    return pos
+            elif kind == "other":
+                if m.group() != "\r":
+                    emit(m.group())
+            # url, emoji: dropped
+        return end
+
+
+def truncate(text: str, max_chars: int) -> str:
+    """Cut to `max_chars` at the last sentence end past halfway, else mid-sentence with '...'."""
+    if len(text) <= max_chars:
+        return text
+    truncated = text[:max_chars]
+    last_period = truncated.rfind('.')
+    if last_period > max_chars // 2:
+        return truncated[:last_period + 1]
+    return truncated + "..."
+
+
+def normalize(text: str, max_chars: int = None) -> str:
+    """Speech text for a whole reply, capped at `max_chars`."""
+    normalizer = SpeechNormalizer()
+    clean = (normalizer.feed(text) + normalizer.finish()).strip()
+    return truncate(clean, max_chars) if max_chars else clean
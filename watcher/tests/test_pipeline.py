@@ -0,0 +1,61 @@
+"""The outbox keeps delivering while the respond stage is full."""
+
+import threading
+import time
+
+from outbox import Outbox
+from pipeline import Stage
+
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_delivery_continues_while_responder_is_full(tmp_path):
+    release = threading.Event()
+    answered = []
+
+    def respond(turn):  # a turn waiting the full reply timeout
+        release.wait(10)
+        answered.append(turn)
+
+    responder = Stage("respond", respond, maxsize=1, workers=1).start()
+    outbox = Outbox(tmp_path / "outbox.db", lambda payload, key: True).start()
+    try:
+        turns = [f"turn-{i}" for i in range(6)]
+        for turn in turns:
+            outbox.put(turn, {"text": turn},
+                       on_done=lambda status, sent_at, turn=turn: responder.hand_off(turn, key=None))
+
+        # One turn in the handler, one in the queue, the rest handed off: every command still goes out
+        assert wait_until(lambda: outbox.delivered == len(turns))
+        assert outbox.depth == 0
+        assert not answered
+        assert responder.snapshot()["handoff"] > 0
+
+        release.set()
+        assert wait_until(lambda: len(answered) == len(turns))
+        assert answered == turns  # handed-off turns keep their order
+        assert responder.snapshot()["handoff"] == 0
+    finally:
+        release.set()
+        outbox.stop()
+        responder.stop()
+
+
+def test_hand_off_never_blocks(tmp_path):
+    release = threading.Event()
+    responder = Stage("respond", lambda turn: release.wait(10), maxsize=1, workers=1).start()
+    try:
+        t0 = time.perf_counter()
+        for i in range(50):
+            responder.hand_off(i, key=None)
+        assert time.perf_counter() - t0 < 0.5
+    finally:
+        release.set()
+        responder.stop()
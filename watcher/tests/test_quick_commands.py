@@ -0,0 +1,46 @@
+"""Which transcripts the quick commands answer, and which go on to the LLM."""
+
+import pytest
+
+import quick_commands
+
+CASES = [
+    ("¿Qué hora es?", "time", {}),
+    ("Oye Jarvis, ¿qué hora es, por favor?", "time", {}),
+    ("que ora es", "time", {}),  # Whisper slip, fuzzy
+    ("¿Qué día es hoy?", "date", {}),
+    ("Pon un temporizador de cinco minutos", "timer_start", {"amount": "cinco", "unit": "minutos"}),
+    ("Pon una alarma de una hora", "timer_start", {"amount": "una", "unit": "hora"}),
+    ("Avísame en 90 segundos", "timer_start", {"amount": "90", "unit": "segundos"}),
+    ("Pon un temporizador de media hora", "timer_start", {"half": "media hora"}),
+    ("¿Cuánto queda del temporizador?", "timer_left", {}),
+    ("Cancela el temporizador", "timer_cancel", {}),
+]
+
+NOT_QUICK = [
+    "¿Qué hora era?",  # past tense: not asking for the time now
+    "¿Qué día era ayer?",
+    "¿Qué hora es la reunión de mañana?",
+    "Pon música de los ochenta",
+    "",
+]
+
+
+@pytest.mark.parametrize("text, name, args", CASES)
+def test_matches(text, name, args):
+    found = quick_commands.match(text)
+    assert found is not None and found.command.name == name
+    assert {k: v for k, v in found.args.items() if v is not None} == args
+
+
+@pytest.mark.parametrize("text", NOT_QUICK)
+def test_goes_to_the_assistant(text):
+    assert quick_commands.match(text) is None
+
+
+def test_timer_of_one_hour():
+    found = quick_commands.match("pon una alarma de una hora")
+    try:
+        assert quick_commands.run(found, speak=lambda text: None) == "Temporizador de 1 hora en marcha."
+    finally:
+        quick_commands.run(quick_commands.match("cancela el temporizador"), speak=lambda text: None)
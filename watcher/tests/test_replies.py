@@ -0,0 +1,75 @@
+"""ReplyBus routing when replies arrive early, late or twice; the /reply webhook."""
+
+import http.client
+import json
+import time
+
+import pytest
+
+from replies import ReplyBus, ReplyWebhook
+
+
+def test_reply_pushed_while_command_is_being_sent():
+    bus = ReplyBus()
+    bus.expect("a1", after_ms=1000)  # registered before the command is queued
+    assert bus.publish("Hecho.", 1500, how="pushed")  # POST not returned yet
+    assert bus.wait_for("a1", timeout=0) == ("Hecho.", 1500, "pushed")
+    assert not bus.publish("Hecho.", 1500, how="polled")  # the poll sees it again: routed once
+
+
+def test_unclaimed_reply_can_still_be_routed():
+    bus = ReplyBus()
+    assert not bus.publish("Son las cinco.", 2000, turn_id="b2")
+    assert bus.snapshot()["unclaimed"] == 1
+
+    bus.expect("b2", after_ms=1000)
+    assert bus.publish("Son las cinco.", 2000, turn_id="b2", how="polled")
+    assert bus.wait_for("b2", timeout=0) == ("Son las cinco.", 2000, "polled")
+    assert bus.snapshot() == {"waiting": 1, "received": 1, "routed": 1, "unclaimed": 0}
+
+
+def test_untagged_reply_goes_to_oldest_turn_queued_before_it():
+    bus = ReplyBus()
+    bus.expect("c1", after_ms=1000)
+    bus.expect("c2", after_ms=2000)
+    assert not bus.publish("NO_REPLY", 2500)
+    assert bus.publish("Primera.", 2600)
+    assert bus.publish("Segunda.", 2700)
+    assert bus.routed_to("Primera.", 2600) == "c1"
+    assert bus.routed_to("Segunda.", 2700) == "c2"
+
+
+@pytest.fixture
+def webhook():
+    bus = ReplyBus()
+    hook = ReplyWebhook("127.0.0.1:0", bus).start()
+    yield bus, hook._server.server_address[1]
+    hook.stop()
+
+
+def post_reply(port: int, body: bytes, length: str = None) -> tuple[int, dict]:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        conn.putrequest("POST", "/reply")
+        conn.putheader("Content-Type", "application/json")
+        conn.putheader("Content-Length", length if length is not None else str(len(body)))
+        conn.endheaders(body)
+        resp = conn.getresponse()
+        return resp.status, json.loads(resp.read())
+    finally:
+        conn.close()
+
+
+def test_webhook_takes_a_timestamp_that_is_not_a_number(webhook):
+    bus, port = webhook
+    bus.expect("d1", after_ms=1000)
+    body = json.dumps({"text": "hola", "timestamp": "2026-10-17T10:00:00Z", "turn": "d1"}).encode()
+    assert post_reply(port, body) == (200, {"ok": True})
+    text, timestamp_ms, how = bus.wait_for("d1", timeout=0)
+    assert (text, how) == ("hola", "pushed")
+    assert abs(timestamp_ms - time.time() * 1000) < 5000  # taken as now
+
+
+def test_webhook_rejects_a_bad_content_length(webhook):
+    _, port = webhook
+    assert post_reply(port, b"{}", length="lots") == (400, {"ok": False, "error": "bad length"})
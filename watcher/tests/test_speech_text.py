@@ -0,0 +1,31 @@
+"""Every golden case comes out of speech_text exactly as written, whole or streamed."""
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from speech_text import SpeechNormalizer, normalize
+
+CASES = json.loads((Path(__file__).resolve().parent.parent / "speech_golden.json").read_text(encoding="utf-8"))
+STREAMED = [case for case in CASES if not case.get("max_chars")]  # the length cap is one-shot only
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case["name"] for case in CASES])
+def test_normalize(case):
+    assert normalize(case["input"], case.get("max_chars")) == case["expected"]
+
+
+@pytest.mark.parametrize("case", STREAMED, ids=[case["name"] for case in STREAMED])
+def test_fed_in_chunks(case):
+    rng = random.Random(case["name"])
+    for max_chunk in (1, 3, 8, 32):
+        normalizer = SpeechNormalizer()
+        text, parts, i = case["input"], [], 0
+        while i < len(text):
+            n = rng.randint(1, max_chunk)
+            parts.append(normalizer.feed(text[i:i + n]))
+            i += n
+        parts.append(normalizer.finish())
+        assert "".join(parts).strip() == case["expected"], f"chunks of up to {max_chunk}"
@@ -0,0 +1,161 @@
+"""
+🗃 Hey Jarvis — Transcript Store
+=================================
+SQLite cache of every transcription, keyed by a SHA-256 of the recording
+exactly as it is archived in processed/ or failed/. A recording that comes
+back — moved out of failed/ after a gateway outage, or a duplicate upload —
+is a cache hit and never goes through Whisper twice.
+
+Each row keeps the text, the segments (start, end, text, avg_logprob), the
+Whisper profile that produced it, the transcription time and a status:
+
+    transcribed → sent        delivered to OpenClaw
+                → quick       answered locally (quick_commands.py)
+                → failed      the turn ended in failed/
+
+Eviction runs with the hourly cleanup: rows older than `max_age_days` go
+first, then the least recently used until the text + segments fit in
+`max_bytes`.
+
+Safe to share between the watcher's threads, and between the daemon and
+`voice_watcher.py --reprocess-failed` (WAL mode, short transactions).
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    key            TEXT PRIMARY KEY,
+    name           TEXT NOT NULL,
+    source         TEXT NOT NULL DEFAULT '',
+    text           TEXT NOT NULL,
+    segments       TEXT NOT NULL DEFAULT '[]',
+    duration       REAL NOT NULL,
+    profile        TEXT,
+    transcribe_sec REAL,
+    status         TEXT NOT NULL DEFAULT 'transcribed',
+    created_at     REAL NOT NULL,
+    used_at        REAL NOT NULL,
+    hits           INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS transcripts_used ON transcripts (used_at);
+CREATE INDEX IF NOT EXISTS transcripts_status ON transcripts (status);
+"""
+
+
+def audio_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_key(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class TranscriptStore:
+    """Persistent transcript cache with age and size eviction."""
+
+    def __init__(self, path: Path, max_bytes: int = 50 * 1024 * 1024, max_age_days: float = 30):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+
+    def get(self, key: str) -> dict | None:
+        """The cached transcript for `key` (counted as a hit), or None."""
+        now = time.time()
+        with self._lock, self._db:
+            row = self._db.execute("SELECT * FROM transcripts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE transcripts SET used_at = ?, hits = hits + 1 WHERE key = ?",
+                             (now, key))
+        self.hits += 1
+        entry = dict(row)
+        entry["segments"] = json.loads(entry["segments"])
+        return entry
+
+    def peek(self, key: str) -> dict | None:
+        """Like get() without counting a hit or refreshing the entry."""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM transcripts WHERE key = ?", (key,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def put(self, key: str, name: str, source: str, text: str, duration: float,
+            segments=(), profile: str = None, transcribe_sec: float = None):
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO transcripts (key, name, source, text, segments, duration,"
+                " profile, transcribe_sec, status, created_at, used_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'transcribed', ?, ?)",
+                (key, name, source, text, json.dumps(list(segments), ensure_ascii=False),
+                 duration, profile, transcribe_sec, now, now),
+            )
+
+    def mark(self, key: str, status: str):
+        with self._lock, self._db:
+            self._db.execute("UPDATE transcripts SET status = ? WHERE key = ?", (status, key))
+
+    def evict(self) -> int:
+        """Drop rows past max_age_days, then LRU rows beyond max_bytes. Returns rows removed."""
+        cutoff = time.time() - self.max_age_days * 86400
+        with self._lock, self._db:
+            removed = self._db.execute("DELETE FROM transcripts WHERE used_at < ?", (cutoff,)).rowcount
+            total = self._db.execute(
+                "SELECT COALESCE(SUM(LENGTH(text) + LENGTH(segments)), 0) FROM transcripts"
+            ).fetchone()[0]
+            if total > self.max_bytes:
+                excess, doomed = total - self.max_bytes, []
+                for row in self._db.execute(
+                    "SELECT key, LENGTH(text) + LENGTH(segments) FROM transcripts ORDER BY used_at"
+                ):
+                    if excess <= 0:
+                        break
+                    doomed.append((row[0],))
+                    excess -= row[1]
+                self._db.executemany("DELETE FROM transcripts WHERE key = ?", doomed)
+                removed += len(doomed)
+        self.evicted += removed
+        return removed
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            rows, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(text) + LENGTH(segments)), 0) FROM transcripts"
+            ).fetchone()
+            by_status = dict(self._db.execute(
+                "SELECT status, COUNT(*) FROM transcripts GROUP BY status"
+            ).fetchall())
+        lookups = self.hits + self.misses
+        return {
+            "entries": rows,
+            "bytes": size,
+            "by_status": by_status,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "evicted": self.evicted,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,167 @@
+"""
+💾 Hey Jarvis — TTS Cache
+==========================
+Synthesized speech on disk, so replies that come back again and again
+("Hecho", "No he recibido respuesta", timer confirmations, the same
+sentence in a streamed reply) skip the Edge TTS round trip: a hit is one
+file read, a few ms instead of ~1s.
+
+- Content-addressed: <sha256 of voice + normalized text>.mp3, normalized
+  meaning NFC with whitespace collapsed, so the same words in the same
+  voice always map to the same file.
+- Atomic inserts: written to a temporary file in the cache directory and
+  renamed into place, so a reader never sees half an MP3 — the watcher
+  and `tts_speak.py` share one cache directory safely.
+- LRU by mtime: a hit touches the file; when the directory grows past
+  max_bytes the least recently used files go until it fits again.
+
+snapshot() reports hits, misses, bytes saved and hit latency for the
+watcher's health file.
+
+HJ_TTS_CACHE_DIR (default: tts/ in the watcher's cache directory, see
+paths.py) / HJ_TTS_CACHE_MB configure both users; HJ_TTS_CACHE_MB=0 turns
+the cache off.
+"""
+
+import os
+import time
+import hashlib
+import threading
+import unicodedata
+import collections
+from pathlib import Path
+
+import paths
+from pipeline import latency_summary
+
+CACHE_DIR = Path(os.environ.get("HJ_TTS_CACHE_DIR", paths.CACHE_DIR / "tts"))
+CACHE_MB = float(os.environ.get("HJ_TTS_CACHE_MB", "100"))
+LATENCY_WINDOW = 200
+
+
+def normalize(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(voice: str, text: str) -> str:
+    return hashlib.sha256(f"{voice}\n{normalize(text)}".encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Size-bounded, content-addressed MP3 cache in a directory."""
+
+    def __init__(self, path: Path = CACHE_DIR, max_bytes: int = int(CACHE_MB * 1024 * 1024)):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.stored = 0
+        self.evicted = 0
+        self._hit_latency = collections.deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self._size = None  # bytes on disk, measured on the first put
+        if self.enabled:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _file(self, voice: str, text: str) -> Path:
+        return self.path / f"{cache_key(voice, text)}.mp3"
+
+    def get(self, voice: str, text: str) -> bytes | None:
+        """Cached audio for `text` in `voice` (refreshing its LRU position), or None."""
+        if not self.enabled:
+            return None
+        t0 = time.perf_counter()
+        path = self._file(voice, text)
+        try:
+            audio = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        if not audio:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.bytes_saved += len(audio)
+        self._hit_latency.append(time.perf_counter() - t0)
+        return audio
+
+    def put(self, voice: str, text: str, audio: bytes):
+        """Store audio atomically; evicts LRU files if the cache is over its size."""
+        if not self.enabled or not audio:
+            return
+        path = self._file(voice, text)
+        tmp = path.with_name(f".{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_bytes(audio)
+            tmp.replace(path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            return
+        self.stored += 1
+        with self._lock:
+            if self._size is None:
+                self._size = self._measure()[1]
+            else:
+                self._size += len(audio)
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def _measure(self) -> tuple[list, int]:
+        """(mtime, size, path) of every cached file, oldest first, and their total size."""
+        entries = []
+        for f in self.path.glob("*.mp3"):
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, f))
+        entries.sort()
+        return entries, sum(e[1] for e in entries)
+
+    def evict(self) -> int:
+        """Remove least recently used files until the cache fits in max_bytes. Returns files removed."""
+        if not self.enabled:
+            return 0
+        with self._lock:
+            entries, total = self._measure()
+            removed = 0
+            for _, size, f in entries:
+                if total <= self.max_bytes:
+                    break
+                f.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+            self._size = total
+            for tmp in self.path.glob(".*.tmp"):  # left by a writer that crashed mid-insert
+                try:
+                    if time.time() - tmp.stat().st_mtime > 3600:
+                        tmp.unlink()
+                except OSError:
+                    pass
+        self.evicted += removed
+        return removed
+
+    def snapshot(self) -> dict:
+        if not self.enabled:
+            return {"enabled": False}
+        with self._lock:
+            entries, size = self._measure()
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(entries),
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "bytes_saved": self.bytes_saved,
+            "stored": self.stored,
+            "evicted": self.evicted,
+            "hit_latency": latency_summary(list(self._hit_latency)),
+        }
@@ -4,6 +4,8 @@
 ==================================================
 Generates speech using Microsoft Edge TTS (free, fast, high quality).
 Saves WAV to shared folder for Windows playback.
+Shares the watcher's TTS cache (tts_cache.py): text spoken before is not
+synthesized again.
 
 Usage:
     python3 tts_speak.py "Hola Diego"
@@ -12,8 +14,8 @@ Usage:
 
 import os
 import sys
-import re
 import json
+import uuid
 import asyncio
 import argparse
 from pathlib import Path
@@ -21,55 +23,41 @@ from datetime import datetime
 
 import edge_tts
 
+from tts_cache import TTSCache
+from speech_text import normalize
+
 # ─── Configuration ───────────────────────────────────────────────────────
 
 DEFAULT_VOICE = os.environ.get("TTS_VOICE", "es-ES-AlvaroNeural")
 RESPONSE_DIR = Path("/mnt/c/Users/YOUR_USER/hey-jarvis-responses")
 MAX_TEXT_LENGTH = 800
 
-
-# ─── Text Cleaning ──────────────────────────────────────────────────────
-
-def clean_text(text: str) -> str:
-    """Clean text for natural speech."""
-    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)
-    text = re.sub(r'\*(.+?)\*', r'\1', text)
-    text = re.sub(r'`(.+?)`', r'\1', text)
-    text = re.sub(r'```[\s\S]*?```', '', text)
-    text = re.sub(r'#{1,6}\s', '', text)
-    text = re.sub(r'\[(.+?)\]\(.+?\)', r'\1', text)
-    text = re.sub(r'https?://\S+', '', text)
-    text = re.sub(r'[\U0001F300-\U0001F9FF\U00002700-\U000027BF\U0001FA00-\U0001FA6F\U0001FA70-\U0001FAFF]', '', text)
-    text = re.sub(r'^[\s]*[•\-\*]\s', '', text, flags=re.MULTILINE)
-    text = re.sub(r'\n{2,}', '. ', text)
-    text = re.sub(r'\n', ' ', text)
-    text = re.sub(r'\s{2,}', ' ', text)
-    text = text.strip()
-
-    if len(text) > MAX_TEXT_LENGTH:
-        truncated = text[:MAX_TEXT_LENGTH]
-        last_period = truncated.rfind('.')
-        if last_period > MAX_TEXT_LENGTH // 2:
-            text = truncated[:last_period + 1]
-        else:
-            text = truncated + "..."
-
-    return text
+cache = TTSCache()
 
 
 # ─── TTS ─────────────────────────────────────────────────────────────────
 
 async def generate_speech(text: str, voice: str, output_path: Path) -> bool:
-    """Generate speech with Edge TTS."""
-    communicate = edge_tts.Communicate(text, voice)
-    await communicate.save(str(output_path))
-    return output_path.exists() and output_path.stat().st_size > 0
+    """Generate speech with Edge TTS, or copy it from the TTS cache."""
+    audio = cache.get(voice, text)
+    if audio is None:
+        communicate = edge_tts.Communicate(text, voice)
+        chunks = []
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                chunks.append(chunk["data"])
+        audio = b"".join(chunks)
+        cache.put(voice, text, audio)
+    else:
+        print("TTS cache hit")
+    output_path.write_bytes(audio)
+    return output_path.stat().st_size > 0
 
 
 def speak(text: str, voice: str = None) -> bool:
     """Generate speech and save to shared folder."""
     voice = voice or DEFAULT_VOICE
-    clean = clean_text(text)
+    clean = normalize(text, MAX_TEXT_LENGTH)
 
     if not clean:
         print("Empty text after cleaning", file=sys.stderr)
@@ -78,21 +66,27 @@ def speak(text: str, voice: str = None) -> bool:
     print(f"TTS: voice={voice}, text='{clean[:60]}...'")
 
     RESPONSE_DIR.mkdir(parents=True, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    wav_path = RESPONSE_DIR / f"response_{timestamp}.mp3"
-    json_path = RESPONSE_DIR / f"response_{timestamp}.json"
+    # Same stem as voice_watcher: two calls in one second must not overwrite each other
+    turn_id = uuid.uuid4().hex[:12]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+    stem = f"response_{timestamp}_{turn_id}"
+    wav_path = RESPONSE_DIR / f"{stem}.mp3"
+    json_path = RESPONSE_DIR / f"{stem}.json"
 
     try:
         success = asyncio.run(generate_speech(clean, voice, wav_path))
 
         if success:
-            with open(json_path, 'w', encoding='utf-8') as f:
+            tmp_path = json_path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump({
                     "audio_file": wav_path.name,
                     "text": clean[:200],
                     "voice": voice,
                     "timestamp": timestamp,
+                    "turn": turn_id,
                 }, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, json_path)  # the player only ever sees complete JSON
             print(f"✅ Saved: {wav_path.name} ({wav_path.stat().st_size} bytes)")
             return True
         else:
@@ -0,0 +1,109 @@
+"""
+🗣 Hey Jarvis — Streaming TTS
+==============================
+Speaks a reply sentence by sentence instead of all at once. The cleaned
+text is split into segments: the first sentence alone (so it is
+synthesized in a few hundred ms), then whole sentences packed into
+segments that double in size up to SEGMENT_MAX_CHARS — each one is
+synthesized while the one before it plays, so it has more time to be
+ready the longer the reply gets. stream_speech() synthesizes up to `ahead`
+segments concurrently and hands each one over in order as soon as it and
+everything before it are ready, so the player starts on the first
+sentence while the later ones are still being generated.
+
+The watcher sends segments as response_<time>_<turn>_<seq>.mp3 with
+"seq" and "final" in their metadata; audio_player.py plays a turn's
+segments back to back in seq order.
+"""
+
+import re
+import asyncio
+
+FIRST_MIN_CHARS = 40     # "Vale." alone is too short to be worth a segment
+FIRST_MAX_CHARS = 120    # a longer first sentence is cut at a comma/semicolon
+SEGMENT_MAX_CHARS = 300
+LOOKAHEAD = 2            # segments synthesized at once
+
+# Sentence end: . ! ? … (plus closing quotes/brackets), whitespace, then
+# something that can start a sentence
+SENTENCE_END = re.compile(r'(?<=[.!?…])["\'»)\]]*\s+(?=[¿¡"«(\[]?[A-ZÁÉÍÓÚÑÜ0-9])')
+CLAUSE_END = re.compile(r'[,;:]\s+')
+ABBREVIATIONS = {"sr", "sra", "srta", "dr", "dra", "ud", "uds", "etc", "ej", "aprox", "núm", "pág",
+                 "mr", "mrs", "ms", "vs"}
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split cleaned text into sentences, keeping "Sr. García" and "p. ej." whole."""
+    sentences, start = [], 0
+    for match in SENTENCE_END.finditer(text):
+        before = text[start:match.start()].rstrip("\"'»)]")
+        last_word = before.rsplit(None, 1)[-1] if before.split() else ""
+        if last_word.endswith(".") and last_word[:-1].lower().rsplit(".", 1)[-1] in ABBREVIATIONS:
+            continue
+        sentences.append(text[start:match.start()].strip())
+        start = match.end()
+    sentences.append(text[start:].strip())
+    return [s for s in sentences if s]
+
+
+def _cut(sentence: str, limit: int) -> list[str]:
+    """Split an over-long sentence at the last clause boundary before `limit`."""
+    parts = []
+    while len(sentence) > limit:
+        cuts = [m.end() for m in CLAUSE_END.finditer(sentence, 0, limit)]
+        if not cuts:
+            break
+        parts.append(sentence[:cuts[-1]].strip())
+        sentence = sentence[cuts[-1]:]
+    parts.append(sentence.strip())
+    return parts
+
+
+def plan_segments(text: str, first_max: int = FIRST_MAX_CHARS,
+                  max_chars: int = SEGMENT_MAX_CHARS) -> list[str]:
+    """The first sentence on its own, then whole sentences packed into growing segments."""
+    parts = [part for sentence in split_sentences(text) for part in _cut(sentence, max_chars)]
+    if not parts:
+        return []
+    head = _cut(parts.pop(0), first_max)
+    segments, parts = [head[0]], head[1:] + parts
+    while parts and len(segments[0]) < FIRST_MIN_CHARS and len(segments[0]) + 1 + len(parts[0]) <= first_max:
+        segments[0] += " " + parts.pop(0)
+
+    limit, current = max(2 * len(segments[0]), first_max), ""
+    for part in parts:
+        if current and len(current) + 1 + len(part) > limit:
+            segments.append(current)
+            current, limit = part, min(2 * limit, max_chars)
+        else:
+            current = f"{current} {part}" if current else part
+    if current:
+        segments.append(current)
+    return segments
+
+
+async def stream_speech(segments: list[str], synthesize, on_segment, ahead: int = LOOKAHEAD) -> int:
+    """Synthesize `segments` (`await synthesize(text) -> bytes`), at most `ahead` at a time.
+
+    Calls on_segment(seq, text, audio, final) in order as soon as each segment
+    and all before it are done. Returns the number of segments handed over.
+    A failed or empty segment stops the stream there.
+    """
+    slots = asyncio.Semaphore(ahead)
+
+    async def run(text):
+        async with slots:
+            return await synthesize(text)
+
+    tasks = [asyncio.ensure_future(run(text)) for text in segments]
+    try:
+        for seq, task in enumerate(tasks):
+            audio = await task
+            if not audio:
+                return seq
+            on_segment(seq, segments[seq], audio, seq == len(segments) - 1)
+        return len(tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -2,8 +2,11 @@
 """
 🔍 Hey Jarvis V3 — Voice Watcher Daemon
 =========================================
-Monitors shared audio folder for WAV files from the Windows listener.
-Transcribes with faster-whisper GPU and injects into OpenClaw via Gateway API.
+Monitors shared audio folder for WAV files from the Windows listener,
+or PCM streams it appends to while still recording (HJ_STREAM_RECORDINGS).
+Transcribes with faster-whisper (GPU or CPU int8, whisper_profiles.py) and injects into OpenClaw via Gateway API.
+Transcription, gateway dispatch and spoken responses run as separate
+pipeline stages (pipeline.py), so a slow gateway never delays the next file.
 
 Production-grade: logging, error handling, retry, health checks, file cleanup.
 Runs as systemd user service in WSL2.
@@ -17,12 +20,29 @@ import wave
 import signal
 import logging
 import asyncio
+import io
 import re
+import queue
+import uuid
+import collections
 import requests
 from pathlib import Path
 from datetime import datetime, timedelta
 from logging.handlers import RotatingFileHandler
 
+import quick_commands
+import whisper_profiles
+from dir_watch import DirectoryWatcher
+from pipeline import Stage, latency_summary
+from outbox import Outbox, Rejected
+from gateway import GatewayClient, CircuitOpen
+from replies import ReplyBus, ReplyWebhook, message_text, is_answer
+from tts_stream import plan_segments, stream_speech
+from tts_cache import TTSCache
+from speech_text import normalize
+from transcript_store import TranscriptStore, audio_key, file_key
+from paths import CACHE_DIR
+
 # ─── Configuration ───────────────────────────────────────────────────────
 
 AUDIO_DIR = Path("/mnt/c/Users/YOUR_USER/hey-jarvis-audio")
@@ -32,29 +52,76 @@ FAILED_DIR = AUDIO_DIR / "failed"
 GATEWAY_URL = os.environ.get("OPENCLAW_GATEWAY_URL", "http://localhost:18789")
 GATEWAY_TOKEN = os.environ.get("OPENCLAW_GATEWAY_TOKEN", "")
 
-# Whisper config
-WHISPER_MODEL = "large-v3"
-WHISPER_DEVICE = "cuda"
-WHISPER_COMPUTE = "float16"
+# Whisper config: a named profile (whisper_profiles.py); auto = gpu if CUDA is usable, else cpu
+WHISPER_PROFILE = os.environ.get("HJ_WHISPER_PROFILE", "auto")
 WHISPER_LANGUAGE = "es"
 
+# Transcript cache (transcript_store.py): recordings seen before skip Whisper
+TRANSCRIPT_DB = Path(os.environ.get("HJ_TRANSCRIPT_DB", CACHE_DIR / "transcripts.db"))
+TRANSCRIPT_CACHE_MB = float(os.environ.get("HJ_TRANSCRIPT_CACHE_MB", "50"))
+TRANSCRIPT_CACHE_DAYS = float(os.environ.get("HJ_TRANSCRIPT_CACHE_DAYS", "30"))
+
+# Gateway outbox (outbox.py): commands wait here while the gateway is down,
+# and are dropped once older than this — a late "turn off the oven" is worse than none
+OUTBOX_DB = Path(os.environ.get("HJ_OUTBOX_DB", CACHE_DIR / "outbox.db"))
+OUTBOX_MAX_AGE = float(os.environ.get("HJ_OUTBOX_MAX_AGE", "120"))
+
 # Watcher config
 POLL_INTERVAL = 0.5
 MIN_FILE_AGE = 1.0
+# Folder changes arrive as inotify events (dir_watch.py); this sweep catches
+# what inotify misses and drops to POLL_INTERVAL if it ever has to
+WATCH_SWEEP_SEC = float(os.environ.get("HJ_WATCH_SWEEP", "5"))
 MIN_AUDIO_DURATION = 0.5
 MAX_AUDIO_DURATION = 180  # 3 min max (V2 allows up to 2 min recording)
-MAX_RETRIES = 3
-RETRY_DELAY = 2
+RETRY_DELAY = 1         # first gateway retry; doubles (with jitter) up to RETRY_MAX_DELAY
+RETRY_MAX_DELAY = 30
 CLEANUP_DAYS = 7
 HEALTH_INTERVAL = 60
 
+# Raw PCM from the listener (streams and socket transport): 16kHz mono int16
+PCM_SAMPLE_RATE = 16000
+
+# Recording formats the listener writes (HJ_RECORDING_FORMAT) → file extension
+RECORDING_EXTENSIONS = {"pcm": ".wav", "wav": ".wav", "flac": ".flac", "opus": ".ogg"}
+AUDIO_SUFFIXES = {".wav", ".flac", ".ogg"}
+
+# Socket transport (listener/transport.py); folders stay as the fallback
+TRANSPORT_LISTEN = os.environ.get("HJ_TRANSPORT_LISTEN", "")  # e.g. tcp://127.0.0.1:18790
+PLAYER_URL = os.environ.get("HJ_PLAYER_URL", "")              # e.g. tcp://127.0.0.1:18791
+
+# Streamed recordings (listener HJ_STREAM_RECORDINGS=1): ikigai_*.pcm + .json marker
+STREAM_SPECULATE_SEC = 0.6   # trailing silence before speculative transcription
+STREAM_SPEECH_PAD_SEC = 0.3  # audio kept after the last speech frame
+STREAM_STALE_SEC = 30        # marker untouched this long while open → listener died
+
 # V3: Voice response config
 TTS_VOICE = os.environ.get("TTS_VOICE", "es-ES-AlvaroNeural")
 TTS_MAX_TEXT = 800
+# 1 = speak replies sentence by sentence (tts_stream.py): the player starts on
+# the first sentence while the rest is still being synthesized
+TTS_STREAM = os.environ.get("HJ_TTS_STREAM", "1") != "0"
 RESPONSE_DIR = Path("/mnt/c/Users/YOUR_USER/hey-jarvis-responses")
-RESPONSE_POLL_INTERVAL = 2      # seconds between polls for OpenClaw response
+RESPONSE_POLL_INTERVAL = 2      # longest gap between polls for OpenClaw response
 RESPONSE_POLL_MAX_WAIT = 90     # max seconds to wait for response
-RESPONSE_POLL_INITIAL_DELAY = 3 # initial delay before first poll
+RESPONSE_POLL_INITIAL_DELAY = 0.5 # first poll; the gap then doubles up to RESPONSE_POLL_INTERVAL
+
+# Pushed replies (replies.py): OpenClaw POSTs assistant messages to this
+# receiver, e.g. 127.0.0.1:18792; polling then only runs as a safety net
+REPLY_LISTEN = os.environ.get("HJ_REPLY_LISTEN", "")
+REPLY_TOKEN = os.environ.get("HJ_REPLY_TOKEN", "")
+RESPONSE_PUSH_POLL_INTERVAL = 10  # fallback poll gap while the webhook is up
+RESPONSE_HISTORY_LIMIT = 10       # messages per poll: enough to find each in-flight turn's reply
+# Turns waiting for (or speaking) their reply at the same time
+RESPONSE_WORKERS = int(os.environ.get("HJ_RESPONSE_WORKERS", "4"))
+
+# Pipeline (pipeline.py): queue size per stage worker, and gateway senders.
+# Turns from one source always share a worker, so they stay in order
+PIPELINE_QUEUE_SIZE = int(os.environ.get("HJ_PIPELINE_QUEUE", "8"))
+DISPATCH_WORKERS = int(os.environ.get("HJ_DISPATCH_WORKERS", "2"))
+
+# Quick commands (quick_commands.py): answered locally, never sent to OpenClaw
+QUICK_COMMANDS = os.environ.get("HJ_QUICK_COMMANDS", "1") != "0"
 
 # Logging
 LOG_DIR = Path("logs")
@@ -82,7 +149,20 @@ if sys.stdout and hasattr(sys.stdout, 'write'):
 # ─── Globals ─────────────────────────────────────────────────────────────
 
 whisper_model = None
+whisper_settings = None  # the profile actually loaded (after any CPU fallback)
 running = True
+speculative_transcripts = {}  # stream name → (speech_end, (text, duration, details) | None)
+inbox = queue.Queue()  # ("socket", (header, payload)) | ("file" | "stream", path)
+open_streams = set()  # .pcm paths of streamed recordings still being advanced
+in_flight = set()  # recording names queued in the pipeline, not yet archived
+transcripts = TranscriptStore(TRANSCRIPT_DB, max_bytes=int(TRANSCRIPT_CACHE_MB * 1024 * 1024),
+                              max_age_days=TRANSCRIPT_CACHE_DAYS)
+dir_watcher = None
+player_client = None
+reply_bus = ReplyBus()
+reply_webhook = None
+tts_cache = TTSCache()  # shared with tts_speak.py (HJ_TTS_CACHE_DIR / HJ_TTS_CACHE_MB)
+tts_first_audio = collections.deque(maxlen=200)  # reply in → first audio handed to the player (s)
 stats = {
     "started_at": None,
     "files_processed": 0,
@@ -91,6 +171,16 @@ stats = {
     "last_error": None,
     "total_audio_seconds": 0,
     "total_transcription_seconds": 0,
+    "speculative_hits": 0,
+    "speculative_misses": 0,
+    "quick_commands": 0,
+    "transcript_cache_hits": 0,
+    "duplicates": 0,
+    "replies_pushed": 0,
+    "replies_polled": 0,
+    "tts_streamed": 0,
+    "tts_segments": 0,
+    "whisper": None,
 }
 
 # ─── Signal Handlers ────────────────────────────────────────────────────
@@ -106,28 +196,62 @@ signal.signal(signal.SIGINT, handle_signal)
 # ─── Whisper ─────────────────────────────────────────────────────────────
 
 def load_whisper():
-    global whisper_model
+    global whisper_model, whisper_settings
     if whisper_model is not None:
         return whisper_model
 
-    logger.info("Loading faster-whisper %s on %s (%s)...",
-                WHISPER_MODEL, WHISPER_DEVICE, WHISPER_COMPUTE)
-
-    from faster_whisper import WhisperModel
-    whisper_model = WhisperModel(
-        WHISPER_MODEL, device=WHISPER_DEVICE, compute_type=WHISPER_COMPUTE
-    )
-    logger.info("Whisper model loaded ✅")
+    name, settings = whisper_profiles.resolve_profile(WHISPER_PROFILE)
+    logger.info("Loading faster-whisper %s...", whisper_profiles.describe(name, settings))
+    t0 = time.time()
+    try:
+        model = whisper_profiles.load_model(settings)
+    except Exception as e:
+        if settings["device"] == "cpu":
+            raise
+        # No usable GPU after all (cuBLAS/cuDNN missing, out of memory): keep working on CPU
+        logger.warning("Whisper failed on %s (%s), falling back to CPU", settings["device"], e)
+        name = whisper_profiles.CPU_FALLBACK
+        settings = dict(whisper_profiles.PROFILES[name])
+        logger.info("Loading faster-whisper %s...", whisper_profiles.describe(name, settings))
+        model = whisper_profiles.load_model(settings)
+
+    whisper_model, whisper_settings = model, dict(settings, profile=name)
+    stats["whisper"] = whisper_profiles.describe(name, settings)
+    logger.info("Whisper model loaded in %.1fs ✅", time.time() - t0)
     return whisper_model
 
 
-def transcribe(audio_path: Path) -> tuple[str, float]:
-    """Transcribe audio file. Returns (text, duration_seconds)."""
-    model = load_whisper()
+def transcribe(audio_path: Path) -> tuple[str, float, dict]:
+    """Transcribe audio file. Returns (text, duration_seconds, details)."""
+    if audio_path.suffix != ".wav":
+        return transcribe_encoded(str(audio_path))
 
     with wave.open(str(audio_path), 'rb') as wf:
         duration = wf.getnframes() / wf.getframerate()
 
+    return _run_whisper(str(audio_path), duration)
+
+
+def transcribe_encoded(source) -> tuple[str, float, dict]:
+    """Transcribe a FLAC/Opus recording (path or file-like), decoded in memory."""
+    from faster_whisper import decode_audio
+
+    audio = decode_audio(source, sampling_rate=PCM_SAMPLE_RATE)
+    return _run_whisper(audio, len(audio) / PCM_SAMPLE_RATE)
+
+
+def transcribe_pcm(pcm: bytes) -> tuple[str, float, dict]:
+    """Transcribe raw 16kHz mono int16 PCM. Returns (text, duration_seconds, details)."""
+    import numpy as np
+
+    audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+    return _run_whisper(audio, len(audio) / PCM_SAMPLE_RATE)
+
+
+def _run_whisper(audio, duration: float) -> tuple[str, float, dict]:
+    """details: segments, profile and transcribe_sec, as kept by the transcript store."""
+    model = load_whisper()
+
     if duration < MIN_AUDIO_DURATION:
         raise ValueError(f"Audio too short: {duration:.1f}s")
     if duration > MAX_AUDIO_DURATION:
@@ -135,9 +259,9 @@ def transcribe(audio_path: Path) -> tuple[str, float]:
 
     t0 = time.time()
     segments, info = model.transcribe(
-        str(audio_path),
+        audio,
         language=WHISPER_LANGUAGE,
-        beam_size=5,
+        beam_size=whisper_settings["beam_size"],
         no_speech_threshold=0.6,
         condition_on_previous_text=False,
         vad_filter=True,
@@ -147,23 +271,37 @@ def transcribe(audio_path: Path) -> tuple[str, float]:
         ),
     )
 
-    text = " ".join(seg.text.strip() for seg in segments).strip()
+    parts = [
+        {"start": round(seg.start, 2), "end": round(seg.end, 2),
+         "text": seg.text.strip(), "avg_logprob": round(seg.avg_logprob, 3)}
+        for seg in segments
+    ]
+    text = " ".join(part["text"] for part in parts).strip()
     elapsed = time.time() - t0
 
-    logger.info("Transcribed %.1fs → %.1fs → '%s'", duration, elapsed, text[:120])
+    logger.info("Transcribed %.1fs → %.1fs (RTF %.2f) → '%s'", duration, elapsed,
+                elapsed / duration, text[:120])
 
     stats["total_audio_seconds"] += duration
     stats["total_transcription_seconds"] += elapsed
 
-    return text, duration
+    details = {"segments": parts, "profile": whisper_settings["profile"],
+               "transcribe_sec": round(elapsed, 3)}
+    return text, duration, details
 
 # ─── Gateway API ─────────────────────────────────────────────────────────
 
-def send_to_openclaw(text: str, audio_file: str, duration: float) -> bool:
-    """Inject transcribed voice command into OpenClaw session."""
+gateway = GatewayClient(GATEWAY_URL, GATEWAY_TOKEN)
+
+
+TURN_TAG = re.compile(r"turno: ([0-9a-f]{12})")
+
+
+def gateway_message(text: str, audio_file: str, duration: float, turn_id: str) -> str | None:
+    """The wake message for a voice command, or None if there is nothing to send."""
     if not text.strip():
         logger.warning("Empty transcription, skipping")
-        return False
+        return None
 
     # Hallucination filter: common Whisper artifacts on silence
     hallucinations = [
@@ -173,184 +311,230 @@ def send_to_openclaw(text: str, audio_file: str, duration: float) -> bool:
     text_lower = text.lower().strip()
     if any(h in text_lower for h in hallucinations) and len(text_lower) < 40:
         logger.warning("Filtered hallucination: '%s'", text)
-        return False
+        return None
 
-    message = (
+    return (
         f"[Voice Command via Hey Jarvis] "
         f"Diego dijo por voz: \"{text}\"\n"
-        f"(archivo: {audio_file}, duracion: {duration:.1f}s)"
+        f"(archivo: {audio_file}, duracion: {duration:.1f}s, turno: {turn_id})"
     )
 
-    headers = {
-        "Authorization": f"Bearer {GATEWAY_TOKEN}",
-        "Content-Type": "application/json",
-    }
+
+def post_wake(payload: dict, key: str) -> bool:
+    """One delivery attempt for the outbox. False = retry later; Rejected = give up."""
+    try:
+        resp = gateway.invoke(payload["tool"], payload["args"], payload.get("sessionKey"),
+                              headers={"Idempotency-Key": key})
+    except CircuitOpen as e:
+        logger.info("Gateway still down: %s", e)
+        return False
+    except requests.exceptions.ConnectionError:
+        logger.warning("Gateway unreachable")
+        return False
+
+    if resp.status_code == 200:
+        try:
+            data = resp.json()
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and data.get("ok"):
+            logger.info("✅ Sent to OpenClaw")
+            return True
+    if 400 <= resp.status_code < 500 and resp.status_code not in (408, 429):
+        raise Rejected(f"{resp.status_code} {resp.text[:200]}")
+    logger.warning("Gateway response: %d %s", resp.status_code, resp.text[:200])
+    return False
+
+
+def send_to_openclaw(turn) -> bool:
+    """Queue the turn's voice command in the outbox. False if there is nothing to send.
+
+    finish_dispatch() runs once the gateway has accepted it or the outbox gave up.
+    """
+    message = gateway_message(turn.text, turn.name, turn.duration, turn.id)
+    if message is None:
+        return False
     payload = {
         "tool": "cron",
         "args": {"action": "wake", "text": message, "mode": "now"},
         "sessionKey": "agent:main:main",
     }
-
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            resp = requests.post(
-                f"{GATEWAY_URL}/tools/invoke",
-                json=payload, headers=headers, timeout=15,
-            )
-            if resp.status_code == 200 and resp.json().get("ok"):
-                logger.info("✅ Sent to OpenClaw (attempt %d)", attempt)
-                return True
-            else:
-                logger.warning("Gateway response: %d %s", resp.status_code, resp.text[:200])
-        except requests.exceptions.ConnectionError:
-            logger.warning("Gateway unreachable (attempt %d/%d)", attempt, MAX_RETRIES)
-        except Exception as e:
-            logger.error("Gateway error (attempt %d/%d): %s", attempt, MAX_RETRIES, e)
-
-        if attempt < MAX_RETRIES:
-            time.sleep(RETRY_DELAY)
-
-    stats["last_error"] = datetime.now().isoformat()
-    return False
+    # Waiting before the command goes out: the gateway may push the reply before its POST returns
+    reply_bus.expect(turn.id, int(time.time() * 1000))
+    outbox.put(turn.key, payload,
+               on_done=lambda status, sent_at: finish_dispatch(turn, status, sent_at))
+    return True
 
 # ─── V3: Voice Response ──────────────────────────────────────────────────
 
-def clean_text_for_speech(text: str) -> str:
-    """Clean markdown/emoji from text for natural TTS."""
-    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)
-    text = re.sub(r'\*(.+?)\*', r'\1', text)
-    text = re.sub(r'`(.+?)`', r'\1', text)
-    text = re.sub(r'```[\s\S]*?```', '', text)
-    text = re.sub(r'#{1,6}\s', '', text)
-    text = re.sub(r'\[(.+?)\]\(.+?\)', r'\1', text)
-    text = re.sub(r'https?://\S+', '', text)
-    text = re.sub(r'[\U0001F300-\U0001F9FF\U00002700-\U000027BF\U0001FA00-\U0001FA6F\U0001FA70-\U0001FAFF]', '', text)
-    text = re.sub(r'^[\s]*[•\-\*]\s', '', text, flags=re.MULTILINE)
-    text = re.sub(r'\n{2,}', '. ', text)
-    text = re.sub(r'\n', ' ', text)
-    text = re.sub(r'\s{2,}', ' ', text)
-    text = text.strip()
-    if len(text) > TTS_MAX_TEXT:
-        truncated = text[:TTS_MAX_TEXT]
-        last_period = truncated.rfind('.')
-        if last_period > TTS_MAX_TEXT // 2:
-            text = truncated[:last_period + 1]
-        else:
-            text = truncated + "..."
-    return text
-
+def generate_voice_response(text: str, turn_id: str = None):
+    """Generate speech with Edge TTS and hand it to the player.
 
-def generate_voice_response(text: str):
-    """Generate speech with Edge TTS and save to shared folder."""
-    try:
-        import edge_tts
-    except ImportError:
-        logger.error("edge-tts not installed, skipping voice response")
-        return
-
-    clean = clean_text_for_speech(text)
+    Files are named response_<time to the ms>_<turn id>, so replies finishing
+    in the same second never overwrite each other and still sort in order.
+    With HJ_TTS_STREAM each segment gets a _<seq> suffix and is delivered as
+    soon as it is synthesized. Cached replies play without edge-tts installed.
+    """
+    started = time.perf_counter()
+    clean = normalize(text, TTS_MAX_TEXT)
     if not clean:
         logger.warning("Empty text after cleaning, skipping TTS")
         return
 
-    RESPONSE_DIR.mkdir(parents=True, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    audio_path = RESPONSE_DIR / f"response_{timestamp}.mp3"
-    json_path = RESPONSE_DIR / f"response_{timestamp}.json"
+    turn_id = turn_id or new_turn_id()
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+    stem = f"response_{timestamp}_{turn_id}"
+    meta = {
+        "text": clean[:200],
+        "voice": TTS_VOICE,
+        "timestamp": timestamp,
+        "turn": turn_id,
+    }
 
     try:
-        communicate = edge_tts.Communicate(clean, TTS_VOICE)
-        asyncio.run(communicate.save(str(audio_path)))
-
-        if audio_path.exists() and audio_path.stat().st_size > 0:
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump({
-                    "audio_file": audio_path.name,
-                    "text": clean[:200],
-                    "voice": TTS_VOICE,
-                    "timestamp": timestamp,
-                }, f, ensure_ascii=False, indent=2)
-            logger.info("🔊 Voice response saved: %s (%d bytes)",
-                       audio_path.name, audio_path.stat().st_size)
-        else:
-            logger.error("TTS generated empty file")
+        if not TTS_STREAM:
+            audio = asyncio.run(synthesize_speech(clean, TTS_VOICE))
+            if not audio:
+                logger.error("TTS generated empty file")
+                return
+            deliver_response(stem, meta, audio)
+            return
+
+        segments = plan_segments(clean)
+
+        def on_segment(seq, segment, audio, final):
+            if seq == 0:
+                tts_first_audio.append(time.perf_counter() - started)
+                logger.info("🔊 [%s] First audio after %.0fms (%d segment(s))",
+                            turn_id, (time.perf_counter() - started) * 1000, len(segments))
+            deliver_response(f"{stem}_{seq:03d}", {**meta, "text": segment[:200], "seq": seq, "final": final},
+                             audio)
+            stats["tts_segments"] += 1
+
+        done = asyncio.run(stream_speech(segments, lambda segment: synthesize_speech(segment, TTS_VOICE),
+                                         on_segment))
+        stats["tts_streamed"] += 1
+        if done < len(segments):
+            logger.error("TTS generated empty audio for segment %d of %d", done + 1, len(segments))
+    except ImportError:
+        logger.error("edge-tts not installed and reply not cached, skipping voice response")
     except Exception as e:
         logger.error("TTS error: %s", e)
 
 
-def get_last_assistant_message() -> tuple:
-    """Get the last assistant text message and its timestamp from OpenClaw."""
-    headers = {
-        "Authorization": f"Bearer {GATEWAY_TOKEN}",
-        "Content-Type": "application/json",
-    }
-    payload = {
-        "tool": "sessions_history",
-        "args": {"sessionKey": "agent:main:main", "limit": 3, "includeTools": False},
-    }
+def deliver_response(stem: str, meta: dict, audio: bytes):
+    """Push one response (or segment) to the player, or write it to the shared folder."""
+    audio_path = RESPONSE_DIR / f"{stem}.mp3"
+    json_path = RESPONSE_DIR / f"{stem}.json"
+    meta = {"audio_file": audio_path.name, **meta}
+    if player_client is not None and player_client.send("response", meta, audio):
+        logger.info("🔊 Voice response sent to player: %s (%d bytes)", audio_path.name, len(audio))
+        return
+
+    RESPONSE_DIR.mkdir(parents=True, exist_ok=True)
+    audio_path.write_bytes(audio)
+    tmp_path = json_path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    tmp_path.replace(json_path)  # the player only ever sees complete JSON
+    logger.info("🔊 Voice response saved: %s (%d bytes)", audio_path.name, len(audio))
+
+
+async def synthesize_speech(text: str, voice: str) -> bytes:
+    """MP3 bytes for `text`: from the TTS cache if it was spoken before, else from Edge TTS."""
+    audio = tts_cache.get(voice, text)
+    if audio is not None:
+        return audio
+
+    import edge_tts
+
+    communicate = edge_tts.Communicate(text, voice)
+    chunks = []
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            chunks.append(chunk["data"])
+    audio = b"".join(chunks)
+    tts_cache.put(voice, text, audio)
+    return audio
+
+
+def poll_replies():
+    """Fetch recent history and route its replies through the reply bus.
+
+    The agent answers messages in order, so each answer goes to the oldest
+    voice command before it that is still unanswered (by its "turno: …"
+    tag); answers with no command in the window go to the oldest waiting turn.
+    Answers routed on an earlier poll re-align the pairing, in case the
+    window starts in the middle of a burst.
+    """
     try:
-        resp = requests.post(
-            f"{GATEWAY_URL}/tools/invoke",
-            json=payload, headers=headers, timeout=10,
-        )
+        limit = RESPONSE_HISTORY_LIMIT + 2 * reply_bus.waiting
+        resp = gateway.invoke("sessions_history", {"sessionKey": "agent:main:main",
+                                                   "limit": limit, "includeTools": False})
         if resp.status_code != 200:
-            return None, 0
+            return
 
         data = resp.json()
         # Navigate the nested response
         result = data.get("result", {})
         details = result.get("details", result)
-        messages = details.get("messages", [])
-
-        for msg in messages:
-            if msg.get("role") != "assistant":
-                continue
-            content = msg.get("content", [])
-            if isinstance(content, str):
-                return content, msg.get("timestamp", 0)
-            # Extract text parts from content array
-            text_parts = []
-            for part in content:
-                if isinstance(part, dict) and part.get("type") == "text":
-                    text_parts.append(part.get("text", ""))
-            if text_parts:
-                return " ".join(text_parts), msg.get("timestamp", 0)
-
+        # Newest first from the gateway; oldest first here (stable for equal timestamps)
+        messages = sorted(reversed(details.get("messages", [])), key=lambda m: m.get("timestamp", 0))
     except Exception as e:
-        logger.error("Error fetching assistant message: %s", e)
-
-    return None, 0
-
+        logger.error("Error fetching assistant messages: %s", e)
+        return
 
-def wait_and_speak_response(send_time: float):
-    """Poll for OpenClaw's response and speak it via TTS."""
-    logger.info("⏳ Waiting for OpenClaw response...")
-    time.sleep(RESPONSE_POLL_INITIAL_DELAY)
+    unanswered = collections.deque()  # turn ids (None = not a voice command) of user messages
+    for msg in messages:
+        if msg.get("role") == "user":
+            tag = TURN_TAG.search(message_text(msg, role="user") or "")
+            unanswered.append(tag.group(1) if tag else None)
+            continue
+        text = message_text(msg)
+        if not is_answer(text):
+            continue  # NO_REPLY: the answer to that message is still to come
+        known = reply_bus.routed_to(text, msg.get("timestamp", 0))
+        if known is not None:
+            while unanswered and unanswered.popleft() != known:
+                pass
+            continue
+        if unanswered:
+            turn_id = unanswered.popleft()
+            if turn_id is None:
+                continue  # answers a typed message, not a voice command
+        else:
+            turn_id = None
+        reply_bus.publish(text, msg.get("timestamp", 0), turn_id, how="polled")
 
-    send_ts_ms = int(send_time * 1000)
-    elapsed = RESPONSE_POLL_INITIAL_DELAY
 
-    while elapsed < RESPONSE_POLL_MAX_WAIT:
-        text, ts = get_last_assistant_message()
+def wait_and_speak_response(turn_id: str, send_time: float):
+    """Wait for this turn's response (pushed, or polled as a fallback) and speak it via TTS."""
+    logger.info("⏳ [%s] Waiting for OpenClaw response...", turn_id)
+    deadline = send_time + RESPONSE_POLL_MAX_WAIT
+    max_gap = RESPONSE_PUSH_POLL_INTERVAL if reply_webhook else RESPONSE_POLL_INTERVAL
+    gap = RESPONSE_POLL_INITIAL_DELAY if not reply_webhook else max_gap
 
-        if text and ts > send_ts_ms:
-            # Filter out NO_REPLY and tool-only responses
-            if text.strip() == "NO_REPLY" or not text.strip():
-                logger.info("Response is NO_REPLY or empty, checking for Telegram message...")
-                # The actual response might have been sent via message tool
-                # Wait a bit more and check again
-                time.sleep(3)
-                elapsed += 3
+    try:
+        while time.time() < deadline:
+            # Returns the moment a reply is routed to this turn; otherwise a poll timer
+            found = reply_bus.wait_for(turn_id, timeout=min(gap, max(deadline - time.time(), 0)))
+            if found is None:
+                poll_replies()
+                found = reply_bus.wait_for(turn_id, timeout=0)
+            gap = min(gap * 2, max_gap)
+            if found is None:
                 continue
 
-            logger.info("📨 Got response (%d chars): '%s'", len(text), text[:80])
-            generate_voice_response(text)
+            text, ts, how = found
+            stats["replies_" + how] += 1
+            logger.info("📨 [%s] Got response (%s, %.1fs after send, %d chars): '%s'",
+                        turn_id, how, ts / 1000 - send_time, len(text), text[:80])
+            generate_voice_response(text, turn_id)
             return
+    finally:
+        reply_bus.done(turn_id)
 
-        time.sleep(RESPONSE_POLL_INTERVAL)
-        elapsed += RESPONSE_POLL_INTERVAL
-
-    logger.warning("⏰ Timed out waiting for response after %ds", RESPONSE_POLL_MAX_WAIT)
+    logger.warning("⏰ [%s] Timed out waiting for response after %ds", turn_id, RESPONSE_POLL_MAX_WAIT)
 
 
 # ─── File Processing ─────────────────────────────────────────────────────
@@ -367,50 +551,384 @@ def move_file(src: Path, dest_dir: Path):
 
 def process_file(audio_path: Path):
     logger.info("Processing: %s", audio_path.name)
+    submit(Turn(audio_path.name, recording_source(audio_path.name),
+                lambda: transcribe(audio_path), lambda dest: move_file(audio_path, dest),
+                lambda: file_key(audio_path)))
+
+
+# ─── Pipeline ────────────────────────────────────────────────────────────
+
+class Turn:
+    """One recording on its way through transcribe → dispatch → respond."""
+
+    def __init__(self, name: str, source: str, run_transcription, archive, fingerprint):
+        self.id = new_turn_id()  # correlation id: wake message, reply routing, response files
+        self.name = name
+        self.source = source
+        self.run_transcription = run_transcription  # () -> (text, duration, details)
+        self._archive = archive                     # (dest_dir) -> None
+        self.fingerprint = fingerprint              # () -> transcript store key of the archived bytes
+        self.key = None
+        self.text = ""
+        self.duration = 0.0
+        self.reply = None       # quick-command answer, spoken as-is
+        self.send_time = None   # when the text went to OpenClaw
+
+    def archive(self, dest_dir: Path):
+        try:
+            self._archive(dest_dir)
+        finally:
+            in_flight.discard(self.name)
 
-    try:
-        text, duration = transcribe(audio_path)
+    def fail(self):
+        self.archive(FAILED_DIR)
+        self.mark("failed")
+        stats["files_failed"] += 1
 
-        if not text.strip():
-            logger.warning("Empty transcription, moving to failed")
-            move_file(audio_path, FAILED_DIR)
-            stats["files_failed"] += 1
-            return
+    def mark(self, status: str):
+        if self.key is not None:
+            transcripts.mark(self.key, status)
+
+
+def new_turn_id() -> str:
+    return uuid.uuid4().hex[:12]
 
-        send_time = time.time()
-        success = send_to_openclaw(text, audio_path.name, duration)
-
-        if success:
-            move_file(audio_path, PROCESSED_DIR)
-            stats["files_processed"] += 1
-            stats["last_transcription"] = {
-                "file": audio_path.name,
-                "text": text[:200],
-                "duration": duration,
-                "at": datetime.now().isoformat(),
-            }
-            # V3: Wait for response and speak it
-            import threading
-            t = threading.Thread(
-                target=wait_and_speak_response,
-                args=(send_time,),
-                daemon=True,
-            )
-            t.start()
-        else:
-            logger.error("Failed to send to OpenClaw")
-            move_file(audio_path, FAILED_DIR)
-            stats["files_failed"] += 1
 
+def recording_source(name: str) -> str:
+    """Source tag of ikigai_<date>_<time>[_<tag>]_<id> ("" when untagged)."""
+    return "_".join(Path(name).stem.split("_")[3:-1])
+
+
+def submit(turn: Turn):
+    """Hand a recording to the transcription stage (blocks while it is full)."""
+    in_flight.add(turn.name)
+    transcriber.put(turn, key=turn.source)
+
+
+def transcribe_turn(turn: Turn):
+    """Stage 1 (model worker): transcribe, then answer locally or pass to dispatch.
+
+    Speculative stream transcriptions share this worker as plain callables.
+    """
+    if callable(turn):
+        turn()
+        return
+    try:
+        transcribe_cached(turn)
     except ValueError as e:
-        logger.warning("Skipping %s: %s", audio_path.name, e)
-        move_file(audio_path, FAILED_DIR)
-        stats["files_failed"] += 1
+        logger.warning("Skipping %s: %s", turn.name, e)
+        turn.fail()
+        return
     except Exception as e:
-        logger.error("Error processing %s: %s", audio_path.name, e, exc_info=True)
-        move_file(audio_path, FAILED_DIR)
-        stats["files_failed"] += 1
+        logger.error("Error transcribing %s: %s", turn.name, e, exc_info=True)
         stats["last_error"] = str(e)
+        turn.fail()
+        return
+
+    if not turn.text.strip():
+        logger.warning("Empty transcription, moving to failed")
+        turn.fail()
+        return
+
+    if QUICK_COMMANDS and answer_quick_command(turn):
+        turn.archive(PROCESSED_DIR)
+        turn.mark("quick")
+    # Quick replies go through dispatch too, so they can't overtake an
+    # earlier turn from the same source that is still being queued
+    dispatcher.put(turn, key=turn.source)
+
+
+def transcribe_cached(turn: Turn):
+    """Fill in turn.text/duration from the transcript store, or run Whisper and store the result."""
+    turn.key = turn.fingerprint()
+    cached = transcripts.get(turn.key)
+    if cached is not None:
+        turn.text, turn.duration = cached["text"], cached["duration"]
+        stats["transcript_cache_hits"] += 1
+        logger.info("♻ Cached transcript for %s (first seen as %s, %s, saved %.1fs): '%s'",
+                    turn.name, cached["name"], cached["status"], cached["transcribe_sec"] or 0,
+                    turn.text[:120])
+        return
+    turn.text, turn.duration, details = turn.run_transcription()
+    transcripts.put(turn.key, turn.name, turn.source, turn.text, turn.duration, **details)
+
+
+def dispatch_turn(turn: Turn):
+    """Stage 2: hand the command to the outbox; delivery and retries happen there."""
+    if turn.reply is not None:
+        responder.put(turn, key=None)
+        return
+    if not send_to_openclaw(turn):
+        turn.fail()
+        return
+    logger.info("📮 [%s] %s queued for OpenClaw", turn.id, turn.name)
+
+
+def finish_dispatch(turn: Turn, status: str, sent_at: float):
+    """Outbox callback (delivery thread): archive the turn and hand it to the responder.
+
+    Must not block: the delivery thread also sends, retries and expires every other command.
+    """
+    if status == "duplicate":
+        # Same recording as one already sent: OpenClaw answered it then, and won't again
+        logger.info("♻ [%s] %s was already sent to OpenClaw, not sending again", turn.id, turn.name)
+        stats["duplicates"] += 1
+        reply_bus.done(turn.id)
+        turn.archive(PROCESSED_DIR)
+        return
+    if status != "delivered":
+        reply_bus.done(turn.id)
+        logger.error("Failed to send to OpenClaw (%s): %s", status, turn.name)
+        stats["last_error"] = datetime.now().isoformat()
+        turn.fail()
+        return
+
+    turn.send_time = sent_at
+    turn.archive(PROCESSED_DIR)
+    turn.mark("sent")
+    stats["files_processed"] += 1
+    stats["last_transcription"] = {
+        "file": turn.name,
+        "text": turn.text[:200],
+        "duration": turn.duration,
+        "at": datetime.now().isoformat(),
+    }
+    responder.hand_off(turn, key=None)
+
+
+def respond_turn(turn: Turn):
+    """Stage 3: speak the quick-command reply, or wait for OpenClaw's and speak it."""
+    if turn.reply is not None:
+        generate_voice_response(turn.reply, turn.id)
+    else:
+        wait_and_speak_response(turn.id, turn.send_time)
+
+
+transcriber = Stage("transcribe", transcribe_turn, maxsize=PIPELINE_QUEUE_SIZE)
+dispatcher = Stage("dispatch", dispatch_turn, maxsize=PIPELINE_QUEUE_SIZE, workers=DISPATCH_WORKERS)
+responder = Stage("respond", respond_turn, maxsize=PIPELINE_QUEUE_SIZE, workers=RESPONSE_WORKERS)
+STAGES = (transcriber, dispatcher, responder)
+outbox = Outbox(OUTBOX_DB, post_wake, max_age=OUTBOX_MAX_AGE, base_delay=RETRY_DELAY,
+                max_delay=RETRY_MAX_DELAY)
+
+
+def answer_quick_command(turn: Turn) -> bool:
+    """Answer the turn locally if it is a quick command. Returns False to go to OpenClaw."""
+    found = quick_commands.match(turn.text)
+    if found is None:
+        return False
+
+    turn.reply = quick_commands.run(found, generate_voice_response)
+    logger.info("⚡ Quick command %s (%s match %.0fµs, handler %.2fms): %s",
+                found.command.name, found.how, found.match_ms * 1000, found.handler_ms, turn.reply)
+    stats["files_processed"] += 1
+    stats["quick_commands"] += 1
+    stats["last_transcription"] = {
+        "file": turn.name,
+        "text": turn.text[:200],
+        "duration": turn.duration,
+        "quick_command": found.command.name,
+        "at": datetime.now().isoformat(),
+    }
+    return True
+
+
+# ─── Streamed Recordings ─────────────────────────────────────────────────
+
+def read_stream_meta(pcm_path: Path) -> dict:
+    try:
+        with open(pcm_path.with_suffix(".json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def read_stream_pcm(pcm_path: Path, speech_end: int) -> bytes:
+    """PCM up to the last speech frame plus a short pad; the silence tail is dropped."""
+    end = speech_end + int(STREAM_SPEECH_PAD_SEC * PCM_SAMPLE_RATE)
+    with open(pcm_path, 'rb') as f:
+        return f.read(end * 2)
+
+
+def wav_bytes(pcm: bytes) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(PCM_SAMPLE_RATE)
+        wf.writeframes(pcm)
+    return buf.getvalue()
+
+
+def write_wav(dest_dir: Path, name: str, pcm: bytes):
+    """Archive PCM as WAV; the bytes match wav_bytes(), so the file keeps its transcript key."""
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    (dest_dir / f"{name}.wav").write_bytes(wav_bytes(pcm))
+
+
+def archive_stream(pcm_path: Path, dest_dir: Path):
+    """Store a finished stream as WAV in dest_dir and remove the stream files."""
+    write_wav(dest_dir, pcm_path.stem, pcm_path.read_bytes())
+    discard_stream(pcm_path)
+
+
+def discard_stream(pcm_path: Path):
+    pcm_path.unlink(missing_ok=True)
+    pcm_path.with_suffix(".json").unlink(missing_ok=True)
+    speculative_transcripts.pop(pcm_path.stem, None)
+
+
+def speculate_stream(pcm_path: Path, speech_end: int):
+    """Transcribe a stream during its trailing silence, before it completes."""
+    name = pcm_path.stem
+    cached = speculative_transcripts.get(name)
+    if cached and cached[0] == speech_end:
+        return
+
+    trailing = pcm_path.stat().st_size // 2 - speech_end
+    if trailing < STREAM_SPECULATE_SEC * PCM_SAMPLE_RATE:
+        return
+
+    speculative_transcripts[name] = (speech_end, None)  # queued
+    transcriber.put(lambda: run_speculation(pcm_path, speech_end), key=recording_source(name))
+
+
+def run_speculation(pcm_path: Path, speech_end: int):
+    """On the transcription worker, ahead of the stream's final turn."""
+    name = pcm_path.stem
+    if speculative_transcripts.get(name, (None,))[0] != speech_end:
+        return  # superseded: speech resumed, or the stream is already done
+    try:
+        result = transcribe_pcm(read_stream_pcm(pcm_path, speech_end))
+    except (ValueError, OSError):
+        result = None
+    if speculative_transcripts.get(name, (None,))[0] == speech_end:
+        speculative_transcripts[name] = (speech_end, result)
+    logger.info("⚡ Speculative transcript for %s (speech until %.1fs)",
+                name, speech_end / PCM_SAMPLE_RATE)
+
+
+def process_stream(pcm_path: Path):
+    """Advance one streamed recording according to its state marker."""
+    name = pcm_path.stem
+    if name in in_flight:
+        return
+    meta = read_stream_meta(pcm_path)
+    state = meta.get("state")
+
+    if state == "aborted":
+        discard_stream(pcm_path)
+        return
+
+    if state == "complete":
+        logger.info("Processing stream: %s", name)
+        speech_end = meta.get("speech_end", 0)
+        duration = meta.get("samples", 0) / PCM_SAMPLE_RATE
+
+        def run_transcription():
+            cached = speculative_transcripts.pop(name, None)
+            if cached and cached[0] == speech_end and cached[1] is not None:
+                stats["speculative_hits"] += 1
+                logger.info("♻ Reusing speculative transcript for %s", name)
+                text, _, details = cached[1]
+                return text, duration, details
+            if cached:
+                stats["speculative_misses"] += 1
+            text, _, details = transcribe_pcm(read_stream_pcm(pcm_path, speech_end))
+            return text, duration, details
+
+        submit(Turn(name, recording_source(name), run_transcription,
+                    lambda dest: archive_stream(pcm_path, dest),
+                    lambda: audio_key(wav_bytes(pcm_path.read_bytes()))))
+        return
+
+    try:
+        idle = time.time() - pcm_path.stat().st_mtime
+    except OSError:
+        return
+    if idle > STREAM_STALE_SEC:
+        logger.warning("Stream %s abandoned (%s, idle %.0fs), moving to failed",
+                       name, state or "no marker", idle)
+        archive_stream(pcm_path, FAILED_DIR)
+        stats["files_failed"] += 1
+    elif state == "trailing":
+        speculate_stream(pcm_path, meta.get("speech_end", 0))
+
+# ─── Socket Transport ────────────────────────────────────────────────────
+
+def load_transport():
+    """Import the shared socket transport (stdlib only) from ../listener."""
+    listener_dir = str(Path(__file__).resolve().parent.parent / "listener")
+    if listener_dir not in sys.path:
+        sys.path.append(listener_dir)
+    import transport
+    return transport
+
+
+def on_transport_message(header: dict, payload: bytes) -> bool:
+    """Runs on the connection thread: validate and enqueue, ack on success."""
+    if header.get("type") != "recording" or not payload:
+        logger.warning("Unexpected transport message: %s", header.get("type"))
+        return False
+    if header.get("sample_rate", PCM_SAMPLE_RATE) != PCM_SAMPLE_RATE:
+        logger.warning("Rejected recording at %s Hz", header.get("sample_rate"))
+        return False
+    if header.get("format", "pcm") not in RECORDING_EXTENSIONS:
+        logger.warning("Rejected recording in format %s", header.get("format"))
+        return False
+    inbox.put(("socket", (header, payload)))
+    return True
+
+
+def start_reply_webhook():
+    global reply_webhook
+    if not REPLY_LISTEN:
+        return
+    try:
+        reply_webhook = ReplyWebhook(REPLY_LISTEN, reply_bus, REPLY_TOKEN).start()
+    except OSError as e:
+        logger.error("Reply webhook on %s failed (%s), polling for responses", REPLY_LISTEN, e)
+
+
+def start_transport():
+    global player_client
+    if not (TRANSPORT_LISTEN or PLAYER_URL):
+        return
+    transport = load_transport()
+    if TRANSPORT_LISTEN:
+        transport.TransportServer(TRANSPORT_LISTEN, on_transport_message, log=logger).start()
+    if PLAYER_URL:
+        player_client = transport.TransportClient(PLAYER_URL, log=logger)
+
+
+def process_pcm(name: str, source: str, pcm: bytes):
+    logger.info("Processing (socket): %s", name)
+    submit(Turn(name, source, lambda: transcribe_pcm(pcm),
+                lambda dest: write_wav(dest, name, pcm), lambda: audio_key(wav_bytes(pcm))))
+
+
+def process_encoded(name: str, source: str, fmt: str, data: bytes):
+    """A FLAC/Opus/WAV recording received over the socket, archived as-is."""
+    logger.info("Processing (socket, %s): %s", fmt, name)
+    filename = name + RECORDING_EXTENSIONS[fmt]
+
+    def archive(dest: Path):
+        dest.mkdir(parents=True, exist_ok=True)
+        (dest / filename).write_bytes(data)
+
+    submit(Turn(filename, source, lambda: transcribe_encoded(io.BytesIO(data)), archive,
+                lambda: audio_key(data)))
+
+
+def process_received(header: dict, payload: bytes):
+    name = Path(header.get("name") or f"ikigai_{datetime.now().strftime('%Y%m%d_%H%M%S')}").name
+    fmt = header.get("format", "pcm")
+    source = header.get("source") or recording_source(name)
+    if fmt == "pcm":
+        process_pcm(name, source, payload)
+    else:
+        process_encoded(name, source, fmt, payload)
+
 
 # ─── Cleanup & Health ────────────────────────────────────────────────────
 
@@ -419,13 +937,22 @@ def cleanup_old_files():
     for d in [PROCESSED_DIR, FAILED_DIR]:
         if not d.exists():
             continue
-        for f in d.glob("*.wav"):
+        for f in d.iterdir():
+            if f.suffix not in AUDIO_SUFFIXES:
+                continue
             try:
                 if datetime.fromtimestamp(f.stat().st_mtime) < cutoff:
                     f.unlink()
                     logger.info("Cleaned: %s", f.name)
             except Exception:
                 pass
+    outbox.prune()
+    removed = transcripts.evict()
+    if removed:
+        logger.info("Evicted %d cached transcript(s)", removed)
+    removed = tts_cache.evict()
+    if removed:
+        logger.info("Evicted %d cached voice response(s)", removed)
 
 
 def write_health():
@@ -439,6 +966,15 @@ def write_health():
             if stats["started_at"] else 0
         ),
         "stats": stats,
+        "quick_commands": quick_commands.snapshot(),
+        "dir_watch": dir_watcher.snapshot() if dir_watcher else None,
+        "pipeline": {stage.name: stage.snapshot() for stage in STAGES},
+        "transcripts": transcripts.snapshot(),
+        "outbox": outbox.snapshot(),
+        "gateway": gateway.snapshot(),
+        "replies": reply_bus.snapshot(),
+        "tts_first_audio": latency_summary(list(tts_first_audio)),
+        "tts_cache": tts_cache.snapshot(),
         "checked_at": datetime.now().isoformat(),
     }
     try:
@@ -449,27 +985,62 @@ def write_health():
 
 # ─── Main ────────────────────────────────────────────────────────────────
 
-def get_pending_files() -> list[Path]:
-    if not AUDIO_DIR.exists():
-        return []
-    now = time.time()
-    files = []
-    for f in sorted(AUDIO_DIR.glob("ikigai_*.wav")):
+def is_watched(name: str) -> bool:
+    """Recordings and stream markers in the audio folder (not .part/.tmp files)."""
+    return name.startswith("ikigai_") and Path(name).suffix in AUDIO_SUFFIXES | {".json"}
+
+
+def on_folder_file(path: Path):
+    """Runs on the directory watcher's thread: hand the file to the main loop."""
+    if path.suffix == ".json":
+        inbox.put(("stream", path.with_suffix(".pcm")))
+    else:
+        inbox.put(("file", path))
+
+
+def process_inbox(timeout: float):
+    """Handle socket recordings and folder files, waiting up to `timeout` for one.
+
+    Doubles as the main loop's sleep, so anything that arrives is picked up
+    the moment it lands.
+    """
+    try:
+        kind, item = inbox.get(timeout=timeout)
+    except queue.Empty:
+        return
+    while running:
+        if kind == "socket":
+            process_received(*item)
+        elif kind == "stream":
+            open_streams.add(item)
+        elif item.name not in in_flight and item.exists():  # sweep and event may both report it
+            process_file(item)
         try:
-            if now - f.stat().st_mtime >= MIN_FILE_AGE:
-                files.append(f)
-        except OSError:
-            continue
-    return files
+            kind, item = inbox.get_nowait()
+        except queue.Empty:
+            return
+
+
+def advance_streams():
+    for pcm_path in sorted(open_streams):
+        if not running:
+            return
+        if pcm_path.exists():
+            process_stream(pcm_path)
+        if not pcm_path.exists():
+            open_streams.discard(pcm_path)
 
 
 def main():
+    global dir_watcher
     logger.info("=" * 60)
     logger.info("🔍 Hey Jarvis V3 — Voice Watcher Daemon")
     logger.info("=" * 60)
     logger.info("Audio dir:  %s", AUDIO_DIR)
     logger.info("Gateway:    %s", GATEWAY_URL)
-    logger.info("Whisper:    %s (%s/%s)", WHISPER_MODEL, WHISPER_DEVICE, WHISPER_COMPUTE)
+    logger.info("Transport:  %s", TRANSPORT_LISTEN or "shared folder")
+    logger.info("Replies:    %s", f"pushed to {REPLY_LISTEN}" if REPLY_LISTEN else "polled")
+    logger.info("Whisper:    profile %s", WHISPER_PROFILE)
 
     if not GATEWAY_TOKEN:
         logger.error("OPENCLAW_GATEWAY_TOKEN not set!")
@@ -487,14 +1058,20 @@ def main():
     except Exception as e:
         logger.error("Failed to load Whisper: %s (will retry)", e)
 
+    for stage in STAGES:
+        stage.start()
+    outbox.start()
+    start_transport()
+    start_reply_webhook()
+    dir_watcher = DirectoryWatcher(AUDIO_DIR, is_watched, on_folder_file, sweep_sec=WATCH_SWEEP_SEC,
+                                   fallback_sec=POLL_INTERVAL, min_age=MIN_FILE_AGE).start()
+
     logger.info("👂 Watching for audio files...")
 
     while running:
         try:
-            for audio_file in get_pending_files():
-                if not running:
-                    break
-                process_file(audio_file)
+            process_inbox(POLL_INTERVAL)
+            advance_streams()
 
             now = time.time()
             if now - last_health > HEALTH_INTERVAL:
@@ -504,17 +1081,54 @@ def main():
                 cleanup_old_files()
                 last_cleanup = now
 
-            time.sleep(POLL_INTERVAL)
-
         except KeyboardInterrupt:
             break
         except Exception as e:
             logger.error("Main loop error: %s", e, exc_info=True)
             time.sleep(5)
 
+    dir_watcher.stop()
+    for stage in STAGES:
+        stage.stop()
+    outbox.stop()
+    gateway.close()
+    if reply_webhook is not None:
+        reply_webhook.stop()
     logger.info("Shutdown. Stats: %s", json.dumps(stats, default=str))
     write_health()
 
 
+def reprocess_failed(include_uncached: bool = False):
+    """Move recordings in failed/ back into the audio folder for the running watcher.
+
+    The transcripts are cached, so they replay without Whisper. Recordings with
+    no cached transcript, or an empty one, failed before the gateway and are
+    left alone unless include_uncached is set.
+    """
+    moved = skipped = 0
+    for f in sorted(FAILED_DIR.iterdir()) if FAILED_DIR.exists() else []:
+        if f.suffix not in AUDIO_SUFFIXES:
+            continue
+        entry = transcripts.peek(file_key(f))
+        if not include_uncached and not (entry and entry["text"].strip()):
+            logger.info("  skip  %s (%s)", f.name, "empty transcript" if entry else "not cached")
+            skipped += 1
+            continue
+        move_file(f, AUDIO_DIR)
+        moved += 1
+        logger.info("  replay %s: %s", f.name, f"'{entry['text'][:80]}'" if entry else "(will transcribe)")
+    logger.info("Moved %d recording(s) back to %s, skipped %d", moved, AUDIO_DIR, skipped)
+
+
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Hey Jarvis voice watcher daemon")
+    parser.add_argument("--reprocess-failed", action="store_true",
+                        help="move failed/ recordings with a cached transcript back for the daemon to resend")
+    parser.add_argument("--all", action="store_true",
+                        help="with --reprocess-failed: also recordings that need transcribing again")
+    args = parser.parse_args()
+    if args.reprocess_failed:
+        reprocess_failed(include_uncached=args.all)
+    else:
+        main()
@@ -0,0 +1,87 @@
+"""
+🧠 Hey Jarvis — Whisper Profiles
+=================================
+Named faster-whisper configurations, so the watcher runs on whatever the
+box has instead of requiring CUDA:
+
+    gpu          large-v3, float16, beam 5      — the original setup
+    gpu-int8     large-v3, int8_float16, beam 5 — half the VRAM (≤6GB cards)
+    gpu-turbo    large-v3-turbo, float16, beam 5 — ~3x faster decoder
+    cpu          small, int8, beam 1            — CPU default: RTF ~0.1–0.2 for short commands
+    cpu-fast     base, int8, beam 1             — old / low-power CPUs
+    cpu-accurate medium, int8, beam 2           — more accuracy, RTF around 0.5
+
+HJ_WHISPER_PROFILE=auto (default) picks `gpu` when CTranslate2 sees a
+CUDA device and `cpu` otherwise; if the GPU profile then fails to load
+(missing cuBLAS/cuDNN, out of memory) the watcher falls back to `cpu`.
+HJ_WHISPER_MODEL / _DEVICE / _COMPUTE / _BEAM / _THREADS override single
+fields of whichever profile is chosen.
+
+bench_whisper.py reports load time and real-time factor per profile on a
+directory of reference clips.
+"""
+
+import os
+
+CPU_THREADS = min(os.cpu_count() or 4, 8)  # CTranslate2 gains little beyond ~8 threads
+
+PROFILES = {
+    "gpu":          dict(model="large-v3", device="cuda", compute_type="float16", beam_size=5),
+    "gpu-int8":     dict(model="large-v3", device="cuda", compute_type="int8_float16", beam_size=5),
+    "gpu-turbo":    dict(model="large-v3-turbo", device="cuda", compute_type="float16", beam_size=5),
+    "cpu":          dict(model="small", device="cpu", compute_type="int8", beam_size=1),
+    "cpu-fast":     dict(model="base", device="cpu", compute_type="int8", beam_size=1),
+    "cpu-accurate": dict(model="medium", device="cpu", compute_type="int8", beam_size=2),
+}
+for _profile in PROFILES.values():
+    _profile.setdefault("cpu_threads", CPU_THREADS if _profile["device"] == "cpu" else 0)
+    _profile.setdefault("num_workers", 1)
+
+CPU_FALLBACK = "cpu"
+
+
+def cuda_available() -> bool:
+    try:
+        import ctranslate2
+        return ctranslate2.get_cuda_device_count() > 0
+    except Exception:
+        return False
+
+
+def resolve_profile(name: str = None) -> tuple[str, dict]:
+    """(name, settings) for `name`, HJ_WHISPER_PROFILE or hardware detection, plus env overrides."""
+    name = name or os.environ.get("HJ_WHISPER_PROFILE", "auto")
+    if name == "auto":
+        name = "gpu" if cuda_available() else "cpu"
+    if name not in PROFILES:
+        raise ValueError(f"Unknown Whisper profile {name!r} (choose from: {', '.join(PROFILES)})")
+
+    settings = dict(PROFILES[name])
+    overrides = {
+        "model": os.environ.get("HJ_WHISPER_MODEL"),
+        "device": os.environ.get("HJ_WHISPER_DEVICE"),
+        "compute_type": os.environ.get("HJ_WHISPER_COMPUTE"),
+        "beam_size": os.environ.get("HJ_WHISPER_BEAM"),
+        "cpu_threads": os.environ.get("HJ_WHISPER_THREADS"),
+    }
+    for key, value in overrides.items():
+        if value:
+            settings[key] = int(value) if key in ("beam_size", "cpu_threads") else value
+    return name, settings
+
+
+def load_model(settings: dict):
+    from faster_whisper import WhisperModel
+    return WhisperModel(
+        settings["model"],
+        device=settings["device"],
+        compute_type=settings["compute_type"],
+        cpu_threads=settings["cpu_threads"],
+        num_workers=settings["num_workers"],
+    )
+
+
+def describe(name: str, settings: dict) -> str:
+    threads = f", {settings['cpu_threads']} threads" if settings["device"] == "cpu" else ""
+    return (f"{name}: {settings['model']} on {settings['device']} "
+            f"({settings['compute_type']}, beam {settings['beam_size']}{threads})")